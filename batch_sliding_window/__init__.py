@@ -6,25 +6,45 @@ of record processing workflows. It includes:
 - ProcessBatchWorkflow: Main workflow that partitions work across multiple sliding windows
 - SlidingWindowWorkflow: Implements the sliding window pattern with continue-as-new
 - RecordProcessorWorkflow: Processes individual records
+- RecordBatchProcessorWorkflow: Processes a micro-batch of records in one child
+- AdaptiveWindow: AIMD controller that sizes a sliding window from child latency and failures
 - RecordLoader: Activity for loading records from external sources
+- WorkStealingCoordinator: Activity that moves unstarted records between sliding windows
 """
 
+from batch_sliding_window.adaptive_window import (
+    AdaptiveWindow,
+    AdaptiveWindowConfig,
+    AdaptiveWindowState,
+)
 from batch_sliding_window.batch_workflow import (
     ProcessBatchWorkflow,
     ProcessBatchWorkflowInput,
 )
 from batch_sliding_window.record_loader_activity import (
+    GetRecordPageInput,
     GetRecordsInput,
     GetRecordsOutput,
     RecordLoader,
+    RecordPage,
     SingleRecord,
 )
-from batch_sliding_window.record_processor_workflow import RecordProcessorWorkflow
+from batch_sliding_window.record_processor_workflow import (
+    CompletionReport,
+    RecordBatch,
+    RecordBatchProcessorWorkflow,
+    RecordProcessorWorkflow,
+)
+from batch_sliding_window.record_ranges import RecordRange, RecordRanges
 from batch_sliding_window.sliding_window_workflow import (
     SlidingWindowState,
     SlidingWindowWorkflow,
     SlidingWindowWorkflowInput,
 )
+from batch_sliding_window.work_stealing import (
+    StealRecordsInput,
+    WorkStealingCoordinator,
+)
 
 __all__ = [
     "ProcessBatchWorkflow",
@@ -33,8 +53,20 @@ __all__ = [
     "SlidingWindowWorkflowInput",
     "SlidingWindowState",
     "RecordProcessorWorkflow",
+    "RecordBatchProcessorWorkflow",
+    "RecordBatch",
+    "CompletionReport",
+    "RecordRange",
+    "RecordRanges",
+    "AdaptiveWindow",
+    "AdaptiveWindowConfig",
+    "AdaptiveWindowState",
     "RecordLoader",
     "GetRecordsInput",
     "GetRecordsOutput",
+    "GetRecordPageInput",
+    "RecordPage",
     "SingleRecord",
+    "WorkStealingCoordinator",
+    "StealRecordsInput",
 ]
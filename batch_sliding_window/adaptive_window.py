@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class AdaptiveWindowConfig:
+    """Bounds and tuning of an adaptive sliding window.
+
+    The window grows additively while children finish faster than
+    ``target_latency_seconds`` without errors and shrinks multiplicatively
+    when their latency or error rate goes above target (AIMD, as in TCP
+    congestion control).
+    """
+
+    min_size: int  # fewest children kept in flight
+    max_size: int  # most children kept in flight
+    target_latency_seconds: float  # smoothed child latency above which to back off
+    # Smoothed failed-record fraction above which to back off
+    max_error_rate: float = 0.05
+    increase_step: float = 1.0  # children added per window's worth of completions
+    decrease_factor: float = 0.5  # window multiplier when backing off
+    smoothing: float = 0.2  # weight of each completion in the moving averages
+
+
+@dataclass
+class AdaptiveWindowState:
+    """Controller state carried across continue-as-new."""
+
+    size: float
+    latency_seconds: Optional[float] = None  # moving average of child latency
+    error_rate: float = 0.0  # moving average of failed-record fraction
+    last_decrease_at: Optional[float] = None  # workflow time, seconds since epoch
+
+
+class AdaptiveWindow:
+    """AIMD controller for the number of children a sliding window keeps in flight.
+
+    It only sees what children report in their completion signals and the
+    workflow time the signal arrives at, so every replay makes the same
+    decisions.
+    """
+
+    def __init__(
+        self, config: AdaptiveWindowConfig, state: Optional[AdaptiveWindowState]
+    ) -> None:
+        self.config = config
+        self.state = state or AdaptiveWindowState(size=config.min_size)
+        self.state.size = self._clamp(self.state.size)
+
+    @property
+    def size(self) -> int:
+        """Number of children that may be in flight now."""
+        return int(self.state.size)
+
+    def on_completion(
+        self, now: float, latency_seconds: float, records: int, failed: int
+    ) -> None:
+        """Update the window for a child that finished ``records`` records."""
+        config, state = self.config, self.state
+        if state.latency_seconds is None:
+            state.latency_seconds = latency_seconds
+        else:
+            state.latency_seconds += config.smoothing * (
+                latency_seconds - state.latency_seconds
+            )
+        state.error_rate += config.smoothing * (failed / records - state.error_rate)
+
+        if (
+            state.latency_seconds > config.target_latency_seconds
+            or state.error_rate > config.max_error_rate
+        ):
+            # Back off at most once per smoothed latency. The children that
+            # complete in the meantime were started before the last decrease
+            # and would otherwise shrink the window again for the same cause.
+            if (
+                state.last_decrease_at is None
+                or now - state.last_decrease_at >= state.latency_seconds
+            ):
+                state.size = self._clamp(state.size * config.decrease_factor)
+                state.last_decrease_at = now
+        else:
+            # Growing by step/size per completion adds about one step per
+            # window's worth of completions.
+            state.size = self._clamp(state.size + config.increase_step / state.size)
+
+    def _clamp(self, size: float) -> float:
+        return min(max(size, self.config.min_size), self.config.max_size)
@@ -1,12 +1,13 @@
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
 from temporalio import workflow
 from temporalio.common import WorkflowIDReusePolicy
 from temporalio.exceptions import ApplicationError
 
+from batch_sliding_window.adaptive_window import AdaptiveWindowConfig
 from batch_sliding_window.record_loader_activity import RecordLoader
 from batch_sliding_window.sliding_window_workflow import (
     SlidingWindowWorkflow,
@@ -22,9 +23,16 @@ class ProcessBatchWorkflowInput:
     to simplify backward compatible API changes.
     """
 
-    page_size: int  # Number of children started by a single sliding window workflow run
+    page_size: int  # Number of records started by a single sliding window workflow run
     sliding_window_size: int  # Maximum number of children to run in parallel
     partitions: int  # How many sliding windows to run in parallel
+    batch_size: int = 1  # Number of records processed by each child
+    # Adapt the window to child latency and failures within these bounds for
+    # the whole job. sliding_window_size is then the initial window size.
+    adaptive_window: Optional[AdaptiveWindowConfig] = None
+    # Let partitions that run out of records take unstarted ones from busier
+    # partitions, so one slow partition does not dictate the job's duration
+    work_stealing: bool = False
 
 
 @workflow.defn
@@ -43,15 +51,57 @@ class ProcessBatchWorkflow:
             start_to_close_timeout=timedelta(seconds=5),
         )
 
+        if input.batch_size < 1:
+            raise ApplicationError("BatchSize must be at least 1")
+
         if input.sliding_window_size < input.partitions:
             raise ApplicationError(
                 "SlidingWindowSize cannot be less than number of partitions"
             )
 
+        adaptive = input.adaptive_window
+        if adaptive:
+            if adaptive.min_size < input.partitions:
+                raise ApplicationError(
+                    "AdaptiveWindow.MinSize cannot be less than number of partitions"
+                )
+            if adaptive.max_size < adaptive.min_size:
+                raise ApplicationError(
+                    "AdaptiveWindow.MaxSize cannot be less than AdaptiveWindow.MinSize"
+                )
+            if adaptive.target_latency_seconds <= 0:
+                raise ApplicationError(
+                    "AdaptiveWindow.TargetLatencySeconds must be positive"
+                )
+            if not 0 < adaptive.decrease_factor < 1:
+                raise ApplicationError(
+                    "AdaptiveWindow.DecreaseFactor must be between 0 and 1"
+                )
+            if not 0 <= adaptive.max_error_rate <= 1:
+                raise ApplicationError(
+                    "AdaptiveWindow.MaxErrorRate must be between 0 and 1"
+                )
+            if not 0 < adaptive.smoothing <= 1:
+                raise ApplicationError(
+                    "AdaptiveWindow.Smoothing must be greater than 0 and at most 1"
+                )
+
         partitions = self._divide_into_partitions(record_count, input.partitions)
         window_sizes = self._divide_into_partitions(
             input.sliding_window_size, input.partitions
         )
+        # Each partition adapts its own window within its share of the bounds
+        adaptive_windows: List[Optional[AdaptiveWindowConfig]] = [None] * len(
+            partitions
+        )
+        if adaptive:
+            adaptive_windows = [
+                replace(adaptive, min_size=min_size, max_size=max_size)
+                for min_size, max_size in zip(
+                    self._divide_into_partitions(adaptive.min_size, input.partitions),
+                    self._divide_into_partitions(adaptive.max_size, input.partitions),
+                )
+            ]
 
         workflow.logger.info(
             f"ProcessBatchWorkflow started",
@@ -66,11 +116,12 @@ class ProcessBatchWorkflow:
         # Start child workflows for each partition
         tasks = []
         offset = 0
+        # Make child ids more user-friendly
+        child_ids = [
+            f"{workflow.info().workflow_id}/{i}" for i in range(input.partitions)
+        ]
 
-        for i in range(input.partitions):
-            # Make child id more user-friendly
-            child_id = f"{workflow.info().workflow_id}/{i}"
-
+        for i, child_id in enumerate(child_ids):
             # Define partition boundaries
             maximum_partition_offset = offset + partitions[i]
             if maximum_partition_offset > record_count:
@@ -83,6 +134,9 @@ class ProcessBatchWorkflow:
                 maximum_offset=maximum_partition_offset,  # exclusive
                 progress=0,
                 current_records=None,
+                batch_size=input.batch_size,
+                adaptive_window=adaptive_windows[i],
+                peer_workflow_ids=child_ids if input.work_stealing else None,
             )
 
             task = workflow.execute_child_workflow(
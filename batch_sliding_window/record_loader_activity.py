@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 from temporalio import activity
 
@@ -27,6 +27,29 @@ class GetRecordsOutput:
     records: List[SingleRecord]
 
 
+@dataclass
+class GetRecordPageInput:
+    """Input for the GetRecordPage activity."""
+
+    page_size: int
+    offset: int  # where to start reading when there is no cursor
+    max_offset: int  # exclusive
+    cursor: Optional[str] = None  # next_cursor of the previous page
+
+
+@dataclass
+class RecordPage:
+    """A page of records in columnar form.
+
+    Holding the ids in one list instead of a SingleRecord per record keeps
+    the activity result, and the continue-as-new input a prefetched page is
+    carried in, about a third of the size.
+    """
+
+    ids: List[int]
+    next_cursor: str  # continuation token for the page after this one
+
+
 class RecordLoader:
     """Activities for loading records from an external data source."""
 
@@ -46,7 +69,9 @@ class RecordLoader:
     async def get_records(self, input: GetRecordsInput) -> GetRecordsOutput:
         """Get records loaded from an external data source.
 
-        The sample returns fake records.
+        The sample returns fake records. Sliding windows read pages with
+        get_record_page; runs started before it existed replay the
+        unpatched branch that still calls this.
         """
         if input.max_offset > self.record_count:
             raise ValueError(
@@ -57,3 +82,21 @@ class RecordLoader:
         records = [SingleRecord(id=i) for i in range(input.offset, limit)]
 
         return GetRecordsOutput(records=records)
+
+    @activity.defn
+    async def get_record_page(self, input: GetRecordPageInput) -> RecordPage:
+        """Get a page of records, continuing from the cursor of the previous page.
+
+        The sample's cursor is just the next offset. A database would encode
+        the last key read instead, so each page is an index seek rather than
+        an OFFSET scan that gets slower the deeper the partition goes.
+        """
+        if input.max_offset > self.record_count:
+            raise ValueError(
+                f"max_offset({input.max_offset}) > record_count({self.record_count})"
+            )
+
+        start = int(input.cursor) if input.cursor is not None else input.offset
+        limit = min(start + input.page_size, input.max_offset)
+
+        return RecordPage(ids=list(range(start, limit)), next_cursor=str(limit))
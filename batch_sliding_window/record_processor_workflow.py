@@ -1,9 +1,30 @@
 import asyncio
 import random
+from dataclasses import dataclass
+from typing import List
 
 from temporalio import workflow
+from temporalio.exceptions import ApplicationError, FailureError
 
 from batch_sliding_window.record_loader_activity import SingleRecord
+from batch_sliding_window.record_ranges import RecordRange
+
+
+@dataclass
+class RecordBatch:
+    """A contiguous run of records processed by one child workflow."""
+
+    id: int  # id of the first record, unique within a sliding window
+    records: List[SingleRecord]  # consecutive records
+
+
+@dataclass
+class CompletionReport:
+    """Sent by a child to its sliding window once it has handled its records."""
+
+    records: RecordRange  # ids of the records the child handled
+    latency_seconds: float  # from the child's start to this report, in workflow time
+    failed: int = 0  # records whose processing failed
 
 
 @workflow.defn
@@ -12,22 +33,86 @@ class RecordProcessorWorkflow:
 
     @workflow.run
     async def run(self, record: SingleRecord) -> None:
-        await self._process_record(record)
+        succeeded = await _try_process_record(record)
 
         # Notify parent about completion via signal
-        parent = workflow.info().parent
-
-        # This workflow is always expected to have a parent.
-        # But for unit testing it might be useful to skip the notification if there is none.
-        if parent:
-            # Don't specify run_id as parent calls continue-as-new
-            handle = workflow.get_external_workflow_handle(parent.workflow_id)
-            await handle.signal("report_completion", record.id)
-
-    async def _process_record(self, record: SingleRecord) -> None:
-        """Simulate application specific record processing."""
-        # Use workflow.random() to get a random number to ensure workflow determinism
-        sleep_duration = workflow.random().randint(1, 10)
-        await workflow.sleep(sleep_duration)
-
-        workflow.logger.info(f"Processed record {record}")
+        if workflow.patched("completion-reports"):
+            await _report_completion(
+                RecordRange(start=record.id, end=record.id + 1),
+                failed=int(not succeeded),
+            )
+        else:
+            # Runs started before completion reports existed keep sending the
+            # signal their histories recorded
+            parent = workflow.info().parent
+            if parent:
+                handle = workflow.get_external_workflow_handle(parent.workflow_id)
+                await handle.signal("report_completion", record.id)
+        if not succeeded:
+            raise ApplicationError(f"Failed to process record {record.id}")
+
+
+@workflow.defn
+class RecordBatchProcessorWorkflow:
+    """Workflow that processes a micro-batch of records and reports them with one signal.
+
+    Compared to one RecordProcessorWorkflow per record, this divides the number
+    of child workflows and completion signals by the batch size.
+    """
+
+    @workflow.run
+    async def run(self, batch: RecordBatch) -> None:
+        succeeded = await asyncio.gather(
+            *(_try_process_record(record) for record in batch.records)
+        )
+        failed = succeeded.count(False)
+
+        # A single signal reports the whole batch as a range of record ids
+        await _report_completion(
+            RecordRange(start=batch.id, end=batch.records[-1].id + 1), failed=failed
+        )
+        if failed:
+            raise ApplicationError(
+                f"Failed to process {failed} of {len(batch.records)} records"
+            )
+
+
+async def process_record(record: SingleRecord) -> None:
+    """Simulate application specific record processing."""
+    # Use workflow.random() to get a random number to ensure workflow determinism
+    sleep_duration = workflow.random().randint(1, 10)
+    await workflow.sleep(sleep_duration)
+
+    workflow.logger.info(f"Processed record {record}")
+
+
+async def _try_process_record(record: SingleRecord) -> bool:
+    """Process a record, returning False if processing failed."""
+    try:
+        await process_record(record)
+    except FailureError as err:
+        # Activity, child workflow and application failures are reported to
+        # the parent, whose adaptive window backs off on a high error rate.
+        # Any other exception is a bug and fails the workflow task instead.
+        workflow.logger.warning(f"Failed to process record {record}: {err}")
+        return False
+    return True
+
+
+async def _report_completion(records: RecordRange, failed: int) -> None:
+    parent = workflow.info().parent
+
+    # This workflow is always expected to have a parent.
+    # But for unit testing it might be useful to skip the notification if there is none.
+    if parent:
+        # Don't specify run_id as parent calls continue-as-new
+        handle = workflow.get_external_workflow_handle(parent.workflow_id)
+        latency = workflow.now() - workflow.info().workflow_start_time
+        await handle.signal(
+            "report_records_completion",
+            CompletionReport(
+                records=records,
+                latency_seconds=latency.total_seconds(),
+                failed=failed,
+            ),
+        )
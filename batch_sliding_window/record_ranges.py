@@ -0,0 +1,77 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class RecordRange:
+    """A contiguous range of record ids."""
+
+    start: int  # inclusive
+    end: int  # exclusive
+
+
+class RecordRanges:
+    """A set of record ids stored as sorted, disjoint, non-adjacent ranges.
+
+    Records are started in offset order and mostly complete in roughly the
+    same order, so the ids in flight form a few long runs. Storing the runs
+    instead of every id keeps the sliding window's state, and the
+    continue-as-new input that carries it, small however large the window is.
+    """
+
+    def __init__(self, bounds: Optional[List[int]] = None) -> None:
+        """Create the set from flat ``[start, end, start, end, ...]`` bounds."""
+        bounds = bounds or []
+        self._starts: List[int] = bounds[0::2]
+        self._ends: List[int] = bounds[1::2]
+        self._count = sum(end - start for start, end in zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        """Return the number of record ids in the set."""
+        return self._count
+
+    def add(self, start: int, end: int) -> None:
+        """Add ``[start, end)``, merging it with the ranges it overlaps or touches."""
+        if start >= end:
+            return
+        # Ranges i to j - 1 end at or after start and begin at or before end
+        i = bisect_left(self._ends, start)
+        j = bisect_right(self._starts, end)
+        if i < j:
+            self._count -= sum(
+                e - s for s, e in zip(self._starts[i:j], self._ends[i:j])
+            )
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+        self._count += end - start
+
+    def remove(self, start: int, end: int) -> bool:
+        """Remove ``[start, end)`` if all of it is in the set.
+
+        Returns False, leaving the set unchanged, if any of it is missing,
+        for example because it was already removed.
+        """
+        i = bisect_right(self._starts, start) - 1
+        if start >= end or i < 0 or self._ends[i] < end:
+            return False
+        range_start, range_end = self._starts[i], self._ends[i]
+        del self._starts[i], self._ends[i]
+        if end < range_end:
+            self._starts.insert(i, end)
+            self._ends.insert(i, range_end)
+        if range_start < start:
+            self._starts.insert(i, range_start)
+            self._ends.insert(i, start)
+        self._count -= end - start
+        return True
+
+    def ranges(self) -> List[RecordRange]:
+        """Return the runs of the set in ascending order."""
+        return [RecordRange(s, e) for s, e in zip(self._starts, self._ends)]
+
+    def to_bounds(self) -> List[int]:
+        """Return the flat ``[start, end, ...]`` bounds accepted by the constructor."""
+        return [bound for pair in zip(self._starts, self._ends) for bound in pair]
@@ -1,18 +1,37 @@
 import asyncio
 from dataclasses import dataclass
 from datetime import timedelta
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
 
 from temporalio import workflow
 from temporalio.common import WorkflowIDReusePolicy
 
+from batch_sliding_window.adaptive_window import (
+    AdaptiveWindow,
+    AdaptiveWindowConfig,
+    AdaptiveWindowState,
+)
 from batch_sliding_window.record_loader_activity import (
+    GetRecordPageInput,
     GetRecordsInput,
     GetRecordsOutput,
     RecordLoader,
+    RecordPage,
     SingleRecord,
 )
-from batch_sliding_window.record_processor_workflow import RecordProcessorWorkflow
+from batch_sliding_window.record_processor_workflow import (
+    CompletionReport,
+    RecordBatch,
+    RecordBatchProcessorWorkflow,
+    RecordProcessorWorkflow,
+)
+from batch_sliding_window.record_ranges import RecordRange, RecordRanges
+from batch_sliding_window.work_stealing import (
+    StealGrant,
+    StealRecordsInput,
+    StealRecordsRequest,
+    WorkStealingCoordinator,
+)
 
 
 @dataclass
@@ -20,21 +39,48 @@ class SlidingWindowWorkflowInput:
     """Contains SlidingWindowWorkflow arguments."""
 
     page_size: int
+    # Maximum number of children in flight, or the initial one with an
+    # adaptive window
     sliding_window_size: int
     offset: int  # inclusive
     maximum_offset: int  # exclusive
     progress: int = 0
-    # The set of record ids currently being processed
-    current_records: Optional[Set[int]] = None
+    # The ids of the records currently being processed. Only read from the
+    # input of runs continued-as-new before current_record_bounds existed.
+    current_records: Optional[List[int]] = None
+    # Records handled by each child. With 1, each record gets its own
+    # RecordProcessorWorkflow; above that, RecordBatchProcessorWorkflow
+    # children process micro-batches and report each with a single signal.
+    batch_size: int = 1
+    # When set, the window adapts to the latency and error rate children
+    # report, within these bounds
+    adaptive_window: Optional[AdaptiveWindowConfig] = None
+    # State of the adaptive window, carried across continue-as-new
+    adaptive_window_state: Optional[AdaptiveWindowState] = None
+    # Workflow ids of the sliding windows to take unstarted records from once
+    # this one runs out. None disables work stealing.
+    peer_workflow_ids: Optional[List[str]] = None
+    # The last records given to each peer, by peer workflow id, so a repeated
+    # steal request gets the same records instead of taking more
+    steal_grants: Optional[Dict[str, StealGrant]] = None
+    # The page starting at offset, prefetched by the previous run
+    page: Optional[RecordPage] = None
+    # The records currently being processed, as flat
+    # [start, end, start, end, ...] range bounds (see RecordRanges), so the
+    # input stays small however large the window is
+    current_record_bounds: Optional[List[int]] = None
 
 
 @dataclass
 class SlidingWindowState:
     """Used as a 'state' query result."""
 
-    current_records: List[int]  # record ids currently being processed
+    current_records: List[RecordRange]  # record id ranges currently being processed
+    records_in_flight: int
+    sliding_window_size: int  # current maximum number of children in flight
     children_started_by_this_run: int
     offset: int
+    maximum_offset: int  # exclusive, lowered when peers take records
     progress: int
 
 
@@ -46,10 +92,16 @@ class SlidingWindowWorkflow:
     """
 
     def __init__(self):
-        self.current_records: Set[int] = set()
+        self.current_records = RecordRanges()
         self.children_started_by_this_run = []
+        self.records_started_by_this_run = 0
         self.offset = 0
+        self.maximum_offset = 0
         self.progress = 0
+        self.adaptive_window: Optional[AdaptiveWindow] = None
+        self._sliding_window_size = 0
+        self._reserved_end = 0
+        self._steal_grants: Dict[str, StealGrant] = {}
         self._completion_signals_received = 0
 
     @workflow.run
@@ -62,73 +114,195 @@ class SlidingWindowWorkflow:
                 "offset": input.offset,
                 "maximum_offset": input.maximum_offset,
                 "progress": input.progress,
+                "batch_size": input.batch_size,
             },
         )
 
         # Initialize state from input
-        self.current_records = input.current_records or set()
+        if input.current_record_bounds is not None:
+            self.current_records = RecordRanges(input.current_record_bounds)
+        else:
+            # Continued-as-new by a run that listed every record id
+            self.current_records = RecordRanges()
+            for record_id in sorted(input.current_records or []):
+                self.current_records.add(record_id, record_id + 1)
         self.offset = input.offset
+        self.maximum_offset = input.maximum_offset
+        # Records of this run's page and of the next one, which it prefetches,
+        # are reserved before any handler is registered, so peers can only
+        # take records after them.
+        self._reserved_end = min(self.offset + 2 * input.page_size, self.maximum_offset)
         self.progress = input.progress
+        self._steal_grants = dict(input.steal_grants or {})
+        self._sliding_window_size = input.sliding_window_size
+        if input.adaptive_window:
+            self.adaptive_window = AdaptiveWindow(
+                input.adaptive_window,
+                input.adaptive_window_state
+                or AdaptiveWindowState(size=input.sliding_window_size),
+            )
 
-        # Set up query handler
+        # Set up query handlers
         workflow.set_query_handler("state", self._handle_state_query)
+        workflow.set_query_handler(
+            "unstarted_records", self._handle_unstarted_records_query
+        )
+        workflow.set_query_handler("steal_grant", self._handle_steal_grant_query)
+
+        # Set up update handler for peers that ran out of records
+        workflow.set_update_handler("steal_records", self._handle_steal_records_update)
 
         # Set up signal handler for completion notifications
+        workflow.set_signal_handler(
+            "report_records_completion", self._handle_records_completion_signal
+        )
+        # Signal sent by children started before completion reports existed,
+        # which replay the unpatched branch of RecordProcessorWorkflow
         workflow.set_signal_handler("report_completion", self._handle_completion_signal)
 
         return await self._execute(input)
 
     async def _execute(self, input: SlidingWindowWorkflowInput) -> int:
         """Main execution logic."""
-        # Get records for this page if we haven't reached the end
-        records = []
-        if self.offset < input.maximum_offset:
-            get_records_input = GetRecordsInput(
-                page_size=input.page_size,
-                offset=self.offset,
-                max_offset=input.maximum_offset,
+        if not workflow.patched("record-pages"):
+            # Runs started before record pages existed read with get_records
+            # and never prefetch, so their histories keep replaying
+            ids = await self._get_records(input)
+            return await self._start_children(input, ids, None)
+
+        # Get records for this page if we haven't reached the end, unless the
+        # previous run already prefetched them
+        page = input.page
+        if page is None and self.offset < self._reserved_end:
+            page = await workflow.execute_activity_method(
+                RecordLoader.get_record_page,
+                GetRecordPageInput(
+                    page_size=input.page_size,
+                    offset=self.offset,
+                    max_offset=self._reserved_end,
+                ),
+                start_to_close_timeout=timedelta(seconds=5),
             )
-            get_records_output: GetRecordsOutput = (
-                await workflow.execute_activity_method(
-                    RecordLoader.get_records,
-                    get_records_input,
-                    start_to_close_timeout=timedelta(seconds=5),
-                )
+        ids = page.ids if page else []
+
+        # Load the next page while this one is dispatched, so the next run
+        # can start its children without waiting for an activity
+        next_page: Optional[workflow.ActivityHandle[RecordPage]] = None
+        page_end = self.offset + len(ids)
+        if page and page_end < self._reserved_end:
+            next_page = workflow.start_activity_method(
+                RecordLoader.get_record_page,
+                GetRecordPageInput(
+                    page_size=input.page_size,
+                    offset=page_end,
+                    max_offset=self._reserved_end,
+                    cursor=page.next_cursor,
+                ),
+                start_to_close_timeout=timedelta(seconds=5),
             )
-            records = get_records_output.records
 
+        return await self._start_children(input, ids, next_page)
+
+    async def _get_records(self, input: SlidingWindowWorkflowInput) -> List[int]:
+        """Get the ids of this run's records with the get_records activity."""
+        if self.offset >= self._reserved_end:
+            return []
+        output: GetRecordsOutput = await workflow.execute_activity_method(
+            RecordLoader.get_records,
+            GetRecordsInput(
+                page_size=input.page_size,
+                offset=self.offset,
+                max_offset=self._reserved_end,
+            ),
+            start_to_close_timeout=timedelta(seconds=5),
+        )
+        return [record.id for record in output.records]
+
+    async def _start_children(
+        self,
+        input: SlidingWindowWorkflowInput,
+        ids: List[int],
+        next_page: Optional[workflow.ActivityHandle[RecordPage]],
+    ) -> int:
+        """Start children for the records of this run, then continue-as-new."""
         workflow_id = workflow.info().workflow_id
 
-        # Process records
-        for record in records:
-            # Wait until we have capacity in the sliding window
-            await workflow.wait_condition(
-                lambda: len(self.current_records) < input.sliding_window_size
+        # Process records, one child per batch of batch_size records
+        for start in range(0, len(ids), input.batch_size):
+            batch = RecordBatch(
+                id=ids[start],
+                records=[
+                    SingleRecord(id=record_id)
+                    for record_id in ids[start : start + input.batch_size]
+                ],
             )
 
-            # Start child workflow for this record
-            child_id = f"{workflow_id}/{record.id}"
-            self.current_records.add(record.id)
-            child_handle = await workflow.start_child_workflow(
-                RecordProcessorWorkflow.run,
-                record,
-                id=child_id,
-                id_reuse_policy=WorkflowIDReusePolicy.ALLOW_DUPLICATE,
-                parent_close_policy=workflow.ParentClosePolicy.ABANDON,
+            # Wait until we have capacity in the sliding window. Batches at
+            # the end of a page can be short, so capacity is counted in
+            # records rather than children. The condition is re-evaluated
+            # after every signal, so an adaptive window that grows lets the
+            # next batch start right away.
+            await workflow.wait_condition(
+                lambda: len(self.current_records)
+                < self._current_window_size() * input.batch_size
             )
 
+            self.current_records.add(batch.id, batch.records[-1].id + 1)
+            child_handle: workflow.ChildWorkflowHandle[Any, None]
+            if input.batch_size == 1:
+                # Start child workflow for this record
+                child_handle = await workflow.start_child_workflow(
+                    RecordProcessorWorkflow.run,
+                    batch.records[0],
+                    id=f"{workflow_id}/{batch.id}",
+                    id_reuse_policy=WorkflowIDReusePolicy.ALLOW_DUPLICATE,
+                    parent_close_policy=workflow.ParentClosePolicy.ABANDON,
+                )
+            else:
+                # Start child workflow for this batch
+                child_handle = await workflow.start_child_workflow(
+                    RecordBatchProcessorWorkflow.run,
+                    batch,
+                    id=f"{workflow_id}/{batch.id}-{batch.records[-1].id}",
+                    id_reuse_policy=WorkflowIDReusePolicy.ALLOW_DUPLICATE,
+                    parent_close_policy=workflow.ParentClosePolicy.ABANDON,
+                )
+
             self.children_started_by_this_run.append(child_handle)
+            self.records_started_by_this_run += len(batch.records)
 
-        return await self._continue_as_new_or_complete(input)
+        return await self._continue_as_new_or_complete(
+            input, await next_page if next_page else None
+        )
 
     async def _continue_as_new_or_complete(
-        self, input: SlidingWindowWorkflowInput
+        self, input: SlidingWindowWorkflowInput, next_page: Optional[RecordPage]
     ) -> int:
         """Continue-as-new after starting page_size children or complete if done."""
-        # Update offset based on children started in this run
-        new_offset = input.offset + len(self.children_started_by_this_run)
+        # Update offset based on records started in this run
+        new_offset = input.offset + self.records_started_by_this_run
+        maximum_offset = self.maximum_offset
 
-        if new_offset < input.maximum_offset:
+        if new_offset >= maximum_offset and input.peer_workflow_ids:
+            # Out of records: take some that a busier peer has not started
+            # yet instead of leaving the tail of the job to it.
+            stolen: Optional[RecordRange] = await workflow.execute_activity_method(
+                WorkStealingCoordinator.steal_records,
+                StealRecordsInput(
+                    workflow_id=workflow.info().workflow_id,
+                    request_id=(
+                        f"{workflow.info().workflow_id}/{workflow.info().run_id}"
+                    ),
+                    peer_workflow_ids=input.peer_workflow_ids,
+                    min_records=input.page_size,
+                ),
+                start_to_close_timeout=timedelta(seconds=30),
+            )
+            if stolen:
+                new_offset, maximum_offset = stolen.start, stolen.end
+                next_page = None
+
+        if new_offset < maximum_offset:
             # In Python, await start_child_workflow() already waits until
             # the start has been accepted by the server, so no additional wait needed
 
@@ -137,9 +311,17 @@ class SlidingWindowWorkflow:
                 page_size=input.page_size,
                 sliding_window_size=input.sliding_window_size,
                 offset=new_offset,
-                maximum_offset=input.maximum_offset,
+                maximum_offset=maximum_offset,
                 progress=self.progress,
-                current_records=self.current_records,
+                current_record_bounds=self.current_records.to_bounds(),
+                batch_size=input.batch_size,
+                adaptive_window=input.adaptive_window,
+                adaptive_window_state=(
+                    self.adaptive_window.state if self.adaptive_window else None
+                ),
+                peer_workflow_ids=input.peer_workflow_ids,
+                steal_grants=self._steal_grants,
+                page=next_page,
             )
 
             workflow.continue_as_new(new_input)
@@ -149,19 +331,81 @@ class SlidingWindowWorkflow:
         await workflow.wait_condition(lambda: len(self.current_records) == 0)
         return self.progress
 
+    def _current_window_size(self) -> int:
+        """Return the number of children that may be in flight now."""
+        if self.adaptive_window:
+            return self.adaptive_window.size
+        return self._sliding_window_size
+
+    def _handle_records_completion_signal(self, report: CompletionReport) -> None:
+        """Handle completion signal from a child workflow."""
+        completed = report.records
+        # Check for duplicate signals
+        if not self.current_records.remove(completed.start, completed.end):
+            return
+        self.progress += completed.end - completed.start
+        if self.adaptive_window:
+            # Signal handlers run as part of a workflow task, so workflow
+            # time makes the controller's decisions replay deterministically.
+            self.adaptive_window.on_completion(
+                now=workflow.now().timestamp(),
+                latency_seconds=report.latency_seconds,
+                records=completed.end - completed.start,
+                failed=report.failed,
+            )
+
     def _handle_completion_signal(self, record_id: int) -> None:
         """Handle completion signal from child workflow."""
         # Check for duplicate signals
-        if record_id in self.current_records:
-            self.current_records.remove(record_id)
+        if self.current_records.remove(record_id, record_id + 1):
             self.progress += 1
 
+    def _handle_steal_records_update(
+        self, request: StealRecordsRequest
+    ) -> Optional[RecordRange]:
+        """Give the upper half of the unstarted records to a peer that ran out.
+
+        Returns None if that would be fewer than min_records. A repeated
+        request, such as one from a retried activity, gets the records it was
+        given the first time.
+        """
+        grant = self._steal_grants.get(request.workflow_id)
+        if grant and grant.request_id == request.request_id:
+            return grant.records
+
+        stolen = (self.maximum_offset - self._reserved_end) // 2
+        if stolen < max(request.min_records, 1):
+            return None
+        start = self.maximum_offset - stolen
+        taken = RecordRange(start=start, end=self.maximum_offset)
+        # Continue-as-new carries the lowered maximum to the next run
+        self.maximum_offset = start
+        # A peer has at most one request in flight, so only its latest grant
+        # can be asked for again
+        self._steal_grants[request.workflow_id] = StealGrant(
+            request_id=request.request_id, records=taken
+        )
+        workflow.logger.info(
+            f"Gave records [{taken.start}, {taken.end}) to {request.workflow_id}"
+        )
+        return taken
+
+    def _handle_steal_grant_query(self, workflow_id: str) -> Optional[StealGrant]:
+        """Handle query for the last records given to a peer."""
+        return self._steal_grants.get(workflow_id)
+
+    def _handle_unstarted_records_query(self) -> int:
+        """Handle query for the number of records peers could take."""
+        return self.maximum_offset - self._reserved_end
+
     def _handle_state_query(self) -> SlidingWindowState:
         """Handle state query for monitoring."""
-        current_record_ids = sorted(list(self.current_records))
         return SlidingWindowState(
-            current_records=current_record_ids,
+            current_records=self.current_records.ranges(),
+            records_in_flight=len(self.current_records),
+            sliding_window_size=self._current_window_size(),
             children_started_by_this_run=len(self.children_started_by_this_run),
             offset=self.offset,
+            maximum_offset=self.maximum_offset,
             progress=self.progress,
         )
@@ -0,0 +1,152 @@
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional
+
+from temporalio import activity
+from temporalio.client import (
+    Client,
+    WorkflowQueryFailedError,
+    WorkflowUpdateFailedError,
+)
+from temporalio.service import RPCError, RPCStatusCode
+
+from batch_sliding_window.record_ranges import RecordRange
+
+
+@dataclass
+class StealRecordsInput:
+    """Input for the StealRecords activity."""
+
+    workflow_id: str  # the sliding window asking for records
+    # Identifies this request across activity retries. A sliding window run
+    # asks at most once, so "<workflow id>/<run id>" is unique per request.
+    request_id: str
+    peer_workflow_ids: List[str]  # sliding windows to take records from
+    min_records: int  # smallest range worth taking
+
+
+@dataclass
+class StealRecordsRequest:
+    """Argument of the steal_records update."""
+
+    workflow_id: str  # the sliding window asking for records
+    request_id: str  # see StealRecordsInput
+    min_records: int  # smallest range worth giving away
+
+
+@dataclass
+class StealGrant:
+    """Records a sliding window gave away, remembered to answer repeated requests."""
+
+    request_id: str
+    records: RecordRange
+
+
+class WorkStealingCoordinator:
+    """Activities that move unstarted records between sliding windows.
+
+    Workflows cannot send updates to other workflows, so a sliding window that
+    runs out of records asks this activity to take some from its peers.
+    """
+
+    def __init__(self, client: Client) -> None:
+        self.client = client
+
+    @activity.defn
+    async def steal_records(self, input: StealRecordsInput) -> Optional[RecordRange]:
+        """Take unstarted records from the peer with the most of them.
+
+        Peers are asked in decreasing order of their unstarted records. A peer
+        gives away the upper half of its unstarted range through the
+        ``steal_records`` update, or nothing if it has run low since it was
+        queried. Returns None if no peer has records to spare.
+
+        Taking records is not undoable, so a retry must not take a second
+        range: the records of the first would then be processed by nobody.
+        Peers remember what they granted to each request, and a retry asks
+        every peer for an earlier grant before trying to take anything.
+        """
+        peer_ids = [id for id in input.peer_workflow_ids if id != input.workflow_id]
+        if activity.info().attempt > 1:
+            granted = await asyncio.gather(
+                *(
+                    self._granted(id, input.workflow_id, input.request_id)
+                    for id in peer_ids
+                )
+            )
+            for grant in granted:
+                if grant:
+                    return grant.records
+
+        unstarted = await asyncio.gather(*(self._unstarted(id) for id in peer_ids))
+        candidates = sorted(
+            (
+                (count, id)
+                for id, count in zip(peer_ids, unstarted)
+                if count >= 2 * input.min_records
+            ),
+            reverse=True,
+        )
+        request = StealRecordsRequest(
+            workflow_id=input.workflow_id,
+            request_id=input.request_id,
+            min_records=input.min_records,
+        )
+        for _, peer_id in candidates:
+            stolen = await self._steal(peer_id, request)
+            if stolen:
+                activity.logger.info(
+                    f"{input.workflow_id} took records "
+                    f"[{stolen.start}, {stolen.end}) from {peer_id}"
+                )
+                return stolen
+        return None
+
+    async def _unstarted(self, workflow_id: str) -> int:
+        handle = self.client.get_workflow_handle(workflow_id)
+        try:
+            return await handle.query("unstarted_records", result_type=int)
+        except (RPCError, WorkflowQueryFailedError):
+            # Not started yet or already gone; it has nothing to give
+            return 0
+
+    async def _granted(
+        self, workflow_id: str, requester_id: str, request_id: str
+    ) -> Optional[StealGrant]:
+        handle = self.client.get_workflow_handle(workflow_id)
+        try:
+            grant: Optional[StealGrant] = await handle.query(  # type: ignore[call-overload]
+                "steal_grant", requester_id, result_type=Optional[StealGrant]
+            )
+        except RPCError as err:
+            # Any other error fails this attempt: taking records from a peer
+            # that may already have granted some would lose them
+            if err.status != RPCStatusCode.NOT_FOUND:
+                raise
+            return None
+        return grant if grant and grant.request_id == request_id else None
+
+    async def _steal(
+        self, workflow_id: str, request: StealRecordsRequest
+    ) -> Optional[RecordRange]:
+        handle = self.client.get_workflow_handle(workflow_id)
+        try:
+            return await handle.execute_update(  # type: ignore[call-overload]
+                "steal_records",
+                request,
+                # The server also deduplicates updates with the same id sent
+                # to the same run
+                id=f"steal-records/{request.request_id}",
+                result_type=Optional[RecordRange],
+            )
+        except WorkflowUpdateFailedError:
+            # The update handler ran and refused, e.g. while completing
+            return None
+        except RPCError as err:
+            # Timeouts and unavailability may arrive after the update ran, so
+            # fail this attempt and let the retry recover the grant through
+            # the steal_grant query
+            if err.status != RPCStatusCode.NOT_FOUND:
+                raise
+            # Completed since it was queried
+            return None
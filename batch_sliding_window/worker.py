@@ -10,8 +10,12 @@ from temporalio.envconfig import ClientConfig
 
 from batch_sliding_window.batch_workflow import ProcessBatchWorkflow
 from batch_sliding_window.record_loader_activity import RecordLoader
-from batch_sliding_window.record_processor_workflow import RecordProcessorWorkflow
+from batch_sliding_window.record_processor_workflow import (
+    RecordBatchProcessorWorkflow,
+    RecordProcessorWorkflow,
+)
 from batch_sliding_window.sliding_window_workflow import SlidingWindowWorkflow
+from batch_sliding_window.work_stealing import WorkStealingCoordinator
 
 
 async def main():
@@ -26,6 +30,7 @@ async def main():
 
     # Create RecordLoader activity with sample data
     record_loader = RecordLoader(record_count=90)
+    work_stealing_coordinator = WorkStealingCoordinator(client)
 
     # Create worker
     temporal_worker = worker.Worker(
@@ -35,10 +40,13 @@ async def main():
             ProcessBatchWorkflow,
             SlidingWindowWorkflow,
             RecordProcessorWorkflow,
+            RecordBatchProcessorWorkflow,
         ],
         activities=[
             record_loader.get_record_count,
             record_loader.get_records,
+            record_loader.get_record_page,
+            work_stealing_coordinator.steal_records,
         ],
     )
 
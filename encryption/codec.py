@@ -1,57 +1,115 @@
+import asyncio
 import os
-from typing import Iterable, List
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from temporalio.api.common.v1 import Payload
 from temporalio.converter import PayloadCodec
 
+from encryption.keys import KeyProvider, StaticKeyProvider
+
 default_key = b"test-key-test-key-test-key-test!"
 default_key_id = "test-key-id"
 
+_NONCE_SIZE = 12
+
+_T = TypeVar("_T")
+
 
 class EncryptionCodec(PayloadCodec):
-    def __init__(self, key_id: str = default_key_id, key: bytes = default_key) -> None:
+    def __init__(
+        self,
+        key_id: str = default_key_id,
+        key: bytes = default_key,
+        *,
+        key_provider: Optional[KeyProvider] = None,
+        executor: Optional[Executor] = None,
+        min_batch_size: int = 64 * 1024,
+    ) -> None:
         super().__init__()
-        self.key_id = key_id
+        # Keys come from the provider, which can rotate the active key while
+        # still resolving older ones for payloads encrypted before the
+        # rotation. Without one, the codec uses the single key given.
+        self.key_provider = key_provider or StaticKeyProvider({key_id: key}, key_id)
         # We are using direct AESGCM to be compatible with samples from
         # TypeScript and Go. Pure Python samples may prefer the higher-level,
-        # safer APIs.
-        self.encryptor = AESGCM(key)
+        # safer APIs. Constructing one expands the key, so they are cached
+        # per key ID rather than built per payload.
+        self._ciphers: Dict[str, AESGCM] = {}
+        # Batches of at least min_batch_size bytes are encrypted and decrypted
+        # in the executor (the event loop's default thread pool if None) so
+        # large payloads do not block the worker's event loop.
+        self.executor = executor
+        self.min_batch_size = min_batch_size
 
     async def encode(self, payloads: Iterable[Payload]) -> List[Payload]:
-        # We blindly encode all payloads with the key and set the metadata
-        # saying which key we used
-        return [
+        payloads = list(payloads)
+        # Resolve keys on the event loop, where the provider may do I/O, then
+        # do the CPU-bound work for the whole batch in one call.
+        key_id = await self.key_provider.active_key_id()
+        cipher = await self._cipher(key_id)
+        return await self._run(payloads, lambda: _encrypt(key_id, cipher, payloads))
+
+    async def decode(self, payloads: Iterable[Payload]) -> List[Payload]:
+        payloads = list(payloads)
+        ciphers = {
+            key_id: await self._cipher(key_id)
+            for key_id in {
+                p.metadata.get("encryption-key-id", b"").decode()
+                for p in payloads
+                if _is_encrypted(p)
+            }
+        }
+        return await self._run(payloads, lambda: _decrypt(ciphers, payloads))
+
+    async def _cipher(self, key_id: str) -> AESGCM:
+        cipher = self._ciphers.get(key_id)
+        if cipher is None:
+            key = await self.key_provider.get_key(key_id)
+            if key is None:
+                raise ValueError(f"Unrecognized key ID {key_id}.")
+            cipher = self._ciphers[key_id] = AESGCM(key)
+        return cipher
+
+    async def _run(self, payloads: List[Payload], fn: Callable[[], _T]) -> _T:
+        if sum(p.ByteSize() for p in payloads) < self.min_batch_size:
+            return fn()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn)
+
+
+def _is_encrypted(payload: Payload) -> bool:
+    return payload.metadata.get("encoding", b"").decode() == "binary/encrypted"
+
+
+def _encrypt(key_id: str, cipher: AESGCM, payloads: List[Payload]) -> List[Payload]:
+    # We blindly encode all payloads with the key and set the metadata
+    # saying which key we used. One urandom call supplies every nonce in the
+    # batch.
+    nonces = os.urandom(_NONCE_SIZE * len(payloads))
+    result: List[Payload] = []
+    for i, p in enumerate(payloads):
+        nonce = nonces[i * _NONCE_SIZE : (i + 1) * _NONCE_SIZE]
+        result.append(
             Payload(
                 metadata={
                     "encoding": b"binary/encrypted",
-                    "encryption-key-id": self.key_id.encode(),
+                    "encryption-key-id": key_id.encode(),
                 },
-                data=self.encrypt(p.SerializeToString()),
+                data=nonce + cipher.encrypt(nonce, p.SerializeToString(), None),
             )
-            for p in payloads
-        ]
+        )
+    return result
 
-    async def decode(self, payloads: Iterable[Payload]) -> List[Payload]:
-        ret: List[Payload] = []
-        for p in payloads:
-            # Ignore ones w/out our expected encoding
-            if p.metadata.get("encoding", b"").decode() != "binary/encrypted":
-                ret.append(p)
-                continue
-            # Confirm our key ID is the same
-            key_id = p.metadata.get("encryption-key-id", b"").decode()
-            if key_id != self.key_id:
-                raise ValueError(
-                    f"Unrecognized key ID {key_id}. Current key ID is {self.key_id}."
-                )
-            # Decrypt and append
-            ret.append(Payload.FromString(self.decrypt(p.data)))
-        return ret
-
-    def encrypt(self, data: bytes) -> bytes:
-        nonce = os.urandom(12)
-        return nonce + self.encryptor.encrypt(nonce, data, None)
-
-    def decrypt(self, data: bytes) -> bytes:
-        return self.encryptor.decrypt(data[:12], data[12:], None)
+
+def _decrypt(ciphers: Dict[str, AESGCM], payloads: List[Payload]) -> List[Payload]:
+    result: List[Payload] = []
+    for p in payloads:
+        # Ignore ones w/out our expected encoding
+        if not _is_encrypted(p):
+            result.append(p)
+            continue
+        cipher = ciphers[p.metadata.get("encryption-key-id", b"").decode()]
+        data = cipher.decrypt(p.data[:_NONCE_SIZE], p.data[_NONCE_SIZE:], None)
+        result.append(Payload.FromString(data))
+    return result
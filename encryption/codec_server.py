@@ -7,6 +7,23 @@ from temporalio.api.common.v1 import Payload, Payloads
 
 from encryption.codec import EncryptionCodec
 
+JSON_CONTENT_TYPE = "application/json"
+PROTOBUF_CONTENT_TYPE = "application/x-protobuf"
+
+
+def accepts_protobuf(req: web.Request) -> bool:
+    # The first acceptable media range naming either format wins; a missing
+    # Accept header or */* keeps the JSON default the Web UI expects.
+    for media_range in req.headers.get(hdrs.ACCEPT, "").split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if "q=0" in params or "q=0.0" in params:
+            continue
+        if media_type == PROTOBUF_CONTENT_TYPE:
+            return True
+        if media_type in (JSON_CONTENT_TYPE, "application/*", "*/*"):
+            return False
+    return False
+
 
 def build_codec_server() -> web.Application:
     # Cors handler
@@ -22,17 +39,27 @@ def build_codec_server() -> web.Application:
     async def apply(
         fn: Callable[[Iterable[Payload]], Awaitable[List[Payload]]], req: web.Request
     ) -> web.Response:
-        # Read payloads as JSON
-        assert req.content_type == "application/json"
-        payloads = json_format.Parse(await req.read(), Payloads())
+        # Read payloads as JSON, or as binary protobuf, which skips base64 and
+        # JSON parsing for bulk decoding from the CLI
+        if req.content_type == PROTOBUF_CONTENT_TYPE:
+            payloads = Payloads.FromString(await req.read())
+        elif req.content_type == JSON_CONTENT_TYPE:
+            payloads = json_format.Parse(await req.read(), Payloads())
+        else:
+            raise web.HTTPUnsupportedMediaType()
 
         # Apply
         payloads = Payloads(payloads=await fn(payloads.payloads))
 
-        # Apply CORS and return JSON
+        # Apply CORS and return in the format the client accepts, JSON by
+        # default
         resp = await cors_options(req)
-        resp.content_type = "application/json"
-        resp.text = json_format.MessageToJson(payloads)
+        if accepts_protobuf(req):
+            resp.content_type = PROTOBUF_CONTENT_TYPE
+            resp.body = payloads.SerializeToString()
+        else:
+            resp.content_type = JSON_CONTENT_TYPE
+            resp.text = json_format.MessageToJson(payloads)
         return resp
 
     # Build app
@@ -0,0 +1,334 @@
+"""Envelope encryption: payloads are encrypted with data keys wrapped by a master key.
+
+Sending every payload to a key management service (KMS) is far too slow, and
+encrypting every payload with the master key directly means the master key
+must live in every worker. With envelope encryption the KMS only generates
+and unwraps short-lived data keys. :class:`EnvelopeEncryptionCodec` asks for
+one data key per workflow and per ``data_key_ttl`` window, caches it, and
+stores the wrapped form in each payload's metadata so any holder of KMS
+access can decrypt it later.
+
+:class:`LocalKms` is an in-process stand-in for a real KMS, built on the
+master keys of a :class:`~encryption.keys.KeyProvider`, so the sample runs
+and can be tested offline.
+"""
+
+import asyncio
+import copy
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    ActivitySerializationContext,
+    PayloadCodec,
+    SerializationContext,
+    WithSerializationContext,
+    WorkflowSerializationContext,
+)
+
+from encryption.keys import KeyProvider
+
+_ENCODING = b"binary/encrypted-envelope"
+_NONCE_SIZE = 12
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+_T = TypeVar("_T")
+
+# (namespace, workflow ID), or None outside of a workflow context.
+_Scope = Optional[Tuple[str, str]]
+
+
+class KeyManagementService(ABC):
+    """The two KMS operations envelope encryption needs.
+
+    They mirror AWS KMS ``GenerateDataKey`` and ``Decrypt``, so an adapter
+    for a real service is a thin wrapper around its client.
+    """
+
+    @abstractmethod
+    async def generate_data_key(self, master_key_id: str) -> Tuple[bytes, bytes]:
+        """Return a new 256-bit data key and the same key wrapped by the master key."""
+
+    @abstractmethod
+    async def decrypt_data_key(self, master_key_id: str, wrapped_key: bytes) -> bytes:
+        """Unwrap a data key returned by :meth:`generate_data_key`."""
+
+
+class LocalKms(KeyManagementService):
+    """A fake KMS that wraps data keys with AES-GCM under master keys from a provider.
+
+    ``latency`` adds a delay to every call to imitate a network round trip.
+    ``generate_calls`` and ``decrypt_calls`` count the calls made, so tests
+    can check how well the codec's cache works.
+    """
+
+    def __init__(self, key_provider: KeyProvider, *, latency: float = 0.0) -> None:
+        self._key_provider = key_provider
+        self._latency = latency
+        self.generate_calls = 0
+        self.decrypt_calls = 0
+
+    async def generate_data_key(self, master_key_id: str) -> Tuple[bytes, bytes]:
+        self.generate_calls += 1
+        master = await self._master(master_key_id)
+        data_key = AESGCM.generate_key(bit_length=256)
+        nonce = os.urandom(_NONCE_SIZE)
+        # The master key ID is bound as associated data, so a wrapped key
+        # cannot be presented as belonging to another master key.
+        wrapped = nonce + master.encrypt(nonce, data_key, master_key_id.encode())
+        return data_key, wrapped
+
+    async def decrypt_data_key(self, master_key_id: str, wrapped_key: bytes) -> bytes:
+        self.decrypt_calls += 1
+        master = await self._master(master_key_id)
+        return master.decrypt(
+            wrapped_key[:_NONCE_SIZE],
+            wrapped_key[_NONCE_SIZE:],
+            master_key_id.encode(),
+        )
+
+    async def _master(self, master_key_id: str) -> AESGCM:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        key = await self._key_provider.get_key(master_key_id)
+        if key is None:
+            raise ValueError(f"Unrecognized master key ID {master_key_id}.")
+        return AESGCM(key)
+
+
+class _TtlCache(Generic[_K, _V]):
+    """An LRU cache whose entries also expire ``ttl`` seconds after insertion."""
+
+    def __init__(
+        self, ttl: float, max_entries: int, clock: Callable[[], float]
+    ) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[_K, Tuple[_V, float]] = OrderedDict()
+
+    def get(self, key: _K) -> Optional[_V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: _K, value: _V) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (value, self._clock() + self._ttl)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class _DataKeys:
+    """Data key caches shared by a codec and every copy made by ``with_context``."""
+
+    def __init__(
+        self, ttl: float, max_entries: int, clock: Callable[[], float]
+    ) -> None:
+        # Scope -> (wrapped key, cipher) used to encrypt new payloads.
+        self.encrypting: _TtlCache[_Scope, Tuple[bytes, AESGCM]] = _TtlCache(
+            ttl, max_entries, clock
+        )
+        # Wrapped key -> cipher used to decrypt payloads that carry it.
+        self.decrypting: _TtlCache[bytes, AESGCM] = _TtlCache(ttl, max_entries, clock)
+        # In-flight KMS calls, so concurrent batches share one round trip.
+        self.generating: Dict[_Scope, "asyncio.Future[Tuple[bytes, AESGCM]]"] = {}
+        self.unwrapping: Dict[bytes, "asyncio.Future[AESGCM]"] = {}
+
+
+class EnvelopeEncryptionCodec(PayloadCodec, WithSerializationContext):
+    """Encrypts payloads with per-workflow data keys wrapped by a KMS master key.
+
+    The SDK hands the codec each payload's serialization context, so payloads
+    of one workflow, and of the activities it starts, share a data key that
+    no other workflow uses. Payloads without a workflow context, such as
+    those the codec server sees, share one key per window. A new data key is
+    generated once the current one is ``data_key_ttl`` seconds old. The
+    context has no run ID, so runs that reuse a workflow ID within one window
+    share its key.
+
+    Every payload records the master key ID and its wrapped data key, so
+    decoding needs nothing but access to the KMS. Unwrapped keys are cached
+    for ``data_key_ttl`` seconds as well, so a history encrypted under one
+    data key costs one KMS call to decode.
+    """
+
+    def __init__(
+        self,
+        kms: KeyManagementService,
+        master_key_id: str,
+        *,
+        data_key_ttl: float = 3600.0,
+        max_cached_keys: int = 10_000,
+        executor: Optional[Executor] = None,
+        min_batch_size: int = 64 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        if data_key_ttl <= 0:
+            raise ValueError("data_key_ttl must be greater than zero")
+        self.kms = kms
+        self.master_key_id = master_key_id
+        # As in EncryptionCodec, batches of at least min_batch_size bytes are
+        # encrypted and decrypted in the executor.
+        self.executor = executor
+        self.min_batch_size = min_batch_size
+        self._data_keys = _DataKeys(data_key_ttl, max_cached_keys, clock)
+        self._scope: _Scope = None
+
+    def with_context(self, context: SerializationContext) -> "EnvelopeEncryptionCodec":
+        codec = copy.copy(self)
+        if (
+            isinstance(
+                context, (WorkflowSerializationContext, ActivitySerializationContext)
+            )
+            and context.workflow_id
+        ):
+            codec._scope = (context.namespace, context.workflow_id)
+        else:
+            codec._scope = None
+        return codec
+
+    async def encode(self, payloads: Iterable[Payload]) -> List[Payload]:
+        payloads = list(payloads)
+        if not payloads:
+            return payloads
+        wrapped_key, cipher = await self._encrypting_key()
+        metadata = {
+            "encoding": _ENCODING,
+            "encryption-key-id": self.master_key_id.encode(),
+            "encryption-data-key": wrapped_key,
+        }
+        return await self._run(payloads, lambda: _encrypt(metadata, cipher, payloads))
+
+    async def decode(self, payloads: Iterable[Payload]) -> List[Payload]:
+        payloads = list(payloads)
+        wrapped_keys = {
+            (
+                p.metadata.get("encryption-key-id", b"").decode(),
+                p.metadata.get("encryption-data-key", b""),
+            )
+            for p in payloads
+            if p.metadata.get("encoding") == _ENCODING
+        }
+        resolved = await asyncio.gather(
+            *(self._decrypting_key(*key) for key in wrapped_keys)
+        )
+        ciphers = {
+            wrapped: cipher for (_, wrapped), cipher in zip(wrapped_keys, resolved)
+        }
+        return await self._run(payloads, lambda: _decrypt(ciphers, payloads))
+
+    async def _encrypting_key(self) -> Tuple[bytes, AESGCM]:
+        keys = self._data_keys
+        cached = keys.encrypting.get(self._scope)
+        if cached is not None:
+            return cached
+
+        async def generate() -> Tuple[bytes, AESGCM]:
+            data_key, wrapped = await self.kms.generate_data_key(self.master_key_id)
+            entry = (wrapped, AESGCM(data_key))
+            keys.encrypting.put(self._scope, entry)
+            # This process can decrypt what it just encrypted without asking
+            # the KMS to unwrap the key.
+            keys.decrypting.put(wrapped, entry[1])
+            return entry
+
+        return await _single_flight(keys.generating, self._scope, generate)
+
+    async def _decrypting_key(self, master_key_id: str, wrapped: bytes) -> AESGCM:
+        keys = self._data_keys
+        cached = keys.decrypting.get(wrapped)
+        if cached is not None:
+            return cached
+
+        async def unwrap() -> AESGCM:
+            cipher = AESGCM(await self.kms.decrypt_data_key(master_key_id, wrapped))
+            keys.decrypting.put(wrapped, cipher)
+            return cipher
+
+        return await _single_flight(keys.unwrapping, wrapped, unwrap)
+
+    async def _run(self, payloads: List[Payload], fn: Callable[[], _T]) -> _T:
+        if sum(p.ByteSize() for p in payloads) < self.min_batch_size:
+            return fn()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn)
+
+
+async def _single_flight(
+    in_flight: Dict[_K, "asyncio.Future[_V]"],
+    key: _K,
+    fetch: Callable[[], Awaitable[_V]],
+) -> _V:
+    # Concurrent batches that miss the cache for the same key share one KMS
+    # call instead of each making their own.
+    pending = in_flight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    future: "asyncio.Future[_V]" = asyncio.get_running_loop().create_future()
+    in_flight[key] = future
+    try:
+        result = await fetch()
+    except BaseException as err:
+        if isinstance(err, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(err)
+            # Mark it retrieved in case no other batch was waiting.
+            future.exception()
+        raise
+    finally:
+        del in_flight[key]
+    future.set_result(result)
+    return result
+
+
+def _encrypt(
+    metadata: Dict[str, bytes], cipher: AESGCM, payloads: List[Payload]
+) -> List[Payload]:
+    nonces = os.urandom(_NONCE_SIZE * len(payloads))
+    result: List[Payload] = []
+    for i, p in enumerate(payloads):
+        nonce = nonces[i * _NONCE_SIZE : (i + 1) * _NONCE_SIZE]
+        result.append(
+            Payload(
+                metadata=metadata,
+                data=nonce + cipher.encrypt(nonce, p.SerializeToString(), None),
+            )
+        )
+    return result
+
+
+def _decrypt(ciphers: Dict[bytes, AESGCM], payloads: List[Payload]) -> List[Payload]:
+    result: List[Payload] = []
+    for p in payloads:
+        if p.metadata.get("encoding") != _ENCODING:
+            result.append(p)
+            continue
+        cipher = ciphers[p.metadata.get("encryption-data-key", b"")]
+        data = cipher.decrypt(p.data[:_NONCE_SIZE], p.data[_NONCE_SIZE:], None)
+        result.append(Payload.FromString(data))
+    return result
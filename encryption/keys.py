@@ -0,0 +1,157 @@
+"""Key providers for EncryptionCodec.
+
+A key provider tells the codec which key id to encrypt new payloads with and
+resolves any key id found on an encrypted payload to its 256-bit AES key.
+Keeping every retired key resolvable lets the active key rotate while
+workflows encrypted under older keys are still running.
+
+Run as a script to create or rotate a keyring file for
+:class:`FileKeyProvider`:
+
+    uv run python -m encryption.keys rotate keyring.json
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, Mapping, Optional, Tuple
+
+
+class KeyProvider(ABC):
+    """Source of the keys :class:`~encryption.codec.EncryptionCodec` uses.
+
+    Both methods are awaited on the event loop, so providers backed by a
+    remote key service can do I/O without blocking it.
+    """
+
+    @abstractmethod
+    async def active_key_id(self) -> str:
+        """Return the id of the key new payloads are encrypted with."""
+
+    @abstractmethod
+    async def get_key(self, key_id: str) -> Optional[bytes]:
+        """Return the key for *key_id*, or ``None`` if it is unknown."""
+
+
+class StaticKeyProvider(KeyProvider):
+    """A fixed, in-memory keyring. Handy for tests and local development."""
+
+    def __init__(self, keys: Mapping[str, bytes], active_key_id: str) -> None:
+        if active_key_id not in keys:
+            raise ValueError(f"Active key ID {active_key_id} is not in the keyring.")
+        self._keys = dict(keys)
+        self._active_key_id = active_key_id
+
+    async def active_key_id(self) -> str:
+        return self._active_key_id
+
+    async def get_key(self, key_id: str) -> Optional[bytes]:
+        return self._keys.get(key_id)
+
+
+class FileKeyProvider(KeyProvider):
+    """A keyring read from a JSON file and reloaded when the file changes.
+
+    The file holds ``{"active": "<key id>", "keys": {"<key id>": "<base64
+    key>"}}``. Rewriting it, for example with ``python -m encryption.keys
+    rotate``, switches running workers and codec servers to the new active
+    key within ``reload_interval`` seconds, without a restart.
+    """
+
+    def __init__(self, path: str, *, reload_interval: float = 5.0) -> None:
+        self._path = path
+        self._reload_interval = reload_interval
+        self._mtime: Optional[float] = None
+        self._checked_at = time.monotonic()
+        self._active_key_id = ""
+        self._keys: Dict[str, bytes] = {}
+        self._apply(self._read_if_changed())
+
+    async def active_key_id(self) -> str:
+        await self._maybe_reload()
+        return self._active_key_id
+
+    async def get_key(self, key_id: str) -> Optional[bytes]:
+        await self._maybe_reload()
+        key = self._keys.get(key_id)
+        if key is None:
+            # A payload encrypted under a key that was added since the last
+            # check; look again right away rather than waiting for the
+            # interval to pass.
+            await self._reload()
+            key = self._keys.get(key_id)
+        return key
+
+    async def _maybe_reload(self) -> None:
+        if time.monotonic() - self._checked_at >= self._reload_interval:
+            await self._reload()
+
+    async def _reload(self) -> None:
+        # The file is read in a thread so the event loop is never blocked on
+        # disk, and the result is applied back on the loop.
+        self._checked_at = time.monotonic()
+        self._apply(await asyncio.to_thread(self._read_if_changed))
+
+    def _read_if_changed(self) -> Optional[Tuple[float, str, Dict[str, bytes]]]:
+        mtime = os.stat(self._path).st_mtime
+        if mtime == self._mtime:
+            return None
+        return (mtime, *read_keyring(self._path))
+
+    def _apply(self, keyring: Optional[Tuple[float, str, Dict[str, bytes]]]) -> None:
+        if keyring is not None:
+            self._mtime, self._active_key_id, self._keys = keyring
+
+
+def read_keyring(path: str) -> Tuple[str, Dict[str, bytes]]:
+    """Read a keyring file, returning the active key id and every key by id."""
+    with open(path) as f:
+        contents = json.load(f)
+    keys = {
+        key_id: base64.b64decode(encoded)
+        for key_id, encoded in contents["keys"].items()
+    }
+    if contents["active"] not in keys:
+        raise ValueError(f"Active key ID {contents['active']} is not in {path}.")
+    return contents["active"], keys
+
+
+def rotate_keyring(path: str) -> str:
+    """Add a new random key to the keyring at *path* and make it active.
+
+    Earlier keys are kept so payloads encrypted with them still decrypt. The
+    file is created if it does not exist. Returns the new key id.
+    """
+    keys: Dict[str, bytes] = {}
+    if os.path.exists(path):
+        _, keys = read_keyring(path)
+    key_id = f"key-{uuid.uuid4()}"
+    keys[key_id] = os.urandom(32)
+    # Write to a temporary file and rename it over the keyring, so readers
+    # never see a partially written file.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {
+                "active": key_id,
+                "keys": {k: base64.b64encode(v).decode() for k, v in keys.items()},
+            },
+            f,
+            indent=2,
+        )
+    os.replace(tmp_path, path)
+    return key_id
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage an encryption keyring file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rotate = subparsers.add_parser("rotate", help="add a new key and make it active")
+    rotate.add_argument("path")
+    args = parser.parse_args()
+    print(f"Active key is now {rotate_keyring(args.path)}")
@@ -0,0 +1,95 @@
+"""Measure how much codec work stalls the event loop, with and without ExecutorCodec.
+
+A ticker coroutine asks to wake up every millisecond while several concurrent
+tasks encode and then decode order batches from ``_sample_data``. The amount
+by which each tick oversleeps is the event-loop lag a worker's pollers and
+heartbeats would see while the codec runs. Lower is better.
+
+Run from the repository root with:
+
+    uv run --group external-storage python -m external_storage.benchmark_loop_lag
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Tuple
+
+import temporalio.converter
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import PayloadCodec
+
+from external_storage._sample_data import generate_orders
+from external_storage.codec import (
+    CompressionCodec,
+    ExecutorCodec,
+    GzipCompressor,
+    ZstdCompressor,
+)
+
+_TICK = 0.001
+
+
+async def _measure(
+    codec: PayloadCodec, payloads: List[Payload], tasks: int, rounds: int
+) -> Tuple[float, List[float]]:
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(_TICK)
+            lags.append(time.perf_counter() - start - _TICK)
+
+    async def work() -> None:
+        for _ in range(rounds):
+            decoded = await codec.decode(await codec.encode(payloads))
+            assert decoded == payloads
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(work() for _ in range(tasks)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker_task
+    return elapsed, lags
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--orders", type=int, default=100, help="orders per payload (~3 KiB each)"
+    )
+    parser.add_argument("--batch", type=int, default=4, help="payloads per encode call")
+    parser.add_argument("--tasks", type=int, default=4, help="concurrent codec tasks")
+    parser.add_argument("--rounds", type=int, default=5, help="round trips per task")
+    args = parser.parse_args()
+
+    converter = temporalio.converter.default().payload_converter
+    payloads = [
+        converter.to_payloads([generate_orders(f"BENCH-{i}", args.orders)])[0]
+        for i in range(args.batch)
+    ]
+    print(
+        f"{args.tasks} tasks x {args.rounds} round trips of {args.batch} payloads "
+        f"({sum(p.ByteSize() for p in payloads) / 1024:.0f} KiB per batch)"
+    )
+    print(f"  {'codec':<24} {'seconds':>8} {'p50 lag ms':>11} {'max lag ms':>11}")
+    for name, codec in [
+        ("gzip", CompressionCodec(GzipCompressor())),
+        ("gzip + executor", ExecutorCodec(CompressionCodec(GzipCompressor()))),
+        ("zstd", CompressionCodec(ZstdCompressor())),
+        ("zstd + executor", ExecutorCodec(CompressionCodec(ZstdCompressor()))),
+    ]:
+        elapsed, lags = asyncio.run(_measure(codec, payloads, args.tasks, args.rounds))
+        print(
+            f"  {name:<24} {elapsed:8.2f} {statistics.median(lags) * 1000:11.2f} "
+            f"{max(lags) * 1000:11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
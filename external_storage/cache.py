@@ -0,0 +1,141 @@
+"""In-process cache of decoded payloads for the codec server."""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from google.protobuf import json_format
+from temporalio.api.common.v1 import Payload
+from temporalio.api.sdk.v1 import ExternalStorageReference
+
+_ReferenceKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class DecodedPayloadCache:
+    """Byte-bounded LRU cache of decoded payloads keyed by storage reference.
+
+    A storage reference always resolves to the same bytes, so an entry only
+    goes stale if the object behind it is deleted, for example by a bucket
+    lifecycle rule. ``ttl`` bounds how long the cache keeps serving a
+    payload after that.
+
+    Entries are the payloads after storage retrieval *and* codec decoding, so
+    a hit skips both. Use one cache per :func:`payload_routes` call: the same
+    reference decodes differently under a different codec.
+
+    The cache is not thread-safe; it is meant to be used from the codec
+    server's event loop.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 600.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Construct the cache.
+
+        Args:
+            max_bytes: Maximum total serialized size of cached payloads.
+                Payloads larger than this are never cached. Defaults to
+                67108864 (64 MiB).
+            ttl: Seconds an entry is served after it is cached. Defaults to
+                600 (10 minutes).
+            clock: Monotonic time source, in seconds.
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than zero")
+        if ttl <= 0:
+            raise ValueError("ttl must be greater than zero")
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._clock = clock
+        # Values are (payload, size, expires_at).
+        self._entries: OrderedDict[_ReferenceKey, Tuple[Payload, int, float]] = (
+            OrderedDict()
+        )
+        self._size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached payloads."""
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total serialized size of the cached payloads."""
+        return self._size_bytes
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache, or 0.0 before any lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return the counters and current size, for logging or a metrics endpoint."""
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def get(self, reference: Payload) -> Optional[Payload]:
+        """Return a copy of the payload cached for *reference*, or ``None``."""
+        key = _reference_key(reference)
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Hand out a copy so callers mutating the result cannot corrupt the
+        # cached entry.
+        payload = Payload()
+        payload.CopyFrom(entry[0])
+        return payload
+
+    def put(self, reference: Payload, payload: Payload) -> None:
+        """Cache *payload* as the decoded form of *reference*."""
+        size = payload.ByteSize()
+        if size > self._max_bytes:
+            return
+        key = _reference_key(reference)
+        self._remove(key)
+        cached = Payload()
+        cached.CopyFrom(payload)
+        self._entries[key] = (cached, size, self._clock() + self._ttl)
+        self._size_bytes += size
+        while self._size_bytes > self._max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._size_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached payloads. Counters are left untouched."""
+        self._entries.clear()
+        self._size_bytes = 0
+
+    def _remove(self, key: _ReferenceKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry[1]
+
+
+def _reference_key(reference: Payload) -> _ReferenceKey:
+    # Key on the parsed claim rather than the payload bytes, so references
+    # serialized with a different JSON field order still share an entry.
+    claim = json_format.Parse(reference.data, ExternalStorageReference())
+    return claim.driver_name, tuple(sorted(claim.claim_data.items()))
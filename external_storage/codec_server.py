@@ -11,32 +11,58 @@ configurations per namespace — this sample only configures one ("default").
 To use this server, set the Web UI's Remote Codec Endpoint (Settings → Data
 Encoder) to the URL printed when the server starts.
 
+Decoding is CPU-bound, so one process tops out at one core. ``--workers N``
+binds the listening socket once and pre-forks N worker processes that all
+accept on it, each with its own S3 client and connection pool. ``GET
+/health`` reports per-namespace request latency for the worker that answers.
+
 Deliberately left out for sample simplicity: authentication (would slot in
-as a middleware between CORS and the dispatcher), configurable listen
-address/port, and structured logging/tracing.
+as a middleware between CORS and the dispatcher) and structured
+logging/tracing.
 """
 
+import argparse
 import asyncio
 import logging
-from typing import Awaitable, Callable, Iterable, Mapping
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Mapping, Tuple
 
 import aioboto3
+from aiobotocore.config import AioConfig
 from aiohttp import hdrs, web
+from aiohttp.typedefs import Middleware
 from temporalio.contrib.aws.s3driver import S3StorageDriver
-from temporalio.contrib.aws.s3driver.aioboto3 import new_aioboto3_client
 from temporalio.converter import ExternalStorage
 
-from external_storage.codec import CompressionCodec
+from external_storage.cache import DecodedPayloadCache
+from external_storage.codec import CompressionCodec, ExecutorCodec
 from external_storage.handler import payload_routes
+from external_storage.parallel_s3 import new_parallel_aioboto3_client
 from external_storage.worker import (
     S3_ACCESS_KEY,
     S3_BUCKET,
     S3_ENDPOINT,
+    S3_MAX_CONCURRENCY,
+    S3_PART_SIZE,
     S3_SECRET_KEY,
 )
 
 WEB_UI_ORIGIN = "http://localhost:8233"
 
+# Payloads one /decode or /download request fetches at once.
+DECODE_MAX_CONCURRENCY = 8
+# Each of those fetches may itself issue S3_MAX_CONCURRENCY ranged GETs, so
+# size each worker's connection pool for both, instead of botocore's 10.
+S3_MAX_POOL_CONNECTIONS = DECODE_MAX_CONCURRENCY * S3_MAX_CONCURRENCY
+# Seconds a stopping worker waits for in-flight requests to finish.
+SHUTDOWN_TIMEOUT = 30.0
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,31 +71,28 @@ async def cors_middleware(
     request: web.Request,
     handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
 ) -> web.StreamResponse:
-    """Add CORS support so the Web UI can call the codec server from its origin."""
-    allow_origin = request.headers.get(hdrs.ORIGIN) == WEB_UI_ORIGIN
-
-    response: web.StreamResponse
-    if request.method == "OPTIONS":
-        response = web.Response()
-        if allow_origin:
-            response.headers[hdrs.ACCESS_CONTROL_ALLOW_METHODS] = "POST"
-            response.headers[hdrs.ACCESS_CONTROL_ALLOW_HEADERS] = (
-                "content-type,x-namespace"
-            )
-    else:
-        # Catch HTTPException so CORS headers also land on error responses
-        # (e.g. the dispatcher's 404 for an unknown namespace).
-        try:
-            response = await handler(request)
-        except web.HTTPException as exc:
-            response = exc
+    """Answer CORS preflight requests so the Web UI can call the codec server."""
+    if request.method != "OPTIONS":
+        return await handler(request)
+    response = web.Response()
+    if request.headers.get(hdrs.ORIGIN) == WEB_UI_ORIGIN:
+        response.headers[hdrs.ACCESS_CONTROL_ALLOW_METHODS] = "POST"
+        response.headers[hdrs.ACCESS_CONTROL_ALLOW_HEADERS] = "content-type,x-namespace"
+    return response
 
-    if allow_origin:
-        response.headers[hdrs.ACCESS_CONTROL_ALLOW_ORIGIN] = WEB_UI_ORIGIN
 
-    if isinstance(response, web.HTTPException):
-        raise response
-    return response
+async def cors_on_response_prepare(
+    request: web.Request, response: web.StreamResponse
+) -> None:
+    """Allow the Web UI's origin on every response just before headers are sent.
+
+    Doing this when the response is prepared, rather than after the handler
+    returns, also covers error responses (e.g. the dispatcher's 404 for an
+    unknown namespace) and streamed responses whose headers are already on
+    the wire by the time the handler returns.
+    """
+    if request.headers.get(hdrs.ORIGIN) == WEB_UI_ORIGIN:
+        response.headers[hdrs.ACCESS_CONTROL_ALLOW_ORIGIN] = WEB_UI_ORIGIN
 
 
 def build_namespace_dispatcher(
@@ -113,12 +136,142 @@ def build_namespace_dispatcher(
     return dispatch_by_namespace
 
 
-async def main() -> None:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+@dataclass
+class _EndpointMetrics:
+    requests: int
+    errors: int
+    latencies: Deque[float]  # most recent, in seconds
+
+
+class RequestMetrics:
+    """Request counts and recent latencies per namespace and endpoint.
+
+    Each worker process keeps its own, so ``/health`` reports the worker that
+    happened to answer it.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self._window = window
+        self._started = time.monotonic()
+        self._by_endpoint: Dict[Tuple[str, str], _EndpointMetrics] = {}
+
+    def record(self, namespace: str, path: str, seconds: float, error: bool) -> None:
+        entry = self._by_endpoint.get((namespace, path))
+        if entry is None:
+            entry = self._by_endpoint[(namespace, path)] = _EndpointMetrics(
+                requests=0, errors=0, latencies=deque(maxlen=self._window)
+            )
+        entry.requests += 1
+        entry.errors += int(error)
+        entry.latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        namespaces: Dict[str, Dict[str, Any]] = {}
+        for (namespace, path), entry in sorted(self._by_endpoint.items()):
+            ordered = sorted(entry.latencies)
+            namespaces.setdefault(namespace, {})[path] = {
+                "requests": entry.requests,
+                "errors": entry.errors,
+                "p50_ms": _percentile(ordered, 0.50) * 1000,
+                "p99_ms": _percentile(ordered, 0.99) * 1000,
+                "max_ms": ordered[-1] * 1000,
+            }
+        return {
+            "uptime_seconds": time.monotonic() - self._started,
+            "namespaces": namespaces,
+        }
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def build_metrics_middleware(
+    metrics: RequestMetrics, namespaces: Iterable[str]
+) -> Middleware:
+    """Build a middleware that records the latency of every codec request.
+
+    Requests for namespaces not in ``namespaces`` are recorded together
+    under ``"<unknown>"``, so clients cannot grow the metrics without bound.
+    """
+    known = frozenset(namespaces)
+
+    @web.middleware
+    async def metrics_middleware(
+        request: web.Request,
+        handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+    ) -> web.StreamResponse:
+        if request.method != "POST":
+            return await handler(request)
+        start = time.perf_counter()
+        error = True
+        try:
+            response = await handler(request)
+            error = response.status >= 500
+            return response
+        except web.HTTPException as exc:
+            error = exc.status >= 500
+            raise
+        finally:
+            # Streamed responses are fully written by the time the handler
+            # returns, so this is the end-to-end latency the Web UI sees.
+            namespace = request.headers.get("X-Namespace", "")
+            metrics.record(
+                namespace if namespace in known else "<unknown>",
+                request.path,
+                time.perf_counter() - start,
+                error,
+            )
+
+    return metrics_middleware
+
+
+def build_app(
+    routes_by_namespace: Mapping[str, Iterable[web.RouteDef]],
+    cache: DecodedPayloadCache,
+) -> web.Application:
+    """Build the codec server application around the per-namespace routes.
+
+    ``cache`` is the decoded payload cache the routes share; ``/health``
+    reports its stats next to the request metrics.
+    """
+    dispatch_by_namespace = build_namespace_dispatcher(routes_by_namespace)
+
+    metrics = RequestMetrics()
+
+    async def health_handler(request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "status": "ok",
+                "pid": os.getpid(),
+                **metrics.snapshot(),
+                "cache": cache.stats(),
+            }
+        )
+
+    app = web.Application(
+        middlewares=[
+            cors_middleware,
+            build_metrics_middleware(metrics, routes_by_namespace),
+        ]
+    )
+    app.on_response_prepare.append(cors_on_response_prepare)
+    app.add_routes(
+        [
+            web.post("/encode", dispatch_by_namespace),
+            web.post("/decode", dispatch_by_namespace),
+            web.post("/download", dispatch_by_namespace),
+            web.get("/health", health_handler),
+        ]
     )
+    return app
+
 
+async def serve(sock: socket.socket) -> None:
+    """Serve the codec server on an already-listening socket until SIGTERM/SIGINT."""
+    # Each worker process builds its own session and client: aiobotocore's
+    # connection pool is bound to the event loop that created it, so it
+    # cannot be shared across a fork.
     session = aioboto3.Session()
     async with session.client(
         "s3",
@@ -126,9 +279,14 @@ async def main() -> None:
         aws_access_key_id=S3_ACCESS_KEY,
         aws_secret_access_key=S3_SECRET_KEY,
         region_name="us-east-1",
+        config=AioConfig(max_pool_connections=S3_MAX_POOL_CONNECTIONS),
     ) as s3_client:
         driver = S3StorageDriver(
-            client=new_aioboto3_client(s3_client),
+            client=new_parallel_aioboto3_client(
+                s3_client,
+                part_size=S3_PART_SIZE,
+                max_concurrency=S3_MAX_CONCURRENCY,
+            ),
             bucket=S3_BUCKET,
         )
 
@@ -137,39 +295,136 @@ async def main() -> None:
         # chain and/or storage backend. Each value is a list of routes
         # produced by ``payload_routes``; the dispatcher reads the
         # X-Namespace header to pick the right one per request.
-        dispatch_by_namespace = build_namespace_dispatcher(
-            {
-                "default": payload_routes(
-                    external_storage=ExternalStorage(drivers=[driver]),
-                    prestorage_codec=CompressionCodec(),
-                ),
-            }
-        )
+        cache = DecodedPayloadCache()
+        routes_by_namespace = {
+            "default": payload_routes(
+                external_storage=ExternalStorage(drivers=[driver]),
+                prestorage_codec=ExecutorCodec(CompressionCodec()),
+                stream_responses=True,
+                max_concurrency=DECODE_MAX_CONCURRENCY,
+                cache=cache,
+            ),
+        }
+        app = build_app(routes_by_namespace, cache)
 
-        app = web.Application(middlewares=[cors_middleware])
-        app.add_routes(
-            [
-                web.post("/encode", dispatch_by_namespace),
-                web.post("/decode", dispatch_by_namespace),
-                web.post("/download", dispatch_by_namespace),
-            ]
-        )
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
 
-        runner = web.AppRunner(app)
+        # Cleanup stops accepting connections, then waits up to
+        # SHUTDOWN_TIMEOUT for in-flight requests to finish.
+        runner = web.AppRunner(app, shutdown_timeout=SHUTDOWN_TIMEOUT)
         await runner.setup()
-        site = web.TCPSite(runner, "127.0.0.1", 8081)
-        await site.start()
-        print("Codec server running at http://127.0.0.1:8081, ctrl+c to exit")
+        await web.SockSite(runner, sock).start()
+        logger.info("worker %d serving", os.getpid())
         try:
-            await asyncio.Event().wait()
-        except (KeyboardInterrupt, asyncio.CancelledError):
-            pass
+            await stop.wait()
         finally:
             await runner.cleanup()
+            logger.info(
+                "worker %d decoded payload cache: %s", os.getpid(), cache.stats()
+            )
+
+
+def _run_worker(sock: socket.socket) -> None:
+    # The forked worker inherits the supervisor's handlers. serve() installs
+    # its own for SIGTERM and SIGINT. Scaling signals are meant for the
+    # supervisor and would stop the worker by default, so ignore them.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTTIN, signal.SIG_IGN)
+    signal.signal(signal.SIGTTOU, signal.SIG_IGN)
+    asyncio.run(serve(sock))
+
+
+def supervise(sock: socket.socket, workers: int) -> None:
+    """Pre-fork ``workers`` processes that all accept on ``sock``, and keep them running.
+
+    The kernel hands each new connection on the shared socket to one of the
+    workers blocked in ``accept``. Workers that exit unexpectedly are
+    replaced. SIGTTIN adds a worker and SIGTTOU retires the newest one
+    gracefully, as in gunicorn. SIGTERM or SIGINT drain every worker and exit.
+    """
+    context = multiprocessing.get_context("fork")
+    processes: List[multiprocessing.process.BaseProcess] = []
+    retiring: List[multiprocessing.process.BaseProcess] = []
+    target = workers
+    stopping = False
+
+    def on_stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+
+    def on_scale(signum: int, frame: Any) -> None:
+        nonlocal target
+        target = max(1, target + (1 if signum == signal.SIGTTIN else -1))
+
+    signal.signal(signal.SIGTERM, on_stop)
+    signal.signal(signal.SIGINT, on_stop)
+    signal.signal(signal.SIGTTIN, on_scale)
+    signal.signal(signal.SIGTTOU, on_scale)
+
+    while not stopping:
+        for process in [p for p in processes if not p.is_alive()]:
+            processes.remove(process)
+            if process.exitcode != 0:
+                logger.warning(
+                    "worker %d exited with %s, replacing it",
+                    process.pid,
+                    process.exitcode,
+                )
+        while len(processes) < target:
+            process = context.Process(target=_run_worker, args=(sock,), daemon=True)
+            process.start()
+            processes.append(process)
+        while len(processes) > target:
+            process = processes.pop()
+            logger.info("retiring worker %d", process.pid)
+            process.terminate()
+            # Reaped on a later pass; a retired worker may still be
+            # finishing its in-flight requests.
+            retiring.append(process)
+        for process in [p for p in retiring if not p.is_alive()]:
+            retiring.remove(process)
+        time.sleep(0.2)
+
+    for process in processes + retiring:
+        process.terminate()
+    for process in processes + retiring:
+        process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="External storage codec server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes sharing the listening socket (Unix only when > 1)",
+    )
+    args = parser.parse_args()
+    if args.workers <= 0:
+        parser.error("--workers must be greater than zero")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+
+    # Bind before forking so every worker accepts on the same socket.
+    sock = socket.create_server((args.host, args.port), backlog=1024)
+    print(
+        f"Codec server running at http://{args.host}:{args.port} with "
+        f"{args.workers} worker(s), ctrl+c to exit"
+    )
+    if args.workers == 1:
+        asyncio.run(serve(sock))
+    else:
+        supervise(sock, args.workers)
 
 
 if __name__ == "__main__":
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        pass
+    main()
@@ -13,20 +13,34 @@ expected by the Web UI is:
   separate from ``/decode`` so the Web UI can defer fetching potentially
   large blobs until a user explicitly asks for them.
 
+Every endpoint also accepts and returns a binary-serialized ``Payloads``
+message as ``application/x-protobuf``. The request body's ``Content-Type``
+selects how it is parsed, and the ``Accept`` header selects the response
+format, defaulting to JSON. Binary avoids base64-inflating payload bytes and
+the cost of JSON (de)serialization, which matters for bulk decoding from the
+CLI.
+
 The :func:`payload_routes` factory builds these three route definitions
 configured with an :class:`ExternalStorage` plus optional codec layers that
 match the client's ``DataConverter`` setup."""
 
-from typing import List, Optional
+import asyncio
+from collections import deque
+from typing import Any, Callable, Coroutine, Deque, List, Optional
 
-from aiohttp import web
+from aiohttp import hdrs, web
 from google.protobuf import json_format
 from temporalio.api.common.v1 import Payload, Payloads
 from temporalio.api.sdk.v1 import ExternalStorageReference
 from temporalio.converter import ExternalStorage, PayloadCodec
 
+from external_storage.cache import DecodedPayloadCache
+
 _REFERENCE_MESSAGE_TYPE = ExternalStorageReference.DESCRIPTOR.full_name.encode()
 
+_JSON_CONTENT_TYPE = "application/json"
+_PROTOBUF_CONTENT_TYPE = "application/x-protobuf"
+
 
 def _is_storage_reference(payload: Payload) -> bool:
     """A payload is an external-storage reference iff its metadata identifies
@@ -38,10 +52,33 @@ def _is_storage_reference(payload: Payload) -> bool:
     )
 
 
+def _accepts_protobuf(req: web.Request) -> bool:
+    """Whether the ``Accept`` header prefers binary protobuf over JSON.
+
+    The first acceptable media range that names either format wins, so
+    ``application/x-protobuf, application/json`` selects protobuf and a
+    missing header or ``*/*`` selects JSON.
+    """
+    for media_range in req.headers.get(hdrs.ACCEPT, "").split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if "q=0" in params or "q=0.0" in params:
+            continue
+        if media_type == _PROTOBUF_CONTENT_TYPE:
+            return True
+        if media_type in (_JSON_CONTENT_TYPE, "application/*", "*/*"):
+            return False
+    return False
+
+
 def payload_routes(
     external_storage: ExternalStorage,
     prestorage_codec: Optional[PayloadCodec] = None,
     poststorage_codec: Optional[PayloadCodec] = None,
+    *,
+    stream_responses: bool = False,
+    max_concurrency: int = 8,
+    memory_budget: int = 64 * 1024 * 1024,
+    cache: Optional[DecodedPayloadCache] = None,
 ) -> List[web.RouteDef]:
     """Build aiohttp routes for the codec server's /encode, /decode, and /download endpoints.
 
@@ -64,9 +101,30 @@ def payload_routes(
       example). On encode it runs after offload; on decode it runs first
       (to strip the proxy envelope before storage retrieval).
 
+    With ``stream_responses`` set, ``/decode`` and ``/download`` decode each
+    payload on its own and write it to a chunked response as soon as it and
+    every payload before it are ready, instead of decoding the whole batch and
+    serializing one response at the end. The body is the same ``Payloads``
+    message in either format, so clients do not need to know. At most ``max_concurrency``
+    payloads are fetched and decoded at once, and no new fetch starts while
+    the decoded payloads waiting to be written, plus the in-flight fetches
+    estimated at the largest payload seen so far, would exceed
+    ``memory_budget`` bytes. A single payload that decodes to more than
+    ``memory_budget`` bytes fails the request: with 413 if nothing has been
+    written yet, otherwise by closing the connection mid-body.
+
+    With a ``cache``, ``/decode`` and ``/download`` look each storage
+    reference up before fetching it and cache what it decodes to, so repeated
+    views of the same workflow cost no storage round trips. References left
+    in place by ``preserveStorageRefs`` bypass the cache.
+
     Register the result on any :class:`aiohttp.web.Application` via
     :meth:`aiohttp.web.Application.add_routes`.
     """
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be greater than zero")
+    if memory_budget <= 0:
+        raise ValueError("memory_budget must be greater than zero")
 
     async def _decode_non_refs(payloads: List[Payload]) -> List[Payload]:
         # Storage references are claim-check protos with their own encoding —
@@ -83,17 +141,133 @@ def payload_routes(
             result[i] = p
         return result
 
+    async def _retrieve_and_decode(payloads: List[Payload]) -> List[Payload]:
+        # Resolve storage references through the cache where possible, then
+        # fetch and decode everything that missed in one batch.
+        result = list(payloads)
+        missed_idx: List[int] = []
+        for i, p in enumerate(payloads):
+            if cache is not None and _is_storage_reference(p):
+                cached = cache.get(p)
+                if cached is not None:
+                    result[i] = cached
+                    continue
+            missed_idx.append(i)
+        if not missed_idx:
+            return result
+        missed = [payloads[i] for i in missed_idx]
+        retrieved = await external_storage._retrieve_payload_sequence(missed)
+        decoded = await _decode_non_refs(retrieved)
+        for i, p in zip(missed_idx, decoded):
+            if cache is not None and _is_storage_reference(payloads[i]):
+                cache.put(payloads[i], p)
+            result[i] = p
+        return result
+
     async def _read_payloads(req: web.Request) -> List[Payload]:
-        assert req.content_type == "application/json"
-        proto = json_format.Parse(await req.read(), Payloads())
+        if req.content_type == _PROTOBUF_CONTENT_TYPE:
+            proto = Payloads.FromString(await req.read())
+        elif req.content_type == _JSON_CONTENT_TYPE:
+            proto = json_format.Parse(await req.read(), Payloads())
+        else:
+            raise web.HTTPUnsupportedMediaType(
+                text=f"expected {_JSON_CONTENT_TYPE} or {_PROTOBUF_CONTENT_TYPE}"
+            )
         return list(proto.payloads)
 
-    def _write_payloads(payloads: List[Payload]) -> web.Response:
+    def _write_payloads(req: web.Request, payloads: List[Payload]) -> web.Response:
+        if _accepts_protobuf(req):
+            return web.Response(
+                content_type=_PROTOBUF_CONTENT_TYPE,
+                body=Payloads(payloads=payloads).SerializeToString(),
+            )
         return web.Response(
-            content_type="application/json",
+            content_type=_JSON_CONTENT_TYPE,
             text=json_format.MessageToJson(Payloads(payloads=payloads)),
         )
 
+    async def _stream_payloads(
+        req: web.Request,
+        payloads: List[Payload],
+        decode: Callable[[Payload], Coroutine[Any, Any, Payload]],
+    ) -> web.StreamResponse:
+        # Tasks are kept in request order; only the head is ever written, so
+        # the response preserves the order of the request.
+        pending: Deque["asyncio.Task[Payload]"] = deque()
+        next_index = 0
+        largest = 0
+        response: Optional[web.StreamResponse] = None
+        # A serialized Payloads message is its repeated field's entries laid
+        # end to end, so concatenating single-entry messages gives the same
+        # bytes as serializing the whole batch at once.
+        binary = _accepts_protobuf(req)
+
+        def reserved_bytes() -> int:
+            # Finished payloads count at their real size; running ones at the
+            # largest size seen so far.
+            return sum(
+                task.result().ByteSize()
+                if task.done() and not task.cancelled() and not task.exception()
+                else largest
+                for task in pending
+            )
+
+        try:
+            while pending or next_index < len(payloads):
+                while (
+                    next_index < len(payloads)
+                    and len(pending) < max_concurrency
+                    and (not pending or reserved_bytes() < memory_budget)
+                ):
+                    pending.append(asyncio.create_task(decode(payloads[next_index])))
+                    next_index += 1
+                payload = await pending.popleft()
+                size = payload.ByteSize()
+                if size > memory_budget:
+                    message = (
+                        f"payload decodes to {size} bytes, over the per-request "
+                        f"memory budget of {memory_budget} bytes"
+                    )
+                    if response is None:
+                        raise web.HTTPRequestEntityTooLarge(
+                            max_size=memory_budget, actual_size=size, text=message
+                        )
+                    raise RuntimeError(message)
+                largest = max(largest, size)
+                if response is None:
+                    response = web.StreamResponse(
+                        headers={
+                            hdrs.CONTENT_TYPE: _PROTOBUF_CONTENT_TYPE
+                            if binary
+                            else _JSON_CONTENT_TYPE
+                        }
+                    )
+                    response.enable_chunked_encoding()
+                    await response.prepare(req)
+                    if not binary:
+                        await response.write(b'{"payloads": [')
+                elif not binary:
+                    await response.write(b", ")
+                if binary:
+                    await response.write(
+                        Payloads(payloads=[payload]).SerializeToString()
+                    )
+                else:
+                    await response.write(
+                        json_format.MessageToJson(payload, indent=None).encode()
+                    )
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if response is None:
+            return _write_payloads(req, [])
+        if not binary:
+            await response.write(b"]}")
+        await response.write_eof()
+        return response
+
     async def encode_handler(req: web.Request) -> web.Response:
         payloads = await _read_payloads(req)
         # Encode pipeline mirrors what a client-side DataConverter does:
@@ -111,10 +285,24 @@ def payload_routes(
         payloads = await external_storage._store_payload_sequence(payloads)
         if poststorage_codec is not None:
             payloads = await poststorage_codec.encode(payloads)
-        return _write_payloads(payloads)
+        return _write_payloads(req, payloads)
 
-    async def decode_handler(req: web.Request) -> web.Response:
+    async def decode_handler(req: web.Request) -> web.StreamResponse:
         payloads = await _read_payloads(req)
+        preserve_refs = req.query.get("preserveStorageRefs", "false").lower() == "true"
+        if stream_responses:
+
+            async def decode_one(payload: Payload) -> Payload:
+                if poststorage_codec is not None:
+                    [payload] = await poststorage_codec.decode([payload])
+                if preserve_refs:
+                    [payload] = await _decode_non_refs([payload])
+                else:
+                    [payload] = await _retrieve_and_decode([payload])
+                return payload
+
+            return await _stream_payloads(req, payloads, decode_one)
+
         # Decode pipeline is the encode pipeline in reverse:
         #   1. post-storage codec decodes (strip proxy envelope, if any)
         #   2. external storage retrieves any references in-band
@@ -125,13 +313,13 @@ def payload_routes(
         # raw references themselves (a debug view, an "audit who fetched
         # what" log, etc.). When unset, default behavior fetches from
         # storage so the user sees the payload as the workflow saw it.
-        preserve_refs = req.query.get("preserveStorageRefs", "false").lower() == "true"
-        if not preserve_refs:
-            payloads = await external_storage._retrieve_payload_sequence(payloads)
-        payloads = await _decode_non_refs(payloads)
-        return _write_payloads(payloads)
+        if preserve_refs:
+            payloads = await _decode_non_refs(payloads)
+        else:
+            payloads = await _retrieve_and_decode(payloads)
+        return _write_payloads(req, payloads)
 
-    async def download_handler(req: web.Request) -> web.Response:
+    async def download_handler(req: web.Request) -> web.StreamResponse:
         # /download exists as a separate endpoint from /decode because
         # resolving an external-storage reference can be expensive (network
         # round-trip, potentially large blob). The Web UI uses /download as
@@ -143,9 +331,14 @@ def payload_routes(
             return web.Response(
                 status=400, text="all payloads must be storage references"
             )
-        retrieved = await external_storage._retrieve_payload_sequence(payloads)
-        decoded = await _decode_non_refs(retrieved)
-        return _write_payloads(decoded)
+        if stream_responses:
+
+            async def download_one(payload: Payload) -> Payload:
+                [payload] = await _retrieve_and_decode([payload])
+                return payload
+
+            return await _stream_payloads(req, payloads, download_one)
+        return _write_payloads(req, await _retrieve_and_decode(payloads))
 
     return [
         web.post("/encode", encode_handler),
@@ -0,0 +1,186 @@
+"""S3 storage driver client that moves large payloads over parallel connections.
+
+The aioboto3 adapter shipped with the SDK uploads each payload with
+``upload_fileobj`` and downloads it with one ``GetObject``, so a payload of
+tens of MiB travels over a single TCP stream. This client splits payloads
+larger than ``part_size`` into a multipart upload with up to
+``max_concurrency`` parts in flight, and downloads them with the same number
+of concurrent ranged GETs. Objects written this way are ordinary S3 objects,
+so they can be read by any other client.
+"""
+
+import asyncio
+import re
+from collections.abc import Mapping
+from typing import Awaitable, Sequence, Tuple, TypeVar
+
+from botocore.exceptions import ClientError
+from temporalio.contrib.aws.s3driver import S3StorageDriverClient
+from types_aiobotocore_s3.client import S3Client
+
+# S3 rejects multipart parts smaller than this, except the last one.
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+_CONTENT_RANGE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+_T = TypeVar("_T")
+
+
+class _ParallelS3StorageDriverClient(S3StorageDriverClient):
+    """Wraps an aioboto3 S3 client to upload and download large objects in parts."""
+
+    def __init__(
+        self,
+        client: S3Client,
+        *,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 8,
+    ) -> None:
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than zero")
+        self._client = client
+        self._part_size = part_size
+        self._max_concurrency = max_concurrency
+
+    def describe(self) -> Mapping[str, str]:
+        region = self._client.meta.region_name
+        return {"client_region": region} if region else {}
+
+    async def object_exists(self, *, bucket: str, key: str) -> bool:
+        try:
+            await self._client.head_object(Bucket=bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "404":
+                return False
+            raise
+
+    async def put_object(self, *, bucket: str, key: str, data: bytes) -> None:
+        if len(data) <= self._part_size:
+            await self._client.put_object(Bucket=bucket, Key=key, Body=data)
+            return
+
+        upload = await self._client.create_multipart_upload(Bucket=bucket, Key=key)
+        upload_id = upload["UploadId"]
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def upload_part(part_number: int, start: int) -> Tuple[int, str]:
+            async with semaphore:
+                response = await self._client.upload_part(
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=data[start : start + self._part_size],
+                )
+            return part_number, response["ETag"]
+
+        try:
+            parts = await _gather_or_cancel(
+                [
+                    upload_part(part_number, start)
+                    for part_number, start in enumerate(
+                        range(0, len(data), self._part_size), start=1
+                    )
+                ]
+            )
+            await self._client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": part_number, "ETag": etag}
+                        for part_number, etag in parts
+                    ]
+                },
+            )
+        except BaseException:
+            # Abort so the uploaded parts do not linger and accrue storage.
+            await asyncio.shield(
+                self._client.abort_multipart_upload(
+                    Bucket=bucket, Key=key, UploadId=upload_id
+                )
+            )
+            raise
+
+    async def get_object(self, *, bucket: str, key: str) -> bytes:
+        # The first ranged GET also reports the object's total size, so small
+        # objects still take a single request.
+        first = await self._client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes=0-{self._part_size - 1}"
+        )
+        first_bytes = await first["Body"].read()
+        match = _CONTENT_RANGE.fullmatch(first.get("ContentRange", ""))
+        if match is None:
+            # The server ignored the range and sent the whole object.
+            return first_bytes
+        size = int(match.group(1))
+        if size <= len(first_bytes):
+            return first_bytes
+
+        # Pin the remaining ranges to the version the first one came from.
+        etag = first["ETag"]
+        buffer = bytearray(size)
+        buffer[: len(first_bytes)] = first_bytes
+        del first_bytes
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def get_range(start: int) -> None:
+            end = min(start + self._part_size, size)
+            async with semaphore:
+                response = await self._client.get_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Range=f"bytes={start}-{end - 1}",
+                    IfMatch=etag,
+                )
+                chunk = await response["Body"].read()
+            if len(chunk) != end - start:
+                raise RuntimeError(
+                    f"Ranged GET returned {len(chunk)} bytes for bytes={start}-{end - 1}"
+                )
+            buffer[start:end] = chunk
+
+        await _gather_or_cancel(
+            [
+                get_range(start)
+                for start in range(self._part_size, size, self._part_size)
+            ]
+        )
+        return bytes(buffer)
+
+
+async def _gather_or_cancel(aws: Sequence[Awaitable[_T]]) -> list[_T]:
+    """Run awaitables concurrently, cancelling remaining tasks on failure."""
+    if not aws:
+        return []
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def new_parallel_aioboto3_client(
+    client: S3Client,
+    *,
+    part_size: int = 8 * 1024 * 1024,
+    max_concurrency: int = 8,
+) -> S3StorageDriverClient:
+    """Create an S3 storage driver client that transfers large payloads in parts.
+
+    Args:
+        client: An aioboto3 S3 client.
+        part_size: Size of each multipart upload part and ranged GET. Payloads
+            up to this size use a single request. Must be at least 5 MiB.
+        max_concurrency: Maximum parts of one payload in flight at once.
+    """
+    return _ParallelS3StorageDriverClient(
+        client, part_size=part_size, max_concurrency=max_concurrency
+    )
@@ -6,15 +6,17 @@ import aioboto3
 import temporalio.converter
 from temporalio.client import Client
 from temporalio.contrib.aws.s3driver import S3StorageDriver
-from temporalio.contrib.aws.s3driver.aioboto3 import new_aioboto3_client
 from temporalio.converter import ExternalStorage
 from temporalio.envconfig import ClientConfig
 
 from external_storage.codec import CompressionCodec
+from external_storage.parallel_s3 import new_parallel_aioboto3_client
 from external_storage.worker import (
     S3_ACCESS_KEY,
     S3_BUCKET,
     S3_ENDPOINT,
+    S3_MAX_CONCURRENCY,
+    S3_PART_SIZE,
     S3_SECRET_KEY,
     TASK_QUEUE,
 )
@@ -33,7 +35,11 @@ async def main() -> None:
         region_name="us-east-1",
     ) as s3_client:
         driver = S3StorageDriver(
-            client=new_aioboto3_client(s3_client),
+            client=new_parallel_aioboto3_client(
+                s3_client,
+                part_size=S3_PART_SIZE,
+                max_concurrency=S3_MAX_CONCURRENCY,
+            ),
             bucket=S3_BUCKET,
         )
 
@@ -5,12 +5,12 @@ import aioboto3
 import temporalio.converter
 from temporalio.client import Client
 from temporalio.contrib.aws.s3driver import S3StorageDriver
-from temporalio.contrib.aws.s3driver.aioboto3 import new_aioboto3_client
 from temporalio.converter import ExternalStorage
 from temporalio.envconfig import ClientConfig
 from temporalio.worker import Worker
 
-from external_storage.codec import CompressionCodec
+from external_storage.codec import CompressionCodec, ExecutorCodec
+from external_storage.parallel_s3 import new_parallel_aioboto3_client
 from external_storage.workflows import (
     ProcessOrderBatchWorkflow,
     fetch_orders,
@@ -21,6 +21,10 @@ S3_ENDPOINT = "http://localhost:5000"
 S3_BUCKET = "temporal-payloads"
 S3_ACCESS_KEY = "test"
 S3_SECRET_KEY = "test"
+# Payloads larger than S3_PART_SIZE are uploaded as a multipart upload and
+# downloaded with ranged GETs, up to S3_MAX_CONCURRENCY parts at a time.
+S3_PART_SIZE = 8 * 1024 * 1024
+S3_MAX_CONCURRENCY = 8
 TASK_QUEUE = "external-storage-task-queue"
 
 interrupt_event = asyncio.Event()
@@ -39,7 +43,11 @@ async def main() -> None:
         region_name="us-east-1",
     ) as s3_client:
         driver = S3StorageDriver(
-            client=new_aioboto3_client(s3_client),
+            client=new_parallel_aioboto3_client(
+                s3_client,
+                part_size=S3_PART_SIZE,
+                max_concurrency=S3_MAX_CONCURRENCY,
+            ),
             bucket=S3_BUCKET,
         )
 
@@ -47,7 +55,7 @@ async def main() -> None:
             **config,
             data_converter=dataclasses.replace(
                 temporalio.converter.default(),
-                payload_codec=CompressionCodec(),
+                payload_codec=ExecutorCodec(CompressionCodec()),
                 external_storage=ExternalStorage(drivers=[driver]),
             ),
         )
@@ -1,9 +1,11 @@
 """Redis storage driver sample for Temporal external storage."""
 
+from external_storage_redis._cache import RedisPayloadCache
 from external_storage_redis._client import RedisStorageDriverClient
 from external_storage_redis._driver import RedisStorageDriver
 
 __all__ = [
+    "RedisPayloadCache",
     "RedisStorageDriverClient",
     "RedisStorageDriver",
 ]
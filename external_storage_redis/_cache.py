@@ -0,0 +1,81 @@
+"""In-process payload cache for the Redis storage driver."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from temporalio.api.common.v1 import Payload
+
+
+class RedisPayloadCache:
+    """Byte-bounded LRU cache of decoded payloads keyed by Redis key.
+
+    Driver keys embed the content digest of the payload they point to, so a
+    cached entry never goes stale. Sharing one cache between drivers that use
+    different key prefixes is safe for the same reason.
+
+    The cache is not thread-safe; it is meant to be used from the event loop
+    that runs the driver.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Construct the cache.
+
+        Args:
+            max_bytes: Maximum total serialized size of cached payloads.
+                Payloads larger than this are never cached. Defaults to
+                67108864 (64 MiB).
+        """
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be greater than zero")
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Payload, int]] = OrderedDict()
+        self._size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached payloads."""
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total serialized size of the cached payloads."""
+        return self._size_bytes
+
+    def get(self, key: str) -> Payload | None:
+        """Return a copy of the payload cached for *key*, or ``None``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Hand out a copy so callers mutating the result cannot corrupt the
+        # cached entry.
+        payload = Payload()
+        payload.CopyFrom(entry[0])
+        return payload
+
+    def put(self, key: str, payload: Payload) -> None:
+        """Cache *payload* under *key*, evicting least recently used entries."""
+        size = payload.ByteSize()
+        if size > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size_bytes -= previous[1]
+        cached = Payload()
+        cached.CopyFrom(payload)
+        self._entries[key] = (cached, size)
+        self._size_bytes += size
+        while self._size_bytes > self._max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached payloads. Counters are left untouched."""
+        self._entries.clear()
+        self._size_bytes = 0
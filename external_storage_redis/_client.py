@@ -2,8 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Coroutine, Sequence
 from datetime import timedelta
+from typing import Any, TypeVar
+
+_T = TypeVar("_T")
+
+
+async def _gather_with_cancellation(
+    coros: Sequence[Coroutine[Any, Any, _T]],
+) -> list[_T]:
+    """Run coroutines concurrently, cancelling remaining tasks on failure."""
+    if not coros:
+        return []
+    tasks = [asyncio.create_task(coro) for coro in coros]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
 
 class RedisStorageDriverClient(ABC):
@@ -32,3 +53,93 @@ class RedisStorageDriverClient(ABC):
             ``True`` if the value was inserted, ``False`` if the key already
             existed.
         """
+
+    async def touch(self, *, key: str, ttl: timedelta) -> bool:
+        """Reset the expiration of *key* to *ttl* from now.
+
+        Only called when the driver is configured with ``sliding_ttl``, which
+        :class:`RedisStorageDriver` rejects for clients that do not override
+        it. The default implementation raises :class:`NotImplementedError`.
+
+        Returns:
+            ``True`` if the key exists and its expiration was updated.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support refreshing TTLs"
+        )
+
+    async def get_many(
+        self,
+        *,
+        keys: Sequence[str],
+        ttl: timedelta | None = None,
+    ) -> list[bytes | None]:
+        """Return the raw bytes stored for each of *keys*, in order.
+
+        The default implementation issues one :meth:`get` per key
+        concurrently, followed by one :meth:`touch` per key found when *ttl*
+        is given. Override it to fetch all keys in a single round trip when
+        the underlying Redis client supports batching.
+
+        Args:
+            keys: Redis keys to fetch.
+            ttl: Optional expiration to reset on every key that is found.
+
+        Returns:
+            A list with one entry per key, ``None`` for keys that are absent.
+        """
+        values = await _gather_with_cancellation([self.get(key=key) for key in keys])
+        if ttl is not None:
+            await _gather_with_cancellation(
+                [
+                    self.touch(key=key, ttl=ttl)
+                    for key, value in zip(keys, values)
+                    if value is not None
+                ]
+            )
+        return values
+
+    async def set_many_if_absent(
+        self,
+        *,
+        items: Sequence[tuple[str, bytes | memoryview]],
+        ttl: timedelta | None = None,
+        refresh_ttl: bool = False,
+    ) -> list[bool]:
+        """Store each ``(key, data)`` pair only if the key does not already exist.
+
+        The default implementation issues one :meth:`set_if_absent` per item
+        concurrently, followed by one :meth:`touch` per key that already
+        existed when *refresh_ttl* is set. Override it to write all items in
+        a single round trip when the underlying Redis client supports
+        batching.
+
+        Args:
+            items: Redis keys and serialized payload bytes to store. The
+                driver passes chunks of larger payloads as ``memoryview``
+                slices so they are not copied; the default implementation
+                converts them to ``bytes`` before calling
+                :meth:`set_if_absent`.
+            ttl: Optional expiration to apply when a value is inserted.
+            refresh_ttl: Also reset the expiration of keys that already
+                existed to *ttl*. Ignored when *ttl* is ``None``.
+
+        Returns:
+            A list with one entry per item, ``True`` if the value was
+            inserted and ``False`` if the key already existed.
+        """
+        inserted = await _gather_with_cancellation(
+            [
+                self.set_if_absent(key=key, data=bytes(data), ttl=ttl)
+                for key, data in items
+            ]
+        )
+        if ttl is not None and refresh_ttl:
+            await _gather_with_cancellation(
+                [
+                    self.touch(key=key, ttl=ttl)
+                    for (key, _), was_inserted in zip(items, inserted)
+                    if not was_inserted
+                ]
+            )
+        return inserted
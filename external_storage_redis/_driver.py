@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
-import asyncio
+import functools
 import hashlib
+import math
+import random
 import urllib.parse
-from collections.abc import Coroutine, Sequence
+from collections.abc import Callable, Sequence
 from datetime import timedelta
-from typing import Any, TypeVar
+from typing import Literal
 
 from temporalio.api.common.v1 import Payload
 from temporalio.converter import (
@@ -20,34 +22,32 @@ from temporalio.converter import (
 )
 from temporalio.exceptions import ApplicationError
 
+from external_storage_redis._cache import RedisPayloadCache
 from external_storage_redis._client import RedisStorageDriverClient
 
-_T = TypeVar("_T")
+HashAlgorithm = Literal["sha256", "blake2b"]
+VerifyPolicy = Literal["always", "sampled", "never"]
+KeyScope = Literal["execution", "namespace", "global"]
 
-
-async def _gather_with_cancellation(
-    coros: Sequence[Coroutine[Any, Any, _T]],
-) -> list[_T]:
-    """Run coroutines concurrently, cancelling remaining tasks on failure."""
-    if not coros:
-        return []
-    tasks = [asyncio.create_task(coro) for coro in coros]
-    try:
-        return list(await asyncio.gather(*tasks))
-    except BaseException:
-        for task in tasks:
-            task.cancel()
-        await asyncio.gather(*tasks, return_exceptions=True)
-        raise
+_HASH_FUNCTIONS: dict[str, Callable[[bytes], str]] = {
+    "sha256": lambda data: hashlib.sha256(data).hexdigest(),
+    # 32-byte BLAKE2b keeps keys the same length as SHA-256 and is
+    # considerably faster on 64-bit CPUs.
+    "blake2b": lambda data: hashlib.blake2b(data, digest_size=32).hexdigest(),
+}
+_VERIFY_POLICIES = ("always", "sampled", "never")
+_KEY_SCOPES = ("execution", "namespace", "global")
 
 
 class RedisStorageDriver(StorageDriver):
     """Driver for storing and retrieving Temporal payloads in Redis.
 
-    Payloads are stored as Redis string values keyed by a SHA-256 digest of the
-    serialized payload bytes. The key also includes namespace and
-    workflow/activity identity segments derived from the storage context so
-    distinct Temporal scopes remain isolated.
+    Payloads are stored as Redis string values keyed by a SHA-256 (or, if
+    configured, BLAKE2b) digest of the serialized payload bytes. By default
+    the key also includes namespace and workflow/activity identity segments
+    derived from the storage context so distinct Temporal scopes remain
+    isolated; ``key_scope`` widens that scope so identical payloads are
+    shared across runs.
     """
 
     def __init__(
@@ -58,6 +58,16 @@ class RedisStorageDriver(StorageDriver):
         key_prefix: str = "temporalio:payloads",
         ttl: timedelta | None = None,
         max_payload_size: int = 50 * 1024 * 1024,
+        max_concurrency: int | None = None,
+        max_batch_bytes: int | None = None,
+        cache: RedisPayloadCache | None = None,
+        chunk_size: int | None = None,
+        hash_algorithm: HashAlgorithm = "sha256",
+        verify_on_retrieve: VerifyPolicy = "always",
+        verify_sample_rate: float = 0.01,
+        sliding_ttl: bool = False,
+        hash_tag: bool = False,
+        key_scope: KeyScope = "execution",
     ) -> None:
         """Construct the Redis driver.
 
@@ -73,19 +83,123 @@ class RedisStorageDriver(StorageDriver):
                 ``"temporalio:payloads"``.
             ttl: Optional expiration to apply when a key is first written.
                 Existing keys are not refreshed when the same payload is stored
-                again.
+                again unless ``sliding_ttl`` is set.
             max_payload_size: Maximum serialized payload size in bytes that the
                 driver will accept. Defaults to 52428800 (50 MiB).
+            max_concurrency: Optional maximum number of keys a single
+                ``store`` or ``retrieve`` call has in flight against Redis.
+                Larger calls are split into batches of at most this many keys
+                which are sent one after another. Defaults to ``None``
+                (all keys in one batch).
+            max_batch_bytes: Optional maximum number of payload bytes sent or
+                fetched in one batch. A payload larger than the budget is sent
+                in a batch of its own. On retrieve, sizes come from the claim;
+                claims without a recorded size do not count toward the budget.
+                Defaults to ``None`` (no byte budget).
+            cache: Optional :class:`RedisPayloadCache` consulted before Redis
+                on retrieve. Fetched payloads are added to it once parsed,
+                after their integrity check passes when ``verify_on_retrieve``
+                checks them. With ``"sampled"`` or ``"never"``, unverified
+                payloads are cached too and served on later hits without
+                another check. Defaults to ``None`` (no caching).
+            chunk_size: Optional maximum size in bytes of a single Redis
+                value. Payloads larger than this are split into chunks stored
+                under ``<key>:c<chunk_size>:<index>`` and the claim records how
+                to reassemble them. Chunks are subject to ``max_concurrency`` and
+                ``max_batch_bytes`` like whole payloads. Defaults to ``None``
+                (every payload is one Redis value). Only drivers that
+                understand chunked claims can retrieve chunked payloads, so
+                enable this after all workers are upgraded.
+            hash_algorithm: Digest used to address newly stored payloads,
+                either ``"sha256"`` or ``"blake2b"``. Defaults to
+                ``"sha256"``. Retrieval always uses the algorithm recorded in
+                the claim, so changing this does not affect existing claims.
+            verify_on_retrieve: When to recompute the digest of retrieved
+                bytes and compare it with the claim: ``"always"``,
+                ``"sampled"`` (a random ``verify_sample_rate`` fraction of
+                payloads), or ``"never"``. Defaults to ``"always"``.
+            verify_sample_rate: Fraction of payloads verified when
+                ``verify_on_retrieve`` is ``"sampled"``. Defaults to ``0.01``.
+            sliding_ttl: Reset the expiration of a key to ``ttl`` whenever it
+                is retrieved or the same payload is stored again, in the same
+                round trip as the read or write. Requires ``ttl`` and a
+                client that implements ``touch``. Payloads
+                served from ``cache`` do not refresh their expiration.
+                Defaults to ``False``.
+            hash_tag: Wrap the namespace and execution identity segments of
+                keys written for a workflow or activity in a Redis Cluster hash
+                tag (``{...}``), so every payload of one workflow run or
+                activity attempt maps to the same cluster slot and a batch for
+                it goes to a single shard. Keys written without a workflow or
+                activity target are never tagged. Changes the key layout, so
+                payloads stored with and without it are not deduplicated
+                against each other. Defaults to ``False``.
+            key_scope: Which part of the storage context keys are scoped to.
+                ``"execution"`` includes the namespace and workflow or
+                activity identity, so identical payloads are stored once per
+                run. ``"namespace"`` keeps only the namespace and
+                ``"global"`` uses the digest alone, so identical payloads
+                stored by different runs share one Redis value. Shared values
+                are never deleted by the driver; bound the store with ``ttl``
+                and ``sliding_ttl`` so a value lives as long as some run keeps
+                storing or retrieving it. A shared scope with ``ttl`` requires
+                ``sliding_ttl``. Defaults to ``"execution"``.
         """
         if max_payload_size <= 0:
             raise ValueError("max_payload_size must be greater than zero")
         if ttl is not None and ttl <= timedelta(0):
             raise ValueError("ttl must be greater than zero")
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than zero")
+        if max_batch_bytes is not None and max_batch_bytes <= 0:
+            raise ValueError("max_batch_bytes must be greater than zero")
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be greater than zero")
+        if sliding_ttl and ttl is None:
+            raise ValueError("sliding_ttl requires ttl")
+        if (
+            sliding_ttl
+            and getattr(type(client), "touch", None) is RedisStorageDriverClient.touch
+        ):
+            # Fail at construction rather than on the first retrieve that finds
+            # a key, which would be in the middle of a workflow
+            raise ValueError(
+                f"sliding_ttl requires a client that implements touch, "
+                f"which {type(client).__name__} does not"
+            )
+        if hash_algorithm not in _HASH_FUNCTIONS:
+            raise ValueError(
+                f"hash_algorithm must be one of {', '.join(sorted(_HASH_FUNCTIONS))}"
+            )
+        if verify_on_retrieve not in _VERIFY_POLICIES:
+            raise ValueError(
+                f"verify_on_retrieve must be one of {', '.join(_VERIFY_POLICIES)}"
+            )
+        if not 0 <= verify_sample_rate <= 1:
+            raise ValueError("verify_sample_rate must be between 0 and 1")
+        if key_scope not in _KEY_SCOPES:
+            raise ValueError(f"key_scope must be one of {', '.join(_KEY_SCOPES)}")
+        if key_scope != "execution" and ttl is not None and not sliding_ttl:
+            # A run storing a value another run already stored would keep the
+            # first run's expiration, and its claim could expire long before
+            # its own ttl has passed
+            raise ValueError(f"key_scope {key_scope!r} with ttl requires sliding_ttl")
         self._client = client
         self._driver_name = driver_name or "redis"
         self._key_prefix = key_prefix.rstrip(":")
         self._ttl = ttl
         self._max_payload_size = max_payload_size
+        self._max_concurrency = max_concurrency
+        self._max_batch_bytes = max_batch_bytes
+        self._cache = cache
+        self._chunk_size = chunk_size
+        self._hash_algorithm = hash_algorithm
+        self._verify_on_retrieve = verify_on_retrieve
+        self._verify_sample_rate = verify_sample_rate
+        self._random = random.Random()
+        self._sliding_ttl = sliding_ttl
+        self._hash_tag = hash_tag
+        self._key_scope = key_scope
 
     def name(self) -> str:
         """Return the driver instance name."""
@@ -95,58 +209,94 @@ class RedisStorageDriver(StorageDriver):
         """Return the driver type identifier."""
         return "redis"
 
-    def _build_key(
-        self,
-        context: StorageDriverStoreContext,
-        hash_digest: str,
-    ) -> str:
-        """Construct a context-aware Redis key for a payload digest."""
-
-        def _quote(value: str | None) -> str | None:
-            return urllib.parse.quote(value, safe="") if value else None
-
-        segments = ["v0"]
+    def _should_verify(self) -> bool:
+        """Decide whether to verify the digest of the next retrieved payload."""
+        if self._verify_on_retrieve == "sampled":
+            return self._random.random() < self._verify_sample_rate
+        return self._verify_on_retrieve == "always"
+
+    def _batches(self, sizes: Sequence[int]) -> list[range]:
+        """Split item indexes into batches honoring the configured limits."""
+        batches: list[range] = []
+        start = 0
+        batch_bytes = 0
+        for index, size in enumerate(sizes):
+            count = index - start
+            if count and (
+                (self._max_concurrency is not None and count >= self._max_concurrency)
+                or (
+                    self._max_batch_bytes is not None
+                    and batch_bytes + size > self._max_batch_bytes
+                )
+            ):
+                batches.append(range(start, index))
+                start = index
+                batch_bytes = 0
+            batch_bytes += size
+        if start < len(sizes):
+            batches.append(range(start, len(sizes)))
+        return batches
+
+    def _build_key_prefix(self, context: StorageDriverStoreContext) -> str:
+        """Construct the part of a Redis key shared by every payload in *context*.
+
+        The result ends with the ``d:<algorithm>`` segment; appending
+        ``:<digest>`` yields the full key.
+        """
         target = context.target
-        namespace = _quote(target.namespace) if target is not None else None
-        if namespace:
-            segments.extend(["ns", namespace])
-
-        if isinstance(target, StorageDriverWorkflowInfo):
-            segments.extend(
-                [
-                    "wt",
-                    _quote(target.type) or "null",
-                    "wi",
-                    _quote(target.id) or "null",
-                    "ri",
-                    _quote(target.run_id) or "null",
-                ]
+        if self._key_scope == "global":
+            target = None
+        execution_scoped = self._key_scope == "execution"
+        identity = ""
+        if execution_scoped and isinstance(target, StorageDriverWorkflowInfo):
+            identity = _quoted_identity(
+                target.namespace, "w", target.type, target.id, target.run_id
             )
-        elif isinstance(target, StorageDriverActivityInfo):
-            segments.extend(
-                [
-                    "at",
-                    _quote(target.type) or "null",
-                    "ai",
-                    _quote(target.id) or "null",
-                    "ri",
-                    _quote(target.run_id) or "null",
-                ]
+        elif execution_scoped and isinstance(target, StorageDriverActivityInfo):
+            identity = _quoted_identity(
+                target.namespace, "a", target.type, target.id, target.run_id
             )
+        elif target is not None:
+            identity = _quoted_identity(target.namespace, None, None, None, None)
+        if (
+            self._hash_tag
+            and execution_scoped
+            and isinstance(
+                target, (StorageDriverWorkflowInfo, StorageDriverActivityInfo)
+            )
+        ):
+            # Quoting escapes braces in identity values, so the tag always
+            # spans the whole identity.
+            identity = f":{{{identity[1:]}}}"
 
-        segments.extend(["d", "sha256", hash_digest])
+        prefix = f"v0{identity}:d:{self._hash_algorithm}"
         if not self._key_prefix:
-            return ":".join(segments)
-        return f"{self._key_prefix}:{':'.join(segments)}"
+            return prefix
+        return f"{self._key_prefix}:{prefix}"
 
     async def store(
         self,
         context: StorageDriverStoreContext,
         payloads: Sequence[Payload],
     ) -> list[StorageDriverClaim]:
-        """Store payloads in Redis and return a claim for each payload."""
+        """Store payloads in Redis and return a claim for each payload.
 
-        async def _store_payload(payload: Payload) -> StorageDriverClaim:
+        Payloads are written with one
+        :meth:`RedisStorageDriverClient.set_many_if_absent` call per batch.
+        Without ``max_concurrency`` or ``max_batch_bytes`` that is a single
+        call. Payloads larger than ``chunk_size`` are written as several
+        chunk values.
+        """
+        if not payloads:
+            return []
+
+        # Every payload in one call shares the same context, so the key prefix
+        # is built once rather than per payload.
+        key_prefix = self._build_key_prefix(context)
+        hash_function = _HASH_FUNCTIONS[self._hash_algorithm]
+        items: list[tuple[str, bytes | memoryview]] = []
+        claims: list[StorageDriverClaim] = []
+        for payload in payloads:
             payload_bytes = payload.SerializeToString()
             payload_size = len(payload_bytes)
             if payload_size > self._max_payload_size:
@@ -155,74 +305,280 @@ class RedisStorageDriver(StorageDriver):
                     f"max_payload_size of {self._max_payload_size} bytes"
                 )
 
-            hash_digest = hashlib.sha256(payload_bytes).hexdigest().lower()
-            key = self._build_key(context, hash_digest)
-
+            hash_digest = hash_function(payload_bytes)
+            key = f"{key_prefix}:{hash_digest}"
+            claim_data = {
+                "key": key,
+                "hash_algorithm": self._hash_algorithm,
+                "hash_value": hash_digest,
+                "size": str(payload_size),
+            }
+            chunk_size = self._chunk_size
+            if chunk_size is not None and payload_size > chunk_size:
+                chunk_count = math.ceil(payload_size / chunk_size)
+                # Slice a view rather than the bytes so chunks share the
+                # serialized payload's memory all the way to the socket.
+                view = memoryview(payload_bytes)
+                for index in range(chunk_count):
+                    offset = index * chunk_size
+                    items.append(
+                        (
+                            _chunk_key(key, chunk_size, index),
+                            view[offset : offset + chunk_size],
+                        )
+                    )
+                claim_data["chunk_count"] = str(chunk_count)
+                claim_data["chunk_size"] = str(chunk_size)
+            else:
+                items.append((key, payload_bytes))
+            claims.append(StorageDriverClaim(claim_data=claim_data))
+
+        for batch in self._batches([len(data) for _, data in items]):
+            batch_items = items[batch.start : batch.stop]
             try:
-                await self._client.set_if_absent(
-                    key=key,
-                    data=payload_bytes,
+                await self._client.set_many_if_absent(
+                    items=batch_items,
                     ttl=self._ttl,
+                    refresh_ttl=self._sliding_ttl,
                 )
             except Exception as err:
+                keys = [key for key, _ in batch_items]
                 raise RuntimeError(
-                    f"RedisStorageDriver store failed [key={key}]"
+                    f"RedisStorageDriver store failed [{_describe_keys(keys)}]"
                 ) from err
 
-            return StorageDriverClaim(
-                claim_data={
-                    "key": key,
-                    "hash_algorithm": "sha256",
-                    "hash_value": hash_digest,
-                },
-            )
-
-        return await _gather_with_cancellation([_store_payload(p) for p in payloads])
+        return claims
 
     async def retrieve(
         self,
         context: StorageDriverRetrieveContext,  # noqa: ARG002
         claims: Sequence[StorageDriverClaim],
     ) -> list[Payload]:
-        """Retrieve payloads from Redis for the given claims."""
+        """Retrieve payloads from Redis for the given claims.
+
+        Keys are fetched with one :meth:`RedisStorageDriverClient.get_many`
+        call per batch. Without ``max_concurrency`` or ``max_batch_bytes``
+        that is a single call. Keys found in the configured cache are not
+        fetched at all.
 
-        async def _retrieve_payload(claim: StorageDriverClaim) -> Payload:
-            key = claim.claim_data["key"]
+        Each payload is parsed as soon as its bytes have arrived, so raw
+        Redis values are released batch by batch. Chunked payloads are copied
+        into a preallocated buffer as each batch of chunks arrives.
+        """
+        if not claims:
+            return []
+
+        keys = [claim.claim_data["key"] for claim in claims]
+        payloads: list[Payload | None] = [None] * len(claims)
+        if self._cache is not None:
+            payloads = [self._cache.get(key) for key in keys]
+
+        # Each fetch unit is (claim index, Redis key, expected size). A
+        # chunked claim contributes one unit per chunk, in order.
+        units: list[tuple[int, str, int]] = []
+        for i, payload in enumerate(payloads):
+            if payload is None:
+                units.extend(
+                    (i, unit_key, unit_size)
+                    for unit_key, unit_size in _claim_units(claims[i])
+                )
 
+        buffers: dict[int, _ChunkBuffer] = {}
+        for batch in self._batches([size for _, _, size in units]):
+            batch_units = units[batch.start : batch.stop]
+            batch_keys = [unit_key for _, unit_key, _ in batch_units]
             try:
-                payload_bytes = await self._client.get(key=key)
+                values = await self._client.get_many(
+                    keys=batch_keys,
+                    ttl=self._ttl if self._sliding_ttl else None,
+                )
             except Exception as err:
                 raise RuntimeError(
-                    f"RedisStorageDriver retrieve failed [key={key}]"
+                    f"RedisStorageDriver retrieve failed [{_describe_keys(batch_keys)}]"
                 ) from err
-
-            if payload_bytes is None:
-                raise ApplicationError(
-                    f"Payload not found for key '{key}'",
-                    type="PayloadNotFoundError",
-                    non_retryable=True,
-                )
-
-            expected_hash = claim.claim_data.get("hash_value")
-            hash_algorithm = claim.claim_data.get("hash_algorithm")
-            if expected_hash and hash_algorithm:
-                if hash_algorithm != "sha256":
-                    raise ValueError(
-                        f"RedisStorageDriver unsupported hash algorithm "
-                        f"[key={key}]: expected sha256, got {hash_algorithm}"
+            for (i, unit_key, _), value in zip(batch_units, values):
+                if unit_key == keys[i]:
+                    payloads[i] = self._parse_and_cache(claims[i], keys[i], value)
+                    continue
+                if value is None:
+                    raise _payload_not_found(unit_key)
+                buffer = buffers.get(i)
+                if buffer is None:
+                    buffer = buffers[i] = _ChunkBuffer(
+                        keys[i], int(claims[i].claim_data["size"])
                     )
-                actual_hash = hashlib.sha256(payload_bytes).hexdigest().lower()
-                if actual_hash != expected_hash:
-                    raise ValueError(
-                        f"RedisStorageDriver integrity check failed "
-                        f"[key={key}]: expected {hash_algorithm}:{expected_hash}, "
-                        f"got {hash_algorithm}:{actual_hash}"
+                buffer.write(value)
+                if buffer.complete:
+                    del buffers[i]
+                    payloads[i] = self._parse_and_cache(
+                        claims[i], keys[i], buffer.getvalue()
                     )
 
-            payload = Payload()
-            payload.ParseFromString(payload_bytes)
-            return payload
+        # Any buffer still pending had chunks shorter than the claim recorded;
+        # getvalue() reports it.
+        for buffer in buffers.values():
+            buffer.getvalue()
+
+        result: list[Payload] = []
+        for payload in payloads:
+            assert payload is not None
+            result.append(payload)
+        return result
+
+    def _parse_and_cache(
+        self,
+        claim: StorageDriverClaim,
+        key: str,
+        payload_bytes: bytes | bytearray | None,
+    ) -> Payload:
+        """Parse fetched bytes, checked per ``verify_on_retrieve``, and cache them."""
+        payload = _parse_payload(
+            claim, key, payload_bytes, verify=self._should_verify()
+        )
+        if self._cache is not None:
+            self._cache.put(key, payload)
+        return payload
+
+
+class _ChunkBuffer:
+    """Preallocated buffer that a payload's chunks are copied into in order."""
+
+    def __init__(self, key: str, size: int) -> None:
+        self._key = key
+        self._data = bytearray(size)
+        self._offset = 0
+
+    def write(self, chunk: bytes) -> None:
+        """Copy the next chunk into the buffer."""
+        end = self._offset + len(chunk)
+        if end > len(self._data):
+            raise ValueError(
+                f"RedisStorageDriver chunk exceeds recorded payload size "
+                f"[key={self._key}]: expected {len(self._data)} bytes"
+            )
+        self._data[self._offset : end] = chunk
+        self._offset = end
+
+    @property
+    def complete(self) -> bool:
+        """Whether the buffer has been filled to the recorded payload size."""
+        return self._offset == len(self._data)
+
+    def getvalue(self) -> bytearray:
+        """Return the reassembled payload bytes once every chunk is written."""
+        if not self.complete:
+            raise ValueError(
+                f"RedisStorageDriver chunks are shorter than recorded payload "
+                f"size [key={self._key}]: expected {len(self._data)} bytes, "
+                f"got {self._offset}"
+            )
+        return self._data
+
+
+def _chunk_key(key: str, chunk_size: int, index: int) -> str:
+    """Return the Redis key of chunk *index* of the payload stored at *key*.
 
-        return await _gather_with_cancellation(
-            [_retrieve_payload(claim) for claim in claims]
+    The chunk size is part of the key. Chunks are written with SET NX, so
+    without it a payload stored again under another chunk size would keep the
+    old chunks while its claim recorded the new layout.
+    """
+    return f"{key}:c{chunk_size}:{index}"
+
+
+def _claim_units(claim: StorageDriverClaim) -> list[tuple[str, int]]:
+    """Return the Redis keys and expected sizes needed to read *claim*."""
+    key = claim.claim_data["key"]
+    size = int(claim.claim_data.get("size", 0))
+    chunk_count = int(claim.claim_data.get("chunk_count", 0))
+    if not chunk_count:
+        return [(key, size)]
+    chunk_size = int(claim.claim_data["chunk_size"])
+    return [
+        (_chunk_key(key, chunk_size, index), min(chunk_size, size - index * chunk_size))
+        for index in range(chunk_count)
+    ]
+
+
+def _payload_not_found(key: str) -> ApplicationError:
+    """Build the non-retryable error raised when a key has expired or is missing."""
+    return ApplicationError(
+        f"Payload not found for key '{key}'",
+        type="PayloadNotFoundError",
+        non_retryable=True,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _quoted_identity(
+    namespace: str | None,
+    kind: Literal["w", "a"] | None,
+    type: str | None,
+    id: str | None,
+    run_id: str | None,
+) -> str:
+    """Return the URL-quoted namespace and execution identity key segments.
+
+    Results are memoized because every payload stored for the same workflow or
+    activity execution repeats the same quoting work.
+    """
+
+    def _quote(value: str | None) -> str | None:
+        return urllib.parse.quote(value, safe="") if value else None
+
+    segments = [""]
+    quoted_namespace = _quote(namespace)
+    if quoted_namespace:
+        segments.extend(["ns", quoted_namespace])
+    if kind is not None:
+        segments.extend(
+            [
+                f"{kind}t",
+                _quote(type) or "null",
+                f"{kind}i",
+                _quote(id) or "null",
+                "ri",
+                _quote(run_id) or "null",
+            ]
         )
+    return ":".join(segments)
+
+
+def _describe_keys(keys: Sequence[str]) -> str:
+    """Describe the keys involved in a failed batch for error messages."""
+    if len(keys) == 1:
+        return f"key={keys[0]}"
+    return f"keys={keys[0]},...({len(keys)} total)"
+
+
+def _parse_payload(
+    claim: StorageDriverClaim,
+    key: str,
+    payload_bytes: bytes | bytearray | None,
+    *,
+    verify: bool = True,
+) -> Payload:
+    """Verify fetched bytes against *claim* and parse them into a payload."""
+    if payload_bytes is None:
+        raise _payload_not_found(key)
+
+    expected_hash = claim.claim_data.get("hash_value")
+    hash_algorithm = claim.claim_data.get("hash_algorithm")
+    if verify and expected_hash and hash_algorithm:
+        hash_function = _HASH_FUNCTIONS.get(hash_algorithm)
+        if hash_function is None:
+            raise ValueError(
+                f"RedisStorageDriver unsupported hash algorithm "
+                f"[key={key}]: expected one of "
+                f"{', '.join(sorted(_HASH_FUNCTIONS))}, got {hash_algorithm}"
+            )
+        actual_hash = hash_function(payload_bytes)
+        if actual_hash != expected_hash:
+            raise ValueError(
+                f"RedisStorageDriver integrity check failed "
+                f"[key={key}]: expected {hash_algorithm}:{expected_hash}, "
+                f"got {hash_algorithm}:{actual_hash}"
+            )
+
+    payload = Payload()
+    payload.ParseFromString(payload_bytes)
+    return payload
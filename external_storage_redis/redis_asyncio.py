@@ -1,8 +1,9 @@
-"""redis.asyncio adapter for the Redis storage driver client."""
+"""redis.asyncio adapters for the Redis storage driver client."""
 
 from __future__ import annotations
 
 import math
+from collections.abc import Sequence
 from datetime import timedelta
 from typing import TYPE_CHECKING
 
@@ -10,6 +11,7 @@ from external_storage_redis._client import RedisStorageDriverClient
 
 if TYPE_CHECKING:
     from redis.asyncio.client import Redis
+    from redis.asyncio.cluster import RedisCluster
 
 
 class _RedisAsyncioStorageDriverClient(RedisStorageDriverClient):
@@ -19,20 +21,40 @@ class _RedisAsyncioStorageDriverClient(RedisStorageDriverClient):
     which means ``decode_responses`` must remain disabled.
     """
 
-    def __init__(self, client: Redis) -> None:
+    def __init__(self, client: Redis | RedisCluster) -> None:
         """Wrap a ``redis.asyncio.Redis`` client."""
         self._client = client
 
     async def get(self, *, key: str) -> bytes | None:
         """Fetch raw bytes for *key* from Redis."""
-        value = await self._client.get(key)
-        if value is None:
-            return None
-        if not isinstance(value, bytes):
-            raise TypeError(
-                "redis.asyncio client must be configured with decode_responses=False"
-            )
-        return value
+        return _check_binary(await self._client.get(key))
+
+    async def touch(self, *, key: str, ttl: timedelta) -> bool:
+        """Reset the expiration of *key* with ``PEXPIRE``."""
+        return bool(await self._client.pexpire(key, _ttl_ms(ttl)))
+
+    async def get_many(
+        self,
+        *,
+        keys: Sequence[str],
+        ttl: timedelta | None = None,
+    ) -> list[bytes | None]:
+        """Fetch raw bytes for all *keys* in a single round trip.
+
+        Uses ``MGET``, or a pipeline of ``GETEX ... PX`` when *ttl* is given
+        so expirations are refreshed in the same round trip.
+        """
+        if not keys:
+            return []
+        if ttl is None:
+            values = await self._client.mget(keys)
+        else:
+            ttl_ms = _ttl_ms(ttl)
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.getex(key, px=ttl_ms)
+                values = await pipe.execute()
+        return [_check_binary(value) for value in values]
 
     async def set_if_absent(
         self,
@@ -42,13 +64,110 @@ class _RedisAsyncioStorageDriverClient(RedisStorageDriverClient):
         ttl: timedelta | None = None,
     ) -> bool:
         """Atomically set *key* only when it is absent."""
-        ttl_ms = None
-        if ttl is not None:
-            ttl_ms = max(1, math.ceil(ttl.total_seconds() * 1000))
+        ttl_ms = _ttl_ms(ttl) if ttl is not None else None
         result = await self._client.set(key, data, px=ttl_ms, nx=True)
         return bool(result)
 
+    async def set_many_if_absent(
+        self,
+        *,
+        items: Sequence[tuple[str, bytes | memoryview]],
+        ttl: timedelta | None = None,
+        refresh_ttl: bool = False,
+    ) -> list[bool]:
+        """Set every absent key with one pipelined round trip of ``SET NX``.
+
+        When *refresh_ttl* is set, each ``SET NX`` is followed by a
+        ``PEXPIRE`` in the same pipeline so keys that already existed get a
+        fresh expiration too.
+
+        ``memoryview`` values are handed to redis-py as is, which writes them
+        to the socket without an intermediate copy.
+        """
+        if not items:
+            return []
+        ttl_ms = _ttl_ms(ttl) if ttl is not None else None
+        refresh_ms = ttl_ms if refresh_ttl else None
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, data in items:
+                pipe.set(key, data, px=ttl_ms, nx=True)
+                if refresh_ms is not None:
+                    pipe.pexpire(key, refresh_ms)
+            results = await pipe.execute()
+        if refresh_ms is not None:
+            results = results[::2]
+        return [bool(result) for result in results]
+
+
+class _RedisAsyncioClusterStorageDriverClient(_RedisAsyncioStorageDriverClient):
+    """Adapter that wraps a ``redis.asyncio.RedisCluster`` client.
+
+    Batched writes and ``GETEX`` reads go through a cluster pipeline, which
+    groups commands by the node owning each key's slot and sends one round
+    trip per node. ``MGET`` only accepts keys from a single slot in a cluster,
+    so :meth:`get_many` issues one ``MGET`` per slot in the same pipeline.
+    """
+
+    _client: RedisCluster
+
+    def __init__(self, client: RedisCluster) -> None:
+        """Wrap a ``redis.asyncio.RedisCluster`` client."""
+        super().__init__(client)
+
+    async def get_many(
+        self,
+        *,
+        keys: Sequence[str],
+        ttl: timedelta | None = None,
+    ) -> list[bytes | None]:
+        """Fetch raw bytes for all *keys* with one round trip per node.
+
+        Keys are grouped by slot into one ``MGET`` each, or fetched with
+        ``GETEX ... PX`` when *ttl* is given.
+        """
+        if not keys or ttl is not None:
+            return await super().get_many(keys=keys, ttl=ttl)
+        slots: dict[int, list[int]] = {}
+        for index, key in enumerate(keys):
+            slots.setdefault(self._client.keyslot(key), []).append(index)
+        async with self._client.pipeline(transaction=False) as pipe:
+            for indexes in slots.values():
+                pipe.mget([keys[index] for index in indexes])
+            results = await pipe.execute()
+        values: list[bytes | None] = [None] * len(keys)
+        for indexes, slot_values in zip(slots.values(), results):
+            for index, value in zip(indexes, slot_values):
+                values[index] = _check_binary(value)
+        return values
+
+
+def _ttl_ms(ttl: timedelta) -> int:
+    """Convert *ttl* to whole milliseconds, rounding up to at least 1."""
+    return max(1, math.ceil(ttl.total_seconds() * 1000))
+
+
+def _check_binary(value: object) -> bytes | None:
+    """Return *value* as bytes, rejecting clients that decode responses."""
+    if value is None:
+        return None
+    if not isinstance(value, bytes):
+        raise TypeError(
+            "redis.asyncio client must be configured with decode_responses=False"
+        )
+    return value
+
 
 def new_redis_asyncio_client(client: Redis) -> RedisStorageDriverClient:
     """Create a driver client from a ``redis.asyncio.Redis`` instance."""
     return _RedisAsyncioStorageDriverClient(client)
+
+
+def new_redis_asyncio_cluster_client(
+    client: RedisCluster,
+) -> RedisStorageDriverClient:
+    """Create a driver client from a ``redis.asyncio.RedisCluster`` instance.
+
+    Combine it with ``RedisStorageDriver(hash_tag=True)`` so the payloads of
+    one workflow run share a slot and each batch is sent to a single shard.
+    """
+    return _RedisAsyncioClusterStorageDriverClient(client)
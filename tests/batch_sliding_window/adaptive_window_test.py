@@ -0,0 +1,132 @@
+import dataclasses
+import uuid
+
+import pytest
+from temporalio.client import Client, WorkflowFailureError
+from temporalio.exceptions import ApplicationError
+from temporalio.worker import Worker
+
+from batch_sliding_window.adaptive_window import (
+    AdaptiveWindow,
+    AdaptiveWindowConfig,
+    AdaptiveWindowState,
+)
+from batch_sliding_window.batch_workflow import (
+    ProcessBatchWorkflow,
+    ProcessBatchWorkflowInput,
+)
+from batch_sliding_window.record_loader_activity import RecordLoader
+
+CONFIG = AdaptiveWindowConfig(min_size=2, max_size=20, target_latency_seconds=10)
+
+
+def test_initial_size_is_clamped():
+    assert AdaptiveWindow(CONFIG, None).size == 2
+    assert AdaptiveWindow(CONFIG, AdaptiveWindowState(size=1)).size == 2
+    assert AdaptiveWindow(CONFIG, AdaptiveWindowState(size=50)).size == 20
+
+
+def test_fast_completions_grow_window_additively():
+    window = AdaptiveWindow(CONFIG, AdaptiveWindowState(size=10))
+
+    for now in range(10):
+        window.on_completion(now=now, latency_seconds=1, records=1, failed=0)
+
+    # About one increase_step per window's worth of completions
+    assert 10.9 < window.state.size < 11
+    assert window.size == 10
+    window.on_completion(now=10, latency_seconds=1, records=1, failed=0)
+    assert window.size == 11
+
+
+def test_slow_completion_shrinks_window_multiplicatively():
+    window = AdaptiveWindow(CONFIG, AdaptiveWindowState(size=16))
+
+    window.on_completion(now=100, latency_seconds=20, records=1, failed=0)
+
+    assert window.size == 8
+    assert window.state.last_decrease_at == 100
+
+
+def test_window_shrinks_at_most_once_per_latency():
+    window = AdaptiveWindow(CONFIG, AdaptiveWindowState(size=16))
+    window.on_completion(now=100, latency_seconds=20, records=1, failed=0)
+
+    # Children started before the decrease keep reporting slow completions
+    window.on_completion(now=110, latency_seconds=20, records=1, failed=0)
+    assert window.size == 8
+
+    window.on_completion(now=120, latency_seconds=20, records=1, failed=0)
+    assert window.size == 4
+
+
+def test_failures_shrink_window():
+    window = AdaptiveWindow(CONFIG, AdaptiveWindowState(size=16))
+
+    # One failed record in ten raises the smoothed error rate to 0.02
+    window.on_completion(now=0, latency_seconds=1, records=10, failed=1)
+    assert window.state.error_rate == pytest.approx(0.02)
+    assert window.size == 16
+
+    window.on_completion(now=1, latency_seconds=1, records=1, failed=1)
+    assert window.state.error_rate > CONFIG.max_error_rate
+    assert window.size == 8
+
+
+def test_window_stays_within_bounds():
+    window = AdaptiveWindow(CONFIG, AdaptiveWindowState(size=3))
+    window.on_completion(now=0, latency_seconds=100, records=1, failed=0)
+    assert window.size == CONFIG.min_size
+
+    window = AdaptiveWindow(CONFIG, AdaptiveWindowState(size=CONFIG.max_size))
+    for now in range(100):
+        window.on_completion(now=now, latency_seconds=1, records=1, failed=0)
+    assert window.state.size == CONFIG.max_size
+
+
+@pytest.mark.parametrize(
+    "config, message",
+    [
+        (
+            dataclasses.replace(CONFIG, max_error_rate=-0.1),
+            "AdaptiveWindow.MaxErrorRate must be between 0 and 1",
+        ),
+        (
+            dataclasses.replace(CONFIG, max_error_rate=1.5),
+            "AdaptiveWindow.MaxErrorRate must be between 0 and 1",
+        ),
+        (
+            dataclasses.replace(CONFIG, smoothing=0),
+            "AdaptiveWindow.Smoothing must be greater than 0 and at most 1",
+        ),
+        (
+            dataclasses.replace(CONFIG, smoothing=1.5),
+            "AdaptiveWindow.Smoothing must be greater than 0 and at most 1",
+        ),
+    ],
+)
+async def test_invalid_rates_are_rejected(
+    client: Client, config: AdaptiveWindowConfig, message: str
+):
+    task_queue = str(uuid.uuid4())
+    record_loader = RecordLoader(record_count=10)
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[ProcessBatchWorkflow],
+        activities=[record_loader.get_record_count],
+    ):
+        with pytest.raises(WorkflowFailureError) as err:
+            await client.execute_workflow(
+                ProcessBatchWorkflow.run,
+                ProcessBatchWorkflowInput(
+                    page_size=5,
+                    sliding_window_size=2,
+                    partitions=1,
+                    adaptive_window=config,
+                ),
+                id=str(uuid.uuid4()),
+                task_queue=task_queue,
+            )
+        assert isinstance(err.value.cause, ApplicationError)
+        assert err.value.cause.message == message
@@ -0,0 +1,133 @@
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pytest
+from temporalio import workflow
+from temporalio.client import Client
+from temporalio.exceptions import ApplicationError, ChildWorkflowError
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+from batch_sliding_window import record_processor_workflow
+from batch_sliding_window.record_loader_activity import SingleRecord
+from batch_sliding_window.record_processor_workflow import (
+    CompletionReport,
+    RecordBatch,
+    RecordBatchProcessorWorkflow,
+    RecordProcessorWorkflow,
+)
+from batch_sliding_window.record_ranges import RecordRange
+
+FAILING_RECORD = 3
+
+
+@dataclass
+class ReportCollectorInput:
+    record_ids: List[int]
+    batch: bool  # one RecordBatchProcessorWorkflow instead of a RecordProcessorWorkflow
+
+
+@dataclass
+class ReportCollectorResult:
+    reports: List[CompletionReport]
+    child_error: Optional[str]
+
+
+@workflow.defn
+class ReportCollectorWorkflow:
+    """Stands in for the sliding window, keeping the reports its child sends."""
+
+    def __init__(self) -> None:
+        self.reports: List[CompletionReport] = []
+
+    @workflow.run
+    async def run(self, input: ReportCollectorInput) -> ReportCollectorResult:
+        records = [SingleRecord(id=record_id) for record_id in input.record_ids]
+        child_id = f"{workflow.info().workflow_id}/child"
+        child_error = None
+        try:
+            if input.batch:
+                await workflow.execute_child_workflow(
+                    RecordBatchProcessorWorkflow.run,
+                    RecordBatch(id=records[0].id, records=records),
+                    id=child_id,
+                )
+            else:
+                await workflow.execute_child_workflow(
+                    RecordProcessorWorkflow.run, records[0], id=child_id
+                )
+        except ChildWorkflowError as err:
+            child_error = str(err.cause)
+        await workflow.wait_condition(lambda: bool(self.reports))
+        return ReportCollectorResult(reports=self.reports, child_error=child_error)
+
+    @workflow.signal
+    def report_records_completion(self, report: CompletionReport) -> None:
+        self.reports.append(report)
+
+
+async def fail_one_record(record: SingleRecord) -> None:
+    if record.id == FAILING_RECORD:
+        raise ApplicationError(f"Record {record.id} is malformed")
+
+
+async def collect_reports(
+    client: Client, input: ReportCollectorInput
+) -> ReportCollectorResult:
+    task_queue = str(uuid.uuid4())
+    # The sandbox re-imports the workflow module, which would undo the patch
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[
+            ReportCollectorWorkflow,
+            RecordBatchProcessorWorkflow,
+            RecordProcessorWorkflow,
+        ],
+        workflow_runner=UnsandboxedWorkflowRunner(),
+    ):
+        return await client.execute_workflow(
+            ReportCollectorWorkflow.run,
+            input,
+            id=str(uuid.uuid4()),
+            task_queue=task_queue,
+        )
+
+
+@pytest.fixture(autouse=True)
+def failing_record(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(record_processor_workflow, "process_record", fail_one_record)
+
+
+async def test_batch_reports_failed_records(client: Client):
+    result = await collect_reports(
+        client, ReportCollectorInput(record_ids=[2, 3, 4, 5], batch=True)
+    )
+
+    [report] = result.reports
+    assert report.records == RecordRange(start=2, end=6)
+    assert report.failed == 1
+    assert report.latency_seconds >= 0
+    assert result.child_error == "Failed to process 1 of 4 records"
+
+
+async def test_batch_without_failures_completes(client: Client):
+    result = await collect_reports(
+        client, ReportCollectorInput(record_ids=[4, 5], batch=True)
+    )
+
+    [report] = result.reports
+    assert report.records == RecordRange(start=4, end=6)
+    assert report.failed == 0
+    assert result.child_error is None
+
+
+async def test_single_record_sends_completion_report(client: Client):
+    result = await collect_reports(
+        client, ReportCollectorInput(record_ids=[FAILING_RECORD], batch=False)
+    )
+
+    [report] = result.reports
+    assert report.records == RecordRange(start=FAILING_RECORD, end=FAILING_RECORD + 1)
+    assert report.failed == 1
+    assert result.child_error == f"Failed to process record {FAILING_RECORD}"
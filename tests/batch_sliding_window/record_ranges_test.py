@@ -0,0 +1,117 @@
+from batch_sliding_window.record_ranges import RecordRange, RecordRanges
+
+
+def test_add_disjoint_ranges_keeps_them_sorted():
+    ranges = RecordRanges()
+    ranges.add(20, 30)
+    ranges.add(0, 5)
+    ranges.add(10, 12)
+
+    assert ranges.ranges() == [
+        RecordRange(0, 5),
+        RecordRange(10, 12),
+        RecordRange(20, 30),
+    ]
+    assert len(ranges) == 17
+
+
+def test_add_adjacent_ranges_merges_them():
+    ranges = RecordRanges()
+    ranges.add(0, 5)
+    # Adjacent to the end of the previous range
+    ranges.add(5, 8)
+    # Adjacent to the start of the next range
+    ranges.add(12, 15)
+    ranges.add(10, 12)
+
+    assert ranges.ranges() == [RecordRange(0, 8), RecordRange(10, 15)]
+
+    # Filling the gap joins both neighbours
+    ranges.add(8, 10)
+
+    assert ranges.ranges() == [RecordRange(0, 15)]
+    assert len(ranges) == 15
+
+
+def test_remove_from_middle_splits_range():
+    ranges = RecordRanges([0, 10])
+
+    assert ranges.remove(3, 5)
+
+    assert ranges.ranges() == [RecordRange(0, 3), RecordRange(5, 10)]
+    assert len(ranges) == 8
+
+
+def test_remove_at_range_edges_shrinks_range():
+    ranges = RecordRanges([0, 10, 20, 30])
+
+    assert ranges.remove(0, 2)
+    assert ranges.remove(28, 30)
+
+    assert ranges.ranges() == [RecordRange(2, 10), RecordRange(20, 28)]
+    assert len(ranges) == 16
+
+    # Removing a whole range drops it
+    assert ranges.remove(2, 10)
+
+    assert ranges.ranges() == [RecordRange(20, 28)]
+    assert len(ranges) == 8
+
+
+def test_remove_missing_records_leaves_set_unchanged():
+    ranges = RecordRanges([0, 5, 10, 15])
+
+    # Already removed, spanning a gap, before the first range and empty
+    assert not ranges.remove(5, 6)
+    assert not ranges.remove(3, 12)
+    assert not ranges.remove(-2, 1)
+    assert not ranges.remove(2, 2)
+
+    assert ranges.to_bounds() == [0, 5, 10, 15]
+    assert len(ranges) == 10
+
+    # A duplicate completion signal removes nothing the second time
+    assert ranges.remove(10, 11)
+    assert not ranges.remove(10, 11)
+    assert len(ranges) == 9
+
+
+def test_bounds_round_trip():
+    ranges = RecordRanges()
+    for start in range(0, 100, 10):
+        ranges.add(start, start + 5)
+    ranges.remove(42, 43)
+
+    copy = RecordRanges(ranges.to_bounds())
+
+    assert copy.ranges() == ranges.ranges()
+    assert len(copy) == len(ranges) == 49
+    assert copy.to_bounds() == ranges.to_bounds()
+    assert RecordRanges().to_bounds() == []
+    assert len(RecordRanges(None)) == 0
+
+
+def test_add_overlapping_ranges_counts_each_record_once():
+    ranges = RecordRanges([0, 5, 10, 15, 20, 25])
+
+    # Overlaps the end of one range
+    ranges.add(3, 7)
+
+    assert ranges.ranges() == [
+        RecordRange(0, 7),
+        RecordRange(10, 15),
+        RecordRange(20, 25),
+    ]
+    assert len(ranges) == 17
+
+    # Covers two ranges and the gap between them
+    ranges.add(9, 22)
+
+    assert ranges.ranges() == [RecordRange(0, 7), RecordRange(9, 25)]
+    assert len(ranges) == 23
+
+    # Already in the set
+    ranges.add(10, 12)
+
+    assert ranges.to_bounds() == [0, 7, 9, 25]
+    assert len(ranges) == 23
@@ -0,0 +1,86 @@
+import uuid
+from collections import Counter
+from datetime import timedelta
+from typing import List
+
+import pytest
+from temporalio import activity, workflow
+from temporalio.client import Client
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+from batch_sliding_window import record_processor_workflow
+from batch_sliding_window.record_loader_activity import RecordLoader, SingleRecord
+from batch_sliding_window.record_processor_workflow import (
+    RecordBatchProcessorWorkflow,
+    RecordProcessorWorkflow,
+)
+from batch_sliding_window.sliding_window_workflow import (
+    SlidingWindowWorkflow,
+    SlidingWindowWorkflowInput,
+)
+
+# Not a multiple of the page size, so the last run reads a short page
+RECORD_COUNT = 23
+PAGE_SIZE = 5
+
+
+class ProcessedRecords:
+    """Records the id of every record a child processed."""
+
+    def __init__(self) -> None:
+        self.ids: List[int] = []
+
+    @activity.defn
+    async def record_processed(self, record_id: int) -> None:
+        self.ids.append(record_id)
+
+
+async def process_record(record: SingleRecord) -> None:
+    # An activity rather than a list the workflow appends to, so a replayed
+    # child does not count its record twice
+    await workflow.execute_activity(
+        "record_processed", record.id, start_to_close_timeout=timedelta(seconds=5)
+    )
+
+
+@pytest.fixture(autouse=True)
+def recorded_processing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(record_processor_workflow, "process_record", process_record)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2])
+async def test_pages_process_every_record_once(client: Client, batch_size: int):
+    task_queue = str(uuid.uuid4())
+    record_loader = RecordLoader(record_count=RECORD_COUNT)
+    processed = ProcessedRecords()
+    # The sandbox re-imports the workflow module, which would undo the patch
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[
+            SlidingWindowWorkflow,
+            RecordProcessorWorkflow,
+            RecordBatchProcessorWorkflow,
+        ],
+        activities=[record_loader.get_record_page, processed.record_processed],
+        workflow_runner=UnsandboxedWorkflowRunner(),
+    ):
+        handle = await client.start_workflow(
+            SlidingWindowWorkflow.run,
+            SlidingWindowWorkflowInput(
+                page_size=PAGE_SIZE,
+                sliding_window_size=3,
+                offset=0,
+                maximum_offset=RECORD_COUNT,
+                batch_size=batch_size,
+            ),
+            id=str(uuid.uuid4()),
+            task_queue=task_queue,
+        )
+
+        assert await handle.result() == RECORD_COUNT
+
+        # The run that started the first page continued-as-new
+        latest = await client.get_workflow_handle(handle.id).describe()
+        assert latest.run_id != handle.first_execution_run_id
+        assert Counter(processed.ids) == Counter(range(RECORD_COUNT))
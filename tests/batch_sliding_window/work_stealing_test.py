@@ -0,0 +1,122 @@
+import asyncio
+import dataclasses
+import uuid
+from typing import Optional
+
+from temporalio.client import Client, WorkflowHandle
+from temporalio.testing import ActivityEnvironment
+from temporalio.worker import Worker
+
+from batch_sliding_window.record_loader_activity import RecordLoader
+from batch_sliding_window.record_processor_workflow import RecordProcessorWorkflow
+from batch_sliding_window.record_ranges import RecordRange
+from batch_sliding_window.sliding_window_workflow import (
+    SlidingWindowState,
+    SlidingWindowWorkflow,
+    SlidingWindowWorkflowInput,
+)
+from batch_sliding_window.work_stealing import (
+    StealRecordsInput,
+    StealRecordsRequest,
+    WorkStealingCoordinator,
+)
+
+RECORD_COUNT = 1000
+
+
+async def start_victim(client: Client, task_queue: str) -> WorkflowHandle:
+    # A window of one child over many records keeps the victim busy, so it
+    # has unstarted records to give away for the whole test
+    handle = await client.start_workflow(
+        SlidingWindowWorkflow.run,
+        SlidingWindowWorkflowInput(
+            page_size=10,
+            sliding_window_size=1,
+            offset=0,
+            maximum_offset=RECORD_COUNT,
+        ),
+        id=str(uuid.uuid4()),
+        task_queue=task_queue,
+    )
+    while not await handle.query("unstarted_records", result_type=int):
+        await asyncio.sleep(0.1)
+    return handle
+
+
+async def steal(
+    handle: WorkflowHandle, request: StealRecordsRequest
+) -> Optional[RecordRange]:
+    # A new update id each time, as when a retried request reaches the victim
+    # after it continued-as-new and the server no longer deduplicates it
+    return await handle.execute_update(  # type: ignore[call-overload]
+        "steal_records",
+        request,
+        id=str(uuid.uuid4()),
+        result_type=Optional[RecordRange],
+    )
+
+
+async def test_repeated_steal_request_gets_same_records(client: Client):
+    task_queue = str(uuid.uuid4())
+    record_loader = RecordLoader(record_count=RECORD_COUNT)
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[SlidingWindowWorkflow, RecordProcessorWorkflow],
+        activities=[record_loader.get_record_page],
+    ):
+        handle = await start_victim(client, task_queue)
+        request = StealRecordsRequest(
+            workflow_id="thief", request_id="thief/run-1", min_records=10
+        )
+
+        first = await steal(handle, request)
+        second = await steal(handle, request)
+
+        assert first is not None
+        assert first.end == RECORD_COUNT
+        assert second == first
+        state = await handle.query("state", result_type=SlidingWindowState)
+        assert state.maximum_offset == first.start
+
+        # A new request from the same peer takes more records
+        third = await steal(
+            handle, dataclasses.replace(request, request_id="thief/run-2")
+        )
+        assert third is not None
+        assert third.end == first.start
+
+        await handle.terminate()
+
+
+async def test_retried_steal_activity_returns_first_grant(client: Client):
+    task_queue = str(uuid.uuid4())
+    record_loader = RecordLoader(record_count=RECORD_COUNT)
+    async with Worker(
+        client,
+        task_queue=task_queue,
+        workflows=[SlidingWindowWorkflow, RecordProcessorWorkflow],
+        activities=[record_loader.get_record_page],
+    ):
+        handle = await start_victim(client, task_queue)
+        coordinator = WorkStealingCoordinator(client)
+        input = StealRecordsInput(
+            workflow_id="thief",
+            request_id="thief/run-1",
+            peer_workflow_ids=[handle.id],
+            min_records=10,
+        )
+
+        first = await ActivityEnvironment().run(coordinator.steal_records, input)
+        # The first attempt's result was lost, for example because its worker
+        # died after the victim gave the records away
+        retry_environment = ActivityEnvironment()
+        retry_environment.info = dataclasses.replace(retry_environment.info, attempt=2)
+        retried = await retry_environment.run(coordinator.steal_records, input)
+
+        assert first is not None
+        assert retried == first
+        state = await handle.query("state", result_type=SlidingWindowState)
+        assert state.maximum_offset == first.start
+
+        await handle.terminate()
@@ -0,0 +1,87 @@
+from typing import Dict, List, Mapping, Optional
+
+import pytest
+from temporalio.api.common.v1 import Payload
+
+from encryption.codec import EncryptionCodec
+from encryption.keys import StaticKeyProvider
+
+KEYS = {
+    "key-1": b"key-1-key-1-key-1-key-1-key-1-!!",
+    "key-2": b"key-2-key-2-key-2-key-2-key-2-!!",
+}
+
+
+class CountingKeyProvider(StaticKeyProvider):
+    def __init__(self, keys: Mapping[str, bytes], active_key_id: str) -> None:
+        super().__init__(keys, active_key_id)
+        self.get_key_calls: Dict[str, int] = {}
+
+    async def get_key(self, key_id: str) -> Optional[bytes]:
+        self.get_key_calls[key_id] = self.get_key_calls.get(key_id, 0) + 1
+        return await super().get_key(key_id)
+
+
+def make_payloads(*values: str) -> List[Payload]:
+    return [
+        Payload(metadata={"encoding": b"json/plain"}, data=f'"{v}"'.encode())
+        for v in values
+    ]
+
+
+async def test_round_trip():
+    codec = EncryptionCodec()
+    payloads = make_payloads("one", "two")
+
+    encoded = await codec.encode(payloads)
+
+    assert all(p.metadata["encoding"] == b"binary/encrypted" for p in encoded)
+    assert all(p.metadata["encryption-key-id"] == b"test-key-id" for p in encoded)
+    # Every payload gets its own nonce
+    assert encoded[0].data[:12] != encoded[1].data[:12]
+    assert await codec.decode(encoded) == payloads
+
+
+async def test_decode_batch_encrypted_under_several_keys():
+    before = await EncryptionCodec(
+        key_provider=StaticKeyProvider(KEYS, "key-1")
+    ).encode(make_payloads("old"))
+    rotated = EncryptionCodec(key_provider=StaticKeyProvider(KEYS, "key-2"))
+    after = await rotated.encode(make_payloads("new"))
+    unencrypted = make_payloads("plain")
+
+    assert after[0].metadata["encryption-key-id"] == b"key-2"
+    assert await rotated.decode(before + unencrypted + after) == make_payloads(
+        "old", "plain", "new"
+    )
+
+
+async def test_ciphers_are_cached_per_key_id():
+    provider = CountingKeyProvider(KEYS, "key-1")
+    codec = EncryptionCodec(key_provider=provider)
+
+    encoded = await codec.encode(make_payloads("a"))
+    encoded += await codec.encode(make_payloads("b"))
+    assert await codec.decode(encoded) == make_payloads("a", "b")
+    assert await codec.decode(encoded) == make_payloads("a", "b")
+
+    assert provider.get_key_calls == {"key-1": 1}
+
+
+async def test_large_batches_run_in_executor():
+    codec = EncryptionCodec(min_batch_size=0)
+    payloads = make_payloads(*(str(i) for i in range(10)))
+
+    assert await codec.decode(await codec.encode(payloads)) == payloads
+
+
+async def test_unknown_key_id_is_rejected():
+    encoded = await EncryptionCodec(
+        key_provider=StaticKeyProvider(KEYS, "key-1")
+    ).encode(make_payloads("a"))
+    codec = EncryptionCodec(
+        key_provider=StaticKeyProvider({"key-2": KEYS["key-2"]}, "key-2")
+    )
+
+    with pytest.raises(ValueError, match="Unrecognized key ID key-1"):
+        await codec.decode(encoded)
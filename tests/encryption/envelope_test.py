@@ -0,0 +1,166 @@
+import asyncio
+from typing import List
+
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    ActivitySerializationContext,
+    WorkflowSerializationContext,
+)
+
+from encryption.envelope import EnvelopeEncryptionCodec, LocalKms, _single_flight
+from encryption.keys import StaticKeyProvider
+
+MASTER_KEY = b"master-key-master-key-master-key"
+ROTATED_MASTER_KEY = b"rotated-key-rotated-key-rotated!"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_kms(latency: float = 0.0) -> LocalKms:
+    return LocalKms(
+        StaticKeyProvider(
+            {"master-1": MASTER_KEY, "master-2": ROTATED_MASTER_KEY}, "master-2"
+        ),
+        latency=latency,
+    )
+
+
+def make_payloads(*values: str) -> List[Payload]:
+    return [
+        Payload(metadata={"encoding": b"json/plain"}, data=f'"{v}"'.encode())
+        for v in values
+    ]
+
+
+def workflow_context(workflow_id: str) -> WorkflowSerializationContext:
+    return WorkflowSerializationContext(namespace="default", workflow_id=workflow_id)
+
+
+def data_keys(payloads: List[Payload]) -> List[bytes]:
+    return [p.metadata["encryption-data-key"] for p in payloads]
+
+
+async def test_round_trip():
+    codec = EnvelopeEncryptionCodec(make_kms(), "master-1")
+    payloads = make_payloads("one", "two")
+
+    encoded = await codec.encode(payloads)
+
+    assert all(p.metadata["encoding"] == b"binary/encrypted-envelope" for p in encoded)
+    assert all(p.metadata["encryption-key-id"] == b"master-1" for p in encoded)
+    assert [p.data for p in encoded] != [p.data for p in payloads]
+    assert await codec.decode(encoded) == payloads
+
+
+async def test_one_data_key_per_workflow():
+    kms = make_kms()
+    codec = EnvelopeEncryptionCodec(kms, "master-1")
+    activity_context = ActivitySerializationContext(
+        namespace="default",
+        activity_id="1",
+        activity_type="act",
+        activity_task_queue="tq",
+        workflow_id="wf-1",
+        workflow_type="Workflow",
+        is_local=False,
+    )
+
+    wf1 = await codec.with_context(workflow_context("wf-1")).encode(
+        make_payloads("a", "b")
+    )
+    wf1_again = await codec.with_context(workflow_context("wf-1")).encode(
+        make_payloads("c")
+    )
+    wf1_activity = await codec.with_context(activity_context).encode(make_payloads("d"))
+    wf2 = await codec.with_context(workflow_context("wf-2")).encode(make_payloads("e"))
+
+    assert len(set(data_keys(wf1 + wf1_again + wf1_activity))) == 1
+    assert data_keys(wf2)[0] != data_keys(wf1)[0]
+    assert kms.generate_calls == 2
+    # Any copy of the codec decodes payloads of any workflow
+    assert await codec.decode(wf1 + wf2) == make_payloads("a", "b", "e")
+
+
+async def test_data_keys_are_cached_until_ttl():
+    kms = make_kms()
+    clock = FakeClock()
+    codec = EnvelopeEncryptionCodec(kms, "master-1", data_key_ttl=60, clock=clock)
+
+    first = await codec.encode(make_payloads("a"))
+    clock.now = 59
+    second = await codec.encode(make_payloads("b"))
+    assert data_keys(first) == data_keys(second)
+    assert kms.generate_calls == 1
+
+    clock.now = 60
+    third = await codec.encode(make_payloads("c"))
+    assert data_keys(third) != data_keys(first)
+    assert kms.generate_calls == 2
+
+
+async def test_unwrapped_data_keys_are_cached_until_ttl():
+    kms = make_kms()
+    encoded = await EnvelopeEncryptionCodec(kms, "master-1").encode(
+        make_payloads("a", "b", "c")
+    )
+    clock = FakeClock()
+    decoder = EnvelopeEncryptionCodec(kms, "master-1", data_key_ttl=60, clock=clock)
+
+    await decoder.decode(encoded)
+    await decoder.decode(encoded)
+    assert kms.decrypt_calls == 1
+
+    clock.now = 60
+    assert await decoder.decode(encoded) == make_payloads("a", "b", "c")
+    assert kms.decrypt_calls == 2
+
+
+async def test_concurrent_batches_share_kms_calls():
+    kms = make_kms(latency=0.05)
+    codec = EnvelopeEncryptionCodec(kms, "master-1")
+
+    encoded = await asyncio.gather(
+        *(codec.encode(make_payloads(str(i))) for i in range(10))
+    )
+    assert kms.generate_calls == 1
+
+    decoder = EnvelopeEncryptionCodec(kms, "master-1")
+    decoded = await asyncio.gather(*(decoder.decode(e) for e in encoded))
+    assert kms.decrypt_calls == 1
+    assert decoded == [make_payloads(str(i)) for i in range(10)]
+
+
+async def test_single_flight_shares_failures():
+    calls = 0
+
+    async def fail() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("KMS unavailable")
+
+    in_flight: dict = {}
+    results = await asyncio.gather(
+        *(_single_flight(in_flight, "key", fail) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert in_flight == {}
+
+
+async def test_decode_after_master_key_rotation():
+    kms = make_kms()
+    before = await EnvelopeEncryptionCodec(kms, "master-1").encode(make_payloads("old"))
+
+    rotated = EnvelopeEncryptionCodec(kms, "master-2")
+    after = await rotated.encode(make_payloads("new"))
+
+    assert after[0].metadata["encryption-key-id"] == b"master-2"
+    assert await rotated.decode(before + after) == make_payloads("old", "new")
@@ -0,0 +1,83 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from encryption.keys import (
+    FileKeyProvider,
+    StaticKeyProvider,
+    read_keyring,
+    rotate_keyring,
+)
+
+
+def bump_mtime(path: Path) -> None:
+    # Rewrites in quick succession can share an mtime on coarse filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+async def test_static_key_provider():
+    provider = StaticKeyProvider({"key-1": b"1" * 32, "key-2": b"2" * 32}, "key-2")
+
+    assert await provider.active_key_id() == "key-2"
+    assert await provider.get_key("key-1") == b"1" * 32
+    assert await provider.get_key("key-3") is None
+
+
+def test_static_key_provider_rejects_unknown_active_key():
+    with pytest.raises(ValueError, match="Active key ID key-2 is not in the keyring"):
+        StaticKeyProvider({"key-1": b"1" * 32}, "key-2")
+
+
+def test_rotate_keyring_keeps_earlier_keys(tmp_path: Path):
+    path = tmp_path / "keyring.json"
+
+    first = rotate_keyring(str(path))
+    second = rotate_keyring(str(path))
+
+    active, keys = read_keyring(str(path))
+    assert active == second
+    assert set(keys) == {first, second}
+    assert all(len(key) == 32 for key in keys.values())
+    assert keys[first] != keys[second]
+    assert os.listdir(tmp_path) == ["keyring.json"]
+
+
+def test_read_keyring_rejects_unknown_active_key(tmp_path: Path):
+    path = tmp_path / "keyring.json"
+    path.write_text(json.dumps({"active": "missing", "keys": {}}))
+
+    with pytest.raises(ValueError, match="Active key ID missing is not in"):
+        read_keyring(str(path))
+
+
+async def test_file_key_provider_reloads_after_interval(tmp_path: Path):
+    path = tmp_path / "keyring.json"
+    first = rotate_keyring(str(path))
+    provider = FileKeyProvider(str(path), reload_interval=0)
+    assert await provider.active_key_id() == first
+
+    second = rotate_keyring(str(path))
+    bump_mtime(path)
+
+    assert await provider.active_key_id() == second
+    # Keys retired by the rotation still resolve
+    assert await provider.get_key(first) == read_keyring(str(path))[1][first]
+
+
+async def test_file_key_provider_reloads_for_unknown_key(tmp_path: Path):
+    path = tmp_path / "keyring.json"
+    first = rotate_keyring(str(path))
+    provider = FileKeyProvider(str(path), reload_interval=3600)
+
+    second = rotate_keyring(str(path))
+    bump_mtime(path)
+
+    # The interval has not passed, so the active key is still the old one
+    assert await provider.active_key_id() == first
+    # but a payload encrypted under the new key is decodable right away
+    assert await provider.get_key(second) == read_keyring(str(path))[1][second]
+    assert await provider.active_key_id() == second
+    assert await provider.get_key("key-unknown") is None
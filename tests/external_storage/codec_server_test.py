@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import ExternalStorage
+
+from external_storage.cache import DecodedPayloadCache
+from external_storage.codec_server import RequestMetrics, _percentile, build_app
+from external_storage.handler import payload_routes
+from tests.external_storage.handler_test import (
+    JSON,
+    THRESHOLD,
+    InMemoryDriver,
+    make_payload,
+    read_payloads,
+    to_json,
+)
+
+
+async def fail_with_500(request: web.Request) -> web.StreamResponse:
+    raise web.HTTPInternalServerError()
+
+
+async def fail_with_exception(request: web.Request) -> web.StreamResponse:
+    raise RuntimeError("handler failed")
+
+
+def make_client(cache: DecodedPayloadCache) -> TestClient:
+    return TestClient(
+        TestServer(
+            build_app(
+                {
+                    "default": payload_routes(
+                        ExternalStorage(
+                            drivers=[InMemoryDriver()],
+                            payload_size_threshold=THRESHOLD,
+                        ),
+                        cache=cache,
+                    ),
+                    "failing": [
+                        web.post("/encode", fail_with_exception),
+                        web.post("/decode", fail_with_500),
+                    ],
+                },
+                cache,
+            )
+        )
+    )
+
+
+async def post(
+    client: TestClient,
+    path: str,
+    payloads: List[Payload],
+    *,
+    namespace: Optional[str] = "default",
+    content_type: str = JSON,
+) -> aiohttp.ClientResponse:
+    headers = {"Content-Type": content_type}
+    if namespace is not None:
+        headers["X-Namespace"] = namespace
+    return await client.post(path, data=to_json(payloads).encode(), headers=headers)
+
+
+async def health(client: TestClient) -> Dict[str, Any]:
+    response = await client.get("/health")
+    assert response.status == 200
+    return await response.json()
+
+
+async def test_health_reports_requests_per_namespace():
+    cache = DecodedPayloadCache()
+    async with make_client(cache) as client:
+        payloads = [make_payload(2 * THRESHOLD)]
+        encoded = await read_payloads(await post(client, "/encode", payloads))
+        for _ in range(2):
+            response = await post(client, "/decode", encoded)
+            assert await read_payloads(response) == payloads
+        # Namespaces the server does not host share one bucket
+        for namespace in ["other", None]:
+            response = await post(client, "/decode", encoded, namespace=namespace)
+            assert response.status == 404
+
+        snapshot = await health(client)
+
+        assert snapshot["status"] == "ok"
+        assert snapshot["cache"] == cache.stats()
+        assert cache.hits == cache.misses == 1
+        namespaces = snapshot["namespaces"]
+        assert set(namespaces) == {"default", "<unknown>"}
+        assert set(namespaces["default"]) == {"/encode", "/decode"}
+        assert namespaces["default"]["/encode"]["requests"] == 1
+        assert namespaces["default"]["/decode"]["requests"] == 2
+        assert set(namespaces["<unknown>"]) == {"/decode"}
+        assert namespaces["<unknown>"]["/decode"]["requests"] == 2
+        for endpoint in [*namespaces["default"].values(), namespaces["<unknown>"]]:
+            assert endpoint["errors"] == 0
+        decode = namespaces["default"]["/decode"]
+        assert 0 < decode["p50_ms"] <= decode["p99_ms"] <= decode["max_ms"]
+
+
+async def test_client_errors_are_not_counted_as_errors():
+    async with make_client(DecodedPayloadCache()) as client:
+        response = await post(client, "/decode", [], content_type="text/plain")
+        assert response.status == 415
+        response = await post(client, "/download", [make_payload(10)])
+        assert response.status == 400
+
+        namespaces = (await health(client))["namespaces"]
+
+        for path in ["/decode", "/download"]:
+            assert namespaces["default"][path]["requests"] == 1
+            assert namespaces["default"][path]["errors"] == 0
+
+
+async def test_server_errors_are_counted_as_errors():
+    async with make_client(DecodedPayloadCache()) as client:
+        for path in ["/encode", "/decode"]:
+            response = await post(client, path, [], namespace="failing")
+            assert response.status == 500
+
+        namespaces = (await health(client))["namespaces"]
+
+        for path in ["/encode", "/decode"]:
+            assert namespaces["failing"][path]["requests"] == 1
+            assert namespaces["failing"][path]["errors"] == 1
+
+
+def test_percentile():
+    ordered = [float(i) for i in range(1, 101)]
+
+    assert _percentile(ordered, 0.50) == 51
+    assert _percentile(ordered, 0.99) == 100
+    assert _percentile(ordered, 1.0) == 100
+    assert _percentile([7.0], 0.99) == 7
+
+
+def test_request_metrics_keep_only_recent_latencies():
+    metrics = RequestMetrics(window=4)
+
+    for seconds in [10.0, 10.0, 1.0, 2.0, 3.0, 4.0]:
+        metrics.record("default", "/decode", seconds, error=seconds > 3)
+
+    decode = metrics.snapshot()["namespaces"]["default"]["/decode"]
+    assert decode == {
+        "requests": 6,
+        "errors": 3,
+        "p50_ms": 3000,
+        "p99_ms": 4000,
+        "max_ms": 4000,
+    }
@@ -0,0 +1,171 @@
+import gzip
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+import pytest
+import temporalio.converter
+import zstandard
+from temporalio.api.common.v1 import Payload
+
+from external_storage._sample_data import generate_orders
+from external_storage.codec import (
+    CompressionCodec,
+    ExecutorCodec,
+    GzipCompressor,
+    Lz4Compressor,
+    ZstdCompressor,
+    train_zstd_dictionary,
+)
+
+COMPRESSORS = [GzipCompressor, ZstdCompressor, Lz4Compressor]
+
+
+def make_payload(text: str = "compressible " * 1000) -> Payload:
+    return Payload(metadata={"encoding": b"json/plain"}, data=f'"{text}"'.encode())
+
+
+def order_payloads(batch_id: str, count: int) -> List[Payload]:
+    converter = temporalio.converter.default().payload_converter
+    return [converter.to_payloads([o])[0] for o in generate_orders(batch_id, count)]
+
+
+@pytest.mark.parametrize("compressor", COMPRESSORS)
+async def test_round_trip(compressor: type):
+    codec = CompressionCodec(compressor())
+    payloads = [make_payload(), make_payload("other " * 500)]
+
+    encoded = await codec.encode(payloads)
+
+    assert all(p.metadata["encoding"] == compressor.ENCODING for p in encoded)
+    assert all(len(e.data) < p.ByteSize() for e, p in zip(encoded, payloads))
+    assert await codec.decode(encoded) == payloads
+
+
+async def test_default_compressor_is_gzip():
+    # Codecs from before CompressionCodec was pluggable only decode gzip
+    [encoded] = await CompressionCodec().encode([make_payload()])
+
+    assert encoded.metadata["encoding"] == b"binary/gzip"
+
+
+async def test_small_and_incompressible_payloads_are_left_untouched():
+    codec = CompressionCodec(min_size=1024)
+    small = make_payload("tiny")
+    incompressible = Payload(
+        metadata={"encoding": b"binary/plain"},
+        data=random.Random(0).randbytes(4096),
+    )
+
+    encoded = await codec.encode([small, incompressible])
+
+    assert encoded == [small, incompressible]
+    assert await codec.decode(encoded) == [small, incompressible]
+
+
+@pytest.mark.parametrize("encoder", COMPRESSORS)
+async def test_every_codec_decodes_every_encoding(encoder: type):
+    payload = make_payload()
+    encoded = [
+        (await CompressionCodec(compressor()).encode([payload]))[0]
+        for compressor in COMPRESSORS
+    ]
+    # Written before CompressionCodec was pluggable, by plain gzip
+    encoded.append(
+        Payload(
+            metadata={"encoding": b"binary/gzip"},
+            data=gzip.compress(payload.SerializeToString()),
+        )
+    )
+
+    decoded = await CompressionCodec(encoder()).decode(encoded)
+
+    assert decoded == [payload] * 4
+
+
+async def test_zstd_dictionary_decodes_through_decompressors():
+    dictionary = train_zstd_dictionary(order_payloads("TRAIN", 500), size=16 * 1024)
+    payloads = order_payloads("TEST", 3)
+    with_dictionary = CompressionCodec(ZstdCompressor(dictionary=dictionary))
+    without_dictionary = await CompressionCodec(ZstdCompressor()).encode(payloads)
+
+    encoded = await with_dictionary.encode(payloads)
+
+    assert all(p.metadata["encoding"] == b"binary/zstd" for p in encoded)
+    # The dictionary holds what single payloads have in common
+    assert sum(len(p.data) for p in encoded) < sum(
+        len(p.data) for p in without_dictionary
+    )
+    # A codec encoding with gzip reads them through its decompressors
+    decoder = CompressionCodec(decompressors=[ZstdCompressor(dictionary=dictionary)])
+    assert await decoder.decode(encoded) == payloads
+    # but not with its built-in zstd decoder
+    with pytest.raises(zstandard.ZstdError):
+        await CompressionCodec().decode(encoded)
+
+
+def test_decompressors_must_not_repeat_an_encoding():
+    with pytest.raises(ValueError, match="More than one compressor"):
+        CompressionCodec(ZstdCompressor(), decompressors=[ZstdCompressor()])
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+class ThreadRecordingCodec(CompressionCodec):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: List[int] = []
+
+    def encode_sync(self, payloads):
+        self.threads.append(threading.get_ident())
+        return super().encode_sync(payloads)
+
+    def decode_sync(self, payloads):
+        self.threads.append(threading.get_ident())
+        return super().decode_sync(payloads)
+
+
+async def test_executor_codec_runs_small_batches_inline():
+    codec = ThreadRecordingCodec()
+    with CountingExecutor() as executor:
+        wrapped = ExecutorCodec(codec, executor=executor, min_batch_size=64 * 1024)
+        payloads = [make_payload()]
+
+        assert await wrapped.decode(await wrapped.encode(payloads)) == payloads
+
+        assert executor.submitted == 0
+        assert codec.threads == [threading.get_ident()] * 2
+
+
+async def test_executor_codec_runs_large_batches_in_executor():
+    codec = ThreadRecordingCodec()
+    with CountingExecutor() as executor:
+        # The compressed batch decode sees is far smaller than the input
+        wrapped = ExecutorCodec(codec, executor=executor, min_batch_size=1)
+        payloads = [make_payload()]
+
+        assert await wrapped.decode(await wrapped.encode(payloads)) == payloads
+
+        assert executor.submitted == 2
+        assert threading.get_ident() not in codec.threads
+
+
+async def test_executor_codec_with_process_pool():
+    codec = CompressionCodec(ZstdCompressor())
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        wrapped = ExecutorCodec(codec, executor=executor, min_batch_size=1)
+        payloads = [make_payload(), make_payload("other " * 500)]
+
+        encoded = await wrapped.encode(payloads)
+
+        assert encoded == await codec.encode(payloads)
+        assert await wrapped.decode(encoded) == payloads
@@ -0,0 +1,334 @@
+import asyncio
+import random
+from typing import Dict, List, Optional, Sequence
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from google.protobuf import json_format
+from temporalio.api.common.v1 import Payload, Payloads
+from temporalio.converter import (
+    ExternalStorage,
+    StorageDriver,
+    StorageDriverClaim,
+    StorageDriverRetrieveContext,
+    StorageDriverStoreContext,
+)
+
+from external_storage.cache import DecodedPayloadCache
+from external_storage.codec import CompressionCodec
+from external_storage.handler import payload_routes
+
+THRESHOLD = 1024
+JSON = "application/json"
+PROTOBUF = "application/x-protobuf"
+
+
+class InMemoryDriver(StorageDriver):
+    """Keeps payloads in a dict and records how retrieval was spread out."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Payload] = {}
+        # Seconds a retrieve of each key waits, to reorder completions
+        self.delays: Dict[str, float] = {}
+        # Events a retrieve of each key waits for, to step through a request
+        self.gates: Dict[str, asyncio.Event] = {}
+        self.started = 0
+        self.retrieved: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def name(self) -> str:
+        return "memory"
+
+    def type(self) -> str:
+        return "memory"
+
+    async def store(
+        self, context: StorageDriverStoreContext, payloads: Sequence[Payload]
+    ) -> List[StorageDriverClaim]:
+        claims = []
+        for payload in payloads:
+            key = f"key-{len(self.values)}"
+            self.values[key] = payload
+            claims.append(StorageDriverClaim(claim_data={"key": key}))
+        return claims
+
+    async def retrieve(
+        self,
+        context: StorageDriverRetrieveContext,
+        claims: Sequence[StorageDriverClaim],
+    ) -> List[Payload]:
+        keys = [claim.claim_data["key"] for claim in claims]
+        self.started += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(max(self.delays.get(key, 0) for key in keys))
+            for key in keys:
+                if key in self.gates:
+                    await self.gates[key].wait()
+        finally:
+            self.in_flight -= 1
+        self.retrieved.extend(keys)
+        return [self.values[key] for key in keys]
+
+
+def make_payload(size: int, seed: int = 0) -> Payload:
+    # Random bytes, so compression leaves them above the threshold
+    return Payload(
+        metadata={"encoding": b"binary/plain"},
+        data=random.Random(seed).randbytes(size),
+    )
+
+
+def to_json(payloads: List[Payload]) -> str:
+    return json_format.MessageToJson(Payloads(payloads=payloads))
+
+
+async def post(
+    client: TestClient,
+    path: str,
+    payloads: List[Payload],
+    *,
+    content_type: str = JSON,
+    accept: Optional[str] = None,
+) -> aiohttp.ClientResponse:
+    if content_type == PROTOBUF:
+        body = Payloads(payloads=payloads).SerializeToString()
+    else:
+        body = to_json(payloads).encode()
+    headers = {"Content-Type": content_type}
+    if accept is not None:
+        headers["Accept"] = accept
+    return await client.post(path, data=body, headers=headers)
+
+
+async def read_payloads(response: aiohttp.ClientResponse) -> List[Payload]:
+    assert response.status == 200, await response.text()
+    body = await response.read()
+    if response.content_type == PROTOBUF:
+        return list(Payloads.FromString(body).payloads)
+    assert response.content_type == JSON
+    return list(json_format.Parse(body, Payloads()).payloads)
+
+
+def make_client(driver: InMemoryDriver, **kwargs) -> TestClient:
+    app = web.Application()
+    app.add_routes(
+        payload_routes(
+            ExternalStorage(drivers=[driver], payload_size_threshold=THRESHOLD),
+            **kwargs,
+        )
+    )
+    return TestClient(TestServer(app))
+
+
+async def store(client: TestClient, payloads: List[Payload]) -> List[Payload]:
+    references = await read_payloads(await post(client, "/encode", payloads))
+    assert len(references) == len(payloads)
+    return references
+
+
+@pytest.mark.parametrize("stream_responses", [False, True])
+async def test_encode_then_decode_round_trip(stream_responses: bool):
+    driver = InMemoryDriver()
+    async with make_client(
+        driver,
+        prestorage_codec=CompressionCodec(),
+        stream_responses=stream_responses,
+    ) as client:
+        small = Payload(metadata={"encoding": b"json/plain"}, data=b'"small"')
+        payloads = [make_payload(4 * THRESHOLD, seed=1), small]
+
+        encoded = await store(client, payloads)
+        assert len(driver.values) == 1
+        assert encoded[1] == small
+
+        decoded = await read_payloads(await post(client, "/decode", encoded))
+        assert decoded == payloads
+        downloaded = await read_payloads(await post(client, "/download", encoded[:1]))
+        assert downloaded == payloads[:1]
+
+
+@pytest.mark.parametrize("stream_responses", [False, True])
+@pytest.mark.parametrize(
+    "accept, content_type",
+    [
+        (None, JSON),
+        ("*/*", JSON),
+        (PROTOBUF, PROTOBUF),
+        (f"{PROTOBUF}, {JSON}", PROTOBUF),
+        (f"{JSON}, {PROTOBUF}", JSON),
+        (f"{PROTOBUF};q=0, {JSON}", JSON),
+    ],
+)
+async def test_accept_selects_response_format(
+    stream_responses: bool, accept: Optional[str], content_type: str
+):
+    driver = InMemoryDriver()
+    async with make_client(driver, stream_responses=stream_responses) as client:
+        payloads = [make_payload(2 * THRESHOLD, seed=i) for i in range(3)]
+        encoded = await store(client, payloads)
+
+        response = await post(client, "/decode", encoded, accept=accept)
+
+        assert response.content_type == content_type
+        assert await read_payloads(response) == payloads
+
+
+async def test_protobuf_request_body():
+    driver = InMemoryDriver()
+    async with make_client(driver) as client:
+        payloads = [make_payload(2 * THRESHOLD)]
+
+        response = await post(
+            client, "/encode", payloads, content_type=PROTOBUF, accept=PROTOBUF
+        )
+        encoded = await read_payloads(response)
+        assert response.content_type == PROTOBUF
+
+        response = await post(client, "/decode", encoded, content_type=PROTOBUF)
+        assert await read_payloads(response) == payloads
+
+
+async def test_unsupported_content_type_is_rejected():
+    async with make_client(InMemoryDriver()) as client:
+        response = await post(client, "/decode", [], content_type="text/plain")
+
+        assert response.status == 415
+
+
+async def test_download_rejects_inline_payloads():
+    async with make_client(InMemoryDriver()) as client:
+        response = await post(client, "/download", [make_payload(10)])
+
+        assert response.status == 400
+
+
+async def test_streaming_keeps_request_order_within_max_concurrency():
+    driver = InMemoryDriver()
+    async with make_client(driver, stream_responses=True, max_concurrency=3) as client:
+        payloads = [make_payload(2 * THRESHOLD, seed=i) for i in range(8)]
+        encoded = await store(client, payloads)
+        # Earlier payloads take longer, so they finish in reverse order
+        for i, key in enumerate(driver.values):
+            driver.delays[key] = 0.01 * (8 - i)
+
+        for accept in [JSON, PROTOBUF]:
+            driver.max_in_flight = 0
+            response = await post(client, "/decode", encoded, accept=accept)
+            assert await read_payloads(response) == payloads
+            assert driver.max_in_flight == 3
+
+
+async def test_streaming_rejects_oversized_first_payload_with_413():
+    driver = InMemoryDriver()
+    async with make_client(
+        driver, stream_responses=True, memory_budget=4 * THRESHOLD
+    ) as client:
+        encoded = await store(client, [make_payload(8 * THRESHOLD)])
+
+        response = await post(client, "/decode", encoded)
+
+        assert response.status == 413
+
+
+async def test_streaming_aborts_mid_body_on_oversized_payload():
+    driver = InMemoryDriver()
+    async with make_client(
+        driver, stream_responses=True, memory_budget=4 * THRESHOLD
+    ) as client:
+        encoded = await store(
+            client,
+            [make_payload(2 * THRESHOLD, seed=0), make_payload(8 * THRESHOLD, seed=1)],
+        )
+
+        response = await post(client, "/decode", encoded)
+
+        # The first payload was already written, so the status is 200 and
+        # the body is cut off instead
+        assert response.status == 200
+        with pytest.raises(aiohttp.ClientPayloadError):
+            await response.read()
+
+
+async def test_streaming_holds_fetches_within_memory_budget():
+    driver = InMemoryDriver()
+    async with make_client(
+        driver,
+        stream_responses=True,
+        max_concurrency=4,
+        memory_budget=5 * THRESHOLD,
+    ) as client:
+        payloads = [make_payload(2 * THRESHOLD, seed=i) for i in range(8)]
+        encoded = await store(client, payloads)
+        keys = list(driver.values)
+        driver.gates = {key: asyncio.Event() for key in keys}
+
+        async def wait_for_started(count: int) -> None:
+            while driver.started < count:
+                await asyncio.sleep(0.001)
+            # Give the handler a chance to start more than it should
+            await asyncio.sleep(0.05)
+            assert driver.started == count
+
+        response_task = asyncio.create_task(post(client, "/decode", encoded))
+        # Payload sizes are unknown until one is fetched, so the first
+        # fetches are bounded by max_concurrency alone
+        await wait_for_started(4)
+
+        # Three fetches of the size just seen would exceed the budget
+        driver.gates[keys[0]].set()
+        await wait_for_started(4)
+
+        # Once the second is written, two more fit
+        driver.gates[keys[1]].set()
+        await wait_for_started(5)
+
+        for gate in driver.gates.values():
+            gate.set()
+        assert await read_payloads(await response_task) == payloads
+        assert driver.started == 8
+
+
+@pytest.mark.parametrize("stream_responses", [False, True])
+async def test_cache_serves_repeated_decodes(stream_responses: bool):
+    driver = InMemoryDriver()
+    cache = DecodedPayloadCache()
+    async with make_client(
+        driver,
+        prestorage_codec=CompressionCodec(),
+        stream_responses=stream_responses,
+        cache=cache,
+    ) as client:
+        payloads = [make_payload(2 * THRESHOLD, seed=i) for i in range(3)]
+        encoded = await store(client, payloads)
+
+        first = await read_payloads(await post(client, "/decode", encoded))
+        second = await read_payloads(await post(client, "/decode", encoded))
+        downloaded = await read_payloads(await post(client, "/download", encoded))
+
+        assert first == second == downloaded == payloads
+        assert len(driver.retrieved) == 3
+        assert cache.hits == 6
+        assert cache.misses == 3
+        assert len(cache) == 3
+
+
+async def test_preserved_references_bypass_cache():
+    driver = InMemoryDriver()
+    cache = DecodedPayloadCache()
+    async with make_client(driver, cache=cache) as client:
+        encoded = await store(client, [make_payload(2 * THRESHOLD)])
+
+        response = await client.post(
+            "/decode?preserveStorageRefs=true",
+            data=to_json(encoded).encode(),
+            headers={"Content-Type": JSON},
+        )
+
+        assert await read_payloads(response) == encoded
+        assert driver.retrieved == []
+        assert cache.hits == cache.misses == 0
@@ -0,0 +1,149 @@
+import random
+import socket
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import aioboto3
+import pytest
+import pytest_asyncio
+from moto.server import ThreadedMotoServer
+from types_aiobotocore_s3.client import S3Client
+
+from external_storage.parallel_s3 import MIN_PART_SIZE, new_parallel_aioboto3_client
+
+PART_SIZE = MIN_PART_SIZE
+
+
+class RecordingClient:
+    """Forwards calls to an S3 client, recording them and failing one part."""
+
+    def __init__(self, client: S3Client, fail_part: Optional[int] = None) -> None:
+        self._client = client
+        self._fail_part = fail_part
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        async def call(**kwargs: Any) -> Any:
+            self.calls.append((name, kwargs))
+            if name == "upload_part" and kwargs["PartNumber"] == self._fail_part:
+                raise RuntimeError(f"Part {self._fail_part} failed")
+            return await attr(**kwargs)
+
+        return call
+
+    def called(self, name: str) -> List[Dict[str, Any]]:
+        return [kwargs for called, kwargs in self.calls if called == name]
+
+
+@pytest.fixture(scope="module")
+def endpoint() -> Iterator[str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.stop()
+
+
+@pytest_asyncio.fixture
+async def s3(endpoint: str) -> AsyncIterator[S3Client]:
+    async with aioboto3.Session().client(
+        "s3",
+        endpoint_url=endpoint,
+        region_name="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    ) as client:
+        yield client
+
+
+@pytest_asyncio.fixture
+async def bucket(s3: S3Client) -> str:
+    name = f"payloads-{uuid.uuid4()}"
+    await s3.create_bucket(Bucket=name)
+    return name
+
+
+@pytest.mark.parametrize(
+    "size",
+    [1024, PART_SIZE, PART_SIZE + 1, 2 * PART_SIZE + 1024 * 1024],
+)
+async def test_round_trip(s3: S3Client, bucket: str, size: int):
+    recording = RecordingClient(s3)
+    client = new_parallel_aioboto3_client(recording, part_size=PART_SIZE)
+    data = random.Random(size).randbytes(size)
+
+    await client.put_object(bucket=bucket, key="payload", data=data)
+    assert await client.object_exists(bucket=bucket, key="payload")
+    result = await client.get_object(bucket=bucket, key="payload")
+
+    assert type(result) is bytes
+    assert result == data
+    # Other clients read the object as a whole
+    response = await s3.get_object(Bucket=bucket, Key="payload")
+    assert await response["Body"].read() == data
+    parts = recording.called("upload_part")
+    if size <= PART_SIZE:
+        assert parts == []
+        assert len(recording.called("put_object")) == 1
+    else:
+        assert len(parts) == -(-size // PART_SIZE)
+        assert len(recording.called("complete_multipart_upload")) == 1
+
+
+async def test_get_object_fetches_remaining_ranges_pinned_to_etag(
+    s3: S3Client, bucket: str
+):
+    size = 2 * PART_SIZE + 1024 * 1024
+    data = random.Random(0).randbytes(size)
+    await s3.put_object(Bucket=bucket, Key="payload", Body=data)
+    recording = RecordingClient(s3)
+    client = new_parallel_aioboto3_client(recording, part_size=PART_SIZE)
+
+    assert await client.get_object(bucket=bucket, key="payload") == data
+
+    gets = recording.called("get_object")
+    assert sorted(get["Range"] for get in gets) == [
+        f"bytes=0-{PART_SIZE - 1}",
+        f"bytes={PART_SIZE}-{2 * PART_SIZE - 1}",
+        f"bytes={2 * PART_SIZE}-{size - 1}",
+    ]
+    etag = (await s3.head_object(Bucket=bucket, Key="payload"))["ETag"]
+    assert [get.get("IfMatch") for get in gets] == [None, etag, etag]
+
+
+async def test_get_object_takes_one_request_for_small_objects(
+    s3: S3Client, bucket: str
+):
+    await s3.put_object(Bucket=bucket, Key="payload", Body=b"small")
+    recording = RecordingClient(s3)
+    client = new_parallel_aioboto3_client(recording, part_size=PART_SIZE)
+
+    assert await client.get_object(bucket=bucket, key="payload") == b"small"
+
+    assert len(recording.called("get_object")) == 1
+
+
+async def test_failed_part_aborts_multipart_upload(s3: S3Client, bucket: str):
+    recording = RecordingClient(s3, fail_part=2)
+    client = new_parallel_aioboto3_client(
+        recording, part_size=PART_SIZE, max_concurrency=1
+    )
+    data = random.Random(0).randbytes(3 * PART_SIZE)
+
+    with pytest.raises(RuntimeError, match="Part 2 failed"):
+        await client.put_object(bucket=bucket, key="payload", data=data)
+
+    [upload] = recording.called("upload_part")[-1:]
+    [abort] = recording.called("abort_multipart_upload")
+    assert abort["UploadId"] == upload["UploadId"]
+    assert recording.called("complete_multipart_upload") == []
+    assert "Uploads" not in await s3.list_multipart_uploads(Bucket=bucket)
+    assert not await client.object_exists(bucket=bucket, key="payload")
@@ -0,0 +1,89 @@
+"""Micro-benchmark for RedisStorageDriver key construction.
+
+Measures the per-payload cost of building Redis keys three ways:
+
+* ``uncached``: quote the execution identity for every payload, which is what
+  the driver did before identity segments were memoized.
+* ``cached``: build the full key prefix for every payload, with identity
+  quoting served from the memoization cache.
+* ``per_call``: build the key prefix once per ``store`` call and only append
+  each payload digest, which is what ``RedisStorageDriver.store`` does.
+
+Run from the repository root with:
+
+    uv run python -m tests.external_storage_redis.benchmark_build_key
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import timeit
+from unittest.mock import MagicMock
+
+from temporalio.converter import StorageDriverStoreContext, StorageDriverWorkflowInfo
+
+from external_storage_redis import RedisStorageDriver, RedisStorageDriverClient
+from external_storage_redis._driver import _quoted_identity
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--payloads", type=int, default=500, help="payloads per store call"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=200, help="store calls to time per variant"
+    )
+    args = parser.parse_args()
+
+    driver = RedisStorageDriver(client=MagicMock(spec=RedisStorageDriverClient))
+    target = StorageDriverWorkflowInfo(
+        namespace="my-namespace",
+        type="OrderFulfillmentWorkflow",
+        id="order/2024-06-01/#12345",
+        run_id="6f1c2b8e-0a4d-4c1f-9d57-3f0b8a1e2c44",
+    )
+    context = StorageDriverStoreContext(target=target)
+    digests = [
+        hashlib.sha256(str(i).encode()).hexdigest() for i in range(args.payloads)
+    ]
+    uncached_identity = _quoted_identity.__wrapped__  # type: ignore[attr-defined]
+
+    def uncached() -> list[str]:
+        keys = []
+        for digest in digests:
+            identity = uncached_identity(
+                target.namespace, "w", target.type, target.id, target.run_id
+            )
+            keys.append(f"temporalio:payloads:v0{identity}:d:sha256:{digest}")
+        return keys
+
+    def cached() -> list[str]:
+        return [f"{driver._build_key_prefix(context)}:{digest}" for digest in digests]
+
+    def per_call() -> list[str]:
+        key_prefix = driver._build_key_prefix(context)
+        return [f"{key_prefix}:{digest}" for digest in digests]
+
+    assert uncached() == cached() == per_call()
+
+    print(f"{args.payloads} payloads per call, {args.repeat} calls per variant")
+    baseline_ns = None
+    for name, fn in [
+        ("uncached", uncached),
+        ("cached", cached),
+        ("per_call", per_call),
+    ]:
+        seconds = min(timeit.repeat(fn, number=args.repeat, repeat=5))
+        ns_per_payload = seconds / (args.repeat * args.payloads) * 1e9
+        if baseline_ns is None:
+            baseline_ns = ns_per_payload
+        print(
+            f"  {name:<9} {ns_per_payload:8.1f} ns/payload "
+            f"({baseline_ns / ns_per_payload:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
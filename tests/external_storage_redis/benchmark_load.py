@@ -0,0 +1,342 @@
+"""Load test reporting RedisStorageDriver throughput and latency percentiles.
+
+Runs a grid of scenarios over payload size, payloads per call, and the number
+of concurrent callers. After a warmup round, every caller issues ``--calls``
+``store`` calls concurrently with the other callers. Then every caller
+retrieves its claims with the same number of ``retrieve`` calls. Each call is
+timed separately, and throughput is measured over each phase. Every payload
+is distinct random bytes, so the driver never dedupes a write.
+
+For each scenario and operation the harness reports payload throughput,
+MiB/s, and p50/p99 call latency. With ``--output`` the results are also
+written as JSON, so runs before and after a driver change can be compared.
+
+By default the driver talks to an in-process ``fakeredis`` server, which
+measures the driver's own overhead. Pass ``--redis-url`` to measure against a
+real server; keys are written under a unique prefix with a short TTL and
+deleted after each scenario. Payloads are generated before timing starts, so
+scenarios whose inputs would exceed ``--max-scenario-mb`` make fewer calls;
+the number of calls measured is part of every result. Pass ``--baseline``
+with the JSON of an earlier run to print the change in throughput and p99
+latency for every scenario both runs cover.
+
+Run from the repository root with:
+
+    uv run --group external-storage-redis --group dev \\
+        python -m tests.external_storage_redis.benchmark_load \\
+        --payload-kb 16 --payload-kb 1024 --batch 1 --batch 50 \\
+        --concurrency 1 --concurrency 16 --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import Any
+
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import (
+    StorageDriverClaim,
+    StorageDriverRetrieveContext,
+    StorageDriverStoreContext,
+)
+
+from external_storage_redis import RedisStorageDriver
+from external_storage_redis.redis_asyncio import new_redis_asyncio_client
+
+_MIB = 1024 * 1024
+
+
+@dataclass
+class OperationResult:
+    """Measurements for one operation of one scenario."""
+
+    scenario: str
+    operation: str
+    payload_kb: int
+    batch: int
+    concurrency: int
+    calls: int
+    warmup_calls: int
+    payloads_per_second: float
+    mib_per_second: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+@asynccontextmanager
+async def _redis_client(redis_url: str | None) -> AsyncIterator[Any]:
+    client: Any
+    if redis_url is None:
+        import fakeredis.aioredis
+
+        client = fakeredis.aioredis.FakeRedis(decode_responses=False)
+    else:
+        from redis.asyncio import Redis
+
+        client = Redis.from_url(redis_url, decode_responses=False)
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+def _make_batches(
+    rng: random.Random, count: int, batch: int, payload_kb: int
+) -> list[list[Payload]]:
+    return [
+        [
+            Payload(
+                metadata={"encoding": b"binary/plain"},
+                data=rng.randbytes(payload_kb * 1024),
+            )
+            for _ in range(batch)
+        ]
+        for _ in range(count)
+    ]
+
+
+def _percentile_ms(sorted_seconds: list[float], fraction: float) -> float:
+    index = min(len(sorted_seconds) - 1, int(fraction * len(sorted_seconds)))
+    return round(sorted_seconds[index] * 1000, 3)
+
+
+def _summarize(
+    operation: str,
+    latencies: list[float],
+    elapsed: float,
+    *,
+    warmup: int,
+    payload_kb: int,
+    batch: int,
+    concurrency: int,
+) -> OperationResult:
+    latencies = sorted(latencies)
+    payload_count = len(latencies) * batch
+    return OperationResult(
+        scenario=f"{payload_kb}KiB-x{batch}-c{concurrency}",
+        operation=operation,
+        payload_kb=payload_kb,
+        batch=batch,
+        concurrency=concurrency,
+        calls=len(latencies),
+        warmup_calls=warmup * concurrency,
+        payloads_per_second=round(payload_count / elapsed, 1),
+        mib_per_second=round(payload_count * payload_kb / 1024 / elapsed, 2),
+        p50_ms=round(statistics.median(latencies) * 1000, 3),
+        p99_ms=_percentile_ms(latencies, 0.99),
+        max_ms=round(latencies[-1] * 1000, 3),
+    )
+
+
+async def _run_scenario(
+    redis_url: str | None,
+    *,
+    payload_kb: int,
+    batch: int,
+    concurrency: int,
+    calls: int,
+    warmup: int,
+    driver_options: dict[str, Any],
+) -> list[OperationResult]:
+    rng = random.Random(0)
+    key_prefix = f"bench:{uuid.uuid4().hex}"
+    warmup_batches = [
+        _make_batches(rng, warmup, batch, payload_kb) for _ in range(concurrency)
+    ]
+    measured_batches = [
+        _make_batches(rng, calls, batch, payload_kb) for _ in range(concurrency)
+    ]
+    async with _redis_client(redis_url) as redis_client:
+        driver = RedisStorageDriver(
+            client=new_redis_asyncio_client(redis_client),
+            key_prefix=key_prefix,
+            ttl=timedelta(minutes=10),
+            max_payload_size=max(payload_kb * 1024 * 2, 50 * _MIB),
+            **driver_options,
+        )
+        store_context = StorageDriverStoreContext()
+        retrieve_context = StorageDriverRetrieveContext()
+
+        async def store_all(
+            batches: list[list[Payload]], latencies: list[float]
+        ) -> list[list[StorageDriverClaim]]:
+            claims = []
+            for payloads in batches:
+                start = time.perf_counter()
+                claims.append(await driver.store(store_context, payloads))
+                latencies.append(time.perf_counter() - start)
+            return claims
+
+        async def retrieve_all(
+            claims: list[list[StorageDriverClaim]], latencies: list[float]
+        ) -> None:
+            for call_claims in claims:
+                start = time.perf_counter()
+                await driver.retrieve(retrieve_context, call_claims)
+                latencies.append(time.perf_counter() - start)
+
+        store_latencies: list[float] = []
+        retrieve_latencies: list[float] = []
+        try:
+            warmup_claims = await asyncio.gather(
+                *(store_all(batches, []) for batches in warmup_batches)
+            )
+            await asyncio.gather(
+                *(retrieve_all(claims, []) for claims in warmup_claims)
+            )
+
+            start = time.perf_counter()
+            measured_claims = await asyncio.gather(
+                *(store_all(batches, store_latencies) for batches in measured_batches)
+            )
+            store_elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    retrieve_all(claims, retrieve_latencies)
+                    for claims in measured_claims
+                )
+            )
+            retrieve_elapsed = time.perf_counter() - start
+        finally:
+            if redis_url is not None:
+                keys = [key async for key in redis_client.scan_iter(f"{key_prefix}:*")]
+                if keys:
+                    await redis_client.delete(*keys)
+
+    options = dict(
+        warmup=warmup, payload_kb=payload_kb, batch=batch, concurrency=concurrency
+    )
+    return [
+        _summarize("store", store_latencies, store_elapsed, **options),
+        _summarize("retrieve", retrieve_latencies, retrieve_elapsed, **options),
+    ]
+
+
+def _print_comparison(baseline_path: str, results: list[OperationResult]) -> None:
+    with open(baseline_path) as f:
+        baseline = {
+            (result["scenario"], result["operation"]): result
+            for result in json.load(f)["results"]
+        }
+    print(f"Change against {baseline_path}")
+    for result in results:
+        before = baseline.get((result.scenario, result.operation))
+        if before is None:
+            continue
+        throughput = result.payloads_per_second / before["payloads_per_second"] - 1
+        p99 = result.p99_ms / before["p99_ms"] - 1
+        print(
+            f"  {result.scenario:<20} {result.operation:<9} "
+            f"throughput {throughput:+7.1%}  p99 {p99:+7.1%}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--redis-url",
+        help="Redis server to benchmark against; defaults to in-process fakeredis",
+    )
+    parser.add_argument(
+        "--payload-kb", type=int, action="append", help="payload size in KiB"
+    )
+    parser.add_argument(
+        "--batch", type=int, action="append", help="payloads per store call"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, action="append", help="concurrent callers"
+    )
+    parser.add_argument(
+        "--calls", type=int, default=50, help="measured calls per caller"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=5, help="unmeasured calls per caller"
+    )
+    parser.add_argument(
+        "--max-scenario-mb",
+        type=int,
+        default=512,
+        help="cap on payload MiB generated per scenario; fewer calls are made "
+        "in scenarios that would exceed it",
+    )
+    parser.add_argument("--chunk-size", type=int, help="driver chunk_size in bytes")
+    parser.add_argument("--max-concurrency", type=int, help="driver max_concurrency")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument(
+        "--baseline", help="JSON file from an earlier run to compare against"
+    )
+    args = parser.parse_args()
+
+    driver_options = {
+        "chunk_size": args.chunk_size,
+        "max_concurrency": args.max_concurrency,
+    }
+    results: list[OperationResult] = []
+    print(
+        f"{'scenario':<22} {'op':<9} {'payloads/s':>11} {'MiB/s':>9} "
+        f"{'p50 ms':>9} {'p99 ms':>9}"
+    )
+    for payload_kb, batch, concurrency in itertools.product(
+        args.payload_kb or [1, 64, 1024],
+        args.batch or [1, 20],
+        args.concurrency or [1, 8],
+    ):
+        # Payloads are generated up front so generating them is not timed.
+        # Keep the inputs plus the copy held by Redis within the budget.
+        round_mb = concurrency * batch * payload_kb / 1024
+        rounds = max(2, int(args.max_scenario_mb / round_mb))
+        warmup = min(args.warmup, rounds // 5)
+        calls = min(args.calls, rounds - warmup)
+        scenario_results = asyncio.run(
+            _run_scenario(
+                args.redis_url,
+                payload_kb=payload_kb,
+                batch=batch,
+                concurrency=concurrency,
+                calls=calls,
+                warmup=warmup,
+                driver_options=driver_options,
+            )
+        )
+        for result in scenario_results:
+            print(
+                f"{result.scenario:<22} {result.operation:<9} "
+                f"{result.payloads_per_second:>11.1f} {result.mib_per_second:>9.2f} "
+                f"{result.p50_ms:>9.3f} {result.p99_ms:>9.3f}"
+            )
+        results.extend(scenario_results)
+
+    if args.baseline:
+        _print_comparison(args.baseline, results)
+
+    if args.output:
+        report = {
+            "backend": "redis" if args.redis_url else "fakeredis",
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "max_scenario_mb": args.max_scenario_mb,
+            "driver_options": driver_options,
+            "results": [asdict(result) for result in results],
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
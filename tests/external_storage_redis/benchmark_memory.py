@@ -0,0 +1,156 @@
+"""Peak-RSS benchmark for round-tripping large payloads through external storage.
+
+Each scenario runs in a fresh subprocess so its peak resident set size is not
+polluted by earlier scenarios. The reported figure is the growth of peak RSS
+during the round trip, after the input payloads have been built. The Redis
+scenarios use ``fakeredis`` in-process, so their figure also includes the
+copy of the data held by the fake server.
+
+Scenarios:
+
+* ``redis``: ``RedisStorageDriver`` store + retrieve, one value per payload.
+* ``redis-chunked``: the same with 1 MiB ``chunk_size`` and 8 MiB
+  ``max_batch_bytes``, which writes chunks as ``memoryview`` slices of the
+  serialized payload and reads them back batch by batch.
+* ``gzip-codec``: ``external_storage``'s ``CompressionCodec`` encode + decode
+  with ``GzipCompressor``.
+* ``zstd-codec``: the same with ``ZstdCompressor``.
+
+Run from the repository root with:
+
+    uv run --group external-storage-redis --group external-storage --group dev \\
+        python -m tests.external_storage_redis.benchmark_memory
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from temporalio.api.common.v1 import Payload
+
+_SCENARIOS = ("redis", "redis-chunked", "gzip-codec", "zstd-codec")
+_MIB = 1024 * 1024
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _make_payloads(total_mb: int, payload_mb: int) -> list[Payload]:
+    rng = random.Random(0)
+    return [
+        Payload(
+            metadata={"encoding": b"binary/plain"},
+            data=rng.randbytes(payload_mb * _MIB),
+        )
+        for _ in range(max(1, total_mb // payload_mb))
+    ]
+
+
+async def _round_trip_redis(payloads: list[Payload], chunked: bool) -> None:
+    import fakeredis.aioredis
+    from temporalio.converter import (
+        StorageDriverRetrieveContext,
+        StorageDriverStoreContext,
+    )
+
+    from external_storage_redis import RedisStorageDriver
+    from external_storage_redis.redis_asyncio import new_redis_asyncio_client
+
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=False)
+    try:
+        driver = RedisStorageDriver(
+            client=new_redis_asyncio_client(redis_client),
+            max_payload_size=1024 * _MIB,
+            chunk_size=_MIB if chunked else None,
+            max_batch_bytes=8 * _MIB if chunked else None,
+        )
+        claims = await driver.store(StorageDriverStoreContext(), payloads)
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+        assert len(retrieved) == len(payloads)
+    finally:
+        await redis_client.aclose()
+
+
+async def _round_trip_codec(payloads: list[Payload], compressor: str) -> None:
+    from external_storage.codec import (
+        CompressionCodec,
+        GzipCompressor,
+        ZstdCompressor,
+    )
+
+    codec = CompressionCodec(
+        GzipCompressor() if compressor == "gzip" else ZstdCompressor()
+    )
+    decoded = await codec.decode(await codec.encode(payloads))
+    assert len(decoded) == len(payloads)
+
+
+def _run_scenario(scenario: str, total_mb: int, payload_mb: int) -> dict:
+    payloads = _make_payloads(total_mb, payload_mb)
+    rss_before = _peak_rss_bytes()
+    start = time.perf_counter()
+    if scenario.endswith("-codec"):
+        asyncio.run(_round_trip_codec(payloads, scenario.removesuffix("-codec")))
+    else:
+        asyncio.run(_round_trip_redis(payloads, chunked=scenario == "redis-chunked"))
+    return {
+        "scenario": scenario,
+        "total_mb": total_mb,
+        "payload_mb": payload_mb,
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_growth_mb": round((_peak_rss_bytes() - rss_before) / _MIB, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--total-mb", type=int, default=100)
+    parser.add_argument("--payload-mb", type=int, default=10)
+    parser.add_argument("--scenario", choices=_SCENARIOS, action="append")
+    # Internal: run one scenario in this process and print its result as JSON.
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    scenarios = args.scenario or list(_SCENARIOS)
+
+    if args.child:
+        print(json.dumps(_run_scenario(scenarios[0], args.total_mb, args.payload_mb)))
+        return
+
+    print(f"Round-tripping {args.total_mb} MiB in {args.payload_mb} MiB payloads")
+    for scenario in scenarios:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "tests.external_storage_redis.benchmark_memory",
+                "--child",
+                "--scenario",
+                scenario,
+                "--total-mb",
+                str(args.total_mb),
+                "--payload-mb",
+                str(args.payload_mb),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(
+            f"  {scenario:<14} peak RSS +{result['peak_rss_growth_mb']:7.1f} MiB "
+            f"in {result['seconds']:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import asyncio
 import hashlib
 import subprocess
 import sys
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Coroutine, Sequence
 from datetime import timedelta
 from functools import wraps
 from typing import Any
@@ -14,6 +14,7 @@ from unittest.mock import MagicMock
 
 import fakeredis.aioredis
 import pytest
+from redis.crc import key_slot
 from temporalio.api.common.v1 import Payload
 from temporalio.converter import (
     JSONPlainPayloadConverter,
@@ -25,8 +26,16 @@ from temporalio.converter import (
 )
 from temporalio.exceptions import ApplicationError
 
-from external_storage_redis import RedisStorageDriver, RedisStorageDriverClient
-from external_storage_redis.redis_asyncio import new_redis_asyncio_client
+from external_storage_redis import (
+    RedisPayloadCache,
+    RedisStorageDriver,
+    RedisStorageDriverClient,
+)
+from external_storage_redis._driver import KeyScope
+from external_storage_redis.redis_asyncio import (
+    new_redis_asyncio_client,
+    new_redis_asyncio_cluster_client,
+)
 from tests.external_storage_redis.conftest import KEY_PREFIX
 
 _CONVERTER = JSONPlainPayloadConverter()
@@ -115,6 +124,7 @@ class CountingDriverClient(RedisStorageDriverClient):
         self.get_count = 0
         self.set_if_absent_count = 0
         self.insert_count = 0
+        self.touch_count = 0
 
     async def get(self, *, key: str) -> bytes | None:
         self.get_count += 1
@@ -133,6 +143,52 @@ class CountingDriverClient(RedisStorageDriverClient):
             self.insert_count += 1
         return inserted
 
+    async def touch(self, *, key: str, ttl: timedelta) -> bool:
+        self.touch_count += 1
+        return await self._delegate.touch(key=key, ttl=ttl)
+
+
+class BatchCountingDriverClient(RedisStorageDriverClient):
+    """RedisStorageDriverClient wrapper that counts batched round trips."""
+
+    def __init__(self, delegate: RedisStorageDriverClient) -> None:
+        self._delegate = delegate
+        self.get_many_calls: list[list[str]] = []
+        self.set_many_calls: list[list[str]] = []
+
+    async def get(self, *, key: str) -> bytes | None:
+        raise AssertionError("driver should use get_many")
+
+    async def set_if_absent(
+        self,
+        *,
+        key: str,
+        data: bytes,
+        ttl: timedelta | None = None,
+    ) -> bool:
+        raise AssertionError("driver should use set_many_if_absent")
+
+    async def get_many(
+        self,
+        *,
+        keys: Sequence[str],
+        ttl: timedelta | None = None,
+    ) -> list[bytes | None]:
+        self.get_many_calls.append(list(keys))
+        return await self._delegate.get_many(keys=keys, ttl=ttl)
+
+    async def set_many_if_absent(
+        self,
+        *,
+        items: Sequence[tuple[str, bytes | memoryview]],
+        ttl: timedelta | None = None,
+        refresh_ttl: bool = False,
+    ) -> list[bool]:
+        self.set_many_calls.append([key for key, _ in items])
+        return await self._delegate.set_many_if_absent(
+            items=items, ttl=ttl, refresh_ttl=refresh_ttl
+        )
+
 
 class FailOnceDriverClient(RedisStorageDriverClient):
     """RedisStorageDriverClient wrapper that fails one call then blocks."""
@@ -170,6 +226,45 @@ class FailOnceDriverClient(RedisStorageDriverClient):
         return await self._delegate.set_if_absent(key=key, data=data, ttl=ttl)
 
 
+class FakeRedisCluster:
+    """Stand-in for ``redis.asyncio.RedisCluster`` backed by one fakeredis node.
+
+    Records every ``MGET`` queued on a pipeline and rejects those spanning
+    more than one slot, as a real cluster would.
+    """
+
+    def __init__(self, redis_asyncio_client: Any) -> None:
+        self._redis = redis_asyncio_client
+        self.mget_calls: list[list[str]] = []
+
+    def keyslot(self, key: str) -> int:
+        return key_slot(key.encode())
+
+    def pipeline(self, transaction: Any = None) -> _FakeClusterPipeline:
+        assert not transaction
+        return _FakeClusterPipeline(self, self._redis.pipeline(transaction=False))
+
+
+class _FakeClusterPipeline:
+    def __init__(self, cluster: FakeRedisCluster, pipe: Any) -> None:
+        self._cluster = cluster
+        self._pipe = pipe
+
+    async def __aenter__(self) -> _FakeClusterPipeline:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self._pipe.reset()
+
+    def mget(self, keys: list[str]) -> None:
+        assert len({self._cluster.keyslot(key) for key in keys}) == 1
+        self._cluster.mget_calls.append(list(keys))
+        self._pipe.mget(keys)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pipe, name)
+
+
 class _AsyncBarrier:
     """Minimal asyncio.Barrier equivalent for Python <3.11."""
 
@@ -255,6 +350,17 @@ class TestRedisStorageDriverInit:
                 max_payload_size=-1,
             )
 
+    @pytest.mark.parametrize(
+        "option", ["max_concurrency", "max_batch_bytes", "chunk_size"]
+    )
+    @pytest.mark.parametrize("value", [0, -1])
+    def test_batch_limits_must_be_positive(self, option: str, value: int) -> None:
+        options: dict[str, Any] = {option: value}
+        with pytest.raises(ValueError, match=f"{option} must be greater than zero"):
+            RedisStorageDriver(
+                client=MagicMock(spec=RedisStorageDriverClient), **options
+            )
+
 
 class TestRedisStorageDriverKeyConstruction:
     async def test_key_context_none(
@@ -391,6 +497,100 @@ class TestRedisStorageDriverKeyConstruction:
             == f"{KEY_PREFIX}:v0:ns:my%2Fns%231:wt:null:wi:wf1:ri:null:d:sha256:{expected_hash}"
         )
 
+    async def test_key_hash_tag_workflow(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, hash_tag=True
+        )
+        payload = make_payload()
+        ctx = make_workflow_context(
+            namespace="ns1", workflow_id="wf{1}", run_id="run-abc"
+        )
+        [claim] = await driver.store(ctx, [payload])
+        expected_hash = hashlib.sha256(payload.SerializeToString()).hexdigest()
+        assert (
+            claim.claim_data["key"]
+            == f"{KEY_PREFIX}:v0:{{ns:ns1:wt:null:wi:wf%7B1%7D:ri:run-abc}}:d:sha256:{expected_hash}"
+        )
+
+    async def test_key_hash_tag_activity(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, hash_tag=True
+        )
+        payload = make_payload()
+        ctx = make_activity_context(namespace="ns1", activity_id="act1")
+        [claim] = await driver.store(ctx, [payload])
+        expected_hash = hashlib.sha256(payload.SerializeToString()).hexdigest()
+        assert (
+            claim.claim_data["key"]
+            == f"{KEY_PREFIX}:v0:{{ns:ns1:at:null:ai:act1:ri:null}}:d:sha256:{expected_hash}"
+        )
+
+    async def test_key_hash_tag_requires_execution_target(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, hash_tag=True
+        )
+        payload = make_payload()
+        [claim] = await driver.store(make_store_context(), [payload])
+        expected_hash = hashlib.sha256(payload.SerializeToString()).hexdigest()
+        assert claim.claim_data["key"] == f"{KEY_PREFIX}:v0:d:sha256:{expected_hash}"
+
+    async def test_key_hash_tag_colocates_run_payloads(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, hash_tag=True, chunk_size=8
+        )
+        ctx = make_workflow_context(namespace="ns1", workflow_id="wf1", run_id="r1")
+        claims = await driver.store(
+            ctx, [make_payload(f"payload-{i}") for i in range(5)]
+        )
+        keys = [claim.claim_data["key"] for claim in claims]
+        keys += [f"{key}:c8:0" for key in keys]
+        assert len({key_slot(key.encode()) for key in keys}) == 1
+
+    async def test_key_scope_namespace(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, key_scope="namespace"
+        )
+        payload = make_payload()
+        ctx = make_workflow_context(namespace="ns1", workflow_id="wf1", run_id="r1")
+        [claim] = await driver.store(ctx, [payload])
+        expected_hash = hashlib.sha256(payload.SerializeToString()).hexdigest()
+        assert (
+            claim.claim_data["key"]
+            == f"{KEY_PREFIX}:v0:ns:ns1:d:sha256:{expected_hash}"
+        )
+
+    async def test_key_scope_global(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            key_scope="global",
+            hash_tag=True,
+        )
+        payload = make_payload()
+        ctx = make_activity_context(namespace="ns1", activity_id="act1")
+        [claim] = await driver.store(ctx, [payload])
+        expected_hash = hashlib.sha256(payload.SerializeToString()).hexdigest()
+        assert claim.claim_data["key"] == f"{KEY_PREFIX}:v0:d:sha256:{expected_hash}"
+
+    def test_key_scope_must_be_known(self) -> None:
+        with pytest.raises(ValueError, match="key_scope must be one of"):
+            RedisStorageDriver(
+                client=MagicMock(spec=RedisStorageDriverClient),
+                key_scope="run",  # type: ignore[arg-type]
+            )
+
     async def test_key_urlencoded_roundtrip(
         self, driver_client: RedisStorageDriverClient
     ) -> None:
@@ -413,6 +613,7 @@ class TestRedisStorageDriverStoreRetrieve:
         assert claim.claim_data["hash_algorithm"] == "sha256"
         expected_hash = hashlib.sha256(payload.SerializeToString()).hexdigest()
         assert claim.claim_data["hash_value"] == expected_hash
+        assert claim.claim_data["size"] == str(len(payload.SerializeToString()))
 
     async def test_roundtrip_single_payload(
         self, driver_client: RedisStorageDriverClient
@@ -538,7 +739,7 @@ class TestRedisStorageDriverStoreRetrieve:
         )
         with pytest.raises(
             ValueError,
-            match=r"RedisStorageDriver unsupported hash algorithm \[key=.+\]: expected sha256, got md5",
+            match=r"RedisStorageDriver unsupported hash algorithm \[key=.+\]: expected one of blake2b, sha256, got md5",
         ):
             await driver.retrieve(StorageDriverRetrieveContext(), [bad_claim])
 
@@ -616,6 +817,30 @@ class TestRedisStorageDriverStoreRetrieve:
 
 
 class TestRedisAsyncioAdapter:
+    async def test_get_many_preserves_order_and_missing_keys(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        await redis_asyncio_client.set("adapter:a", b"a")
+        await redis_asyncio_client.set("adapter:c", b"c")
+        assert await driver_client.get_many(
+            keys=["adapter:c", "adapter:b", "adapter:a"]
+        ) == [b"c", None, b"a"]
+        assert await driver_client.get_many(keys=[]) == []
+
+    async def test_set_many_if_absent_only_inserts_new_keys(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        await redis_asyncio_client.set("adapter:existing", b"old")
+        inserted = await driver_client.set_many_if_absent(
+            items=[("adapter:existing", b"new"), ("adapter:fresh", b"fresh")],
+            ttl=timedelta(seconds=5),
+        )
+        assert inserted == [False, True]
+        assert await redis_asyncio_client.get("adapter:existing") == b"old"
+        assert await redis_asyncio_client.pttl("adapter:existing") == -1
+        assert 0 < await redis_asyncio_client.pttl("adapter:fresh") <= 5000
+        assert await driver_client.set_many_if_absent(items=[]) == []
+
     async def test_decode_responses_client_raises(self) -> None:
         client = fakeredis.aioredis.FakeRedis(decode_responses=True)
         try:
@@ -631,6 +856,776 @@ class TestRedisAsyncioAdapter:
                 await client.close()
 
 
+class TestRedisAsyncioClusterAdapter:
+    async def test_get_many_issues_one_mget_per_slot(
+        self, redis_asyncio_client: Any
+    ) -> None:
+        cluster = FakeRedisCluster(redis_asyncio_client)
+        adapter = new_redis_asyncio_cluster_client(cluster)  # type: ignore[arg-type]
+        await redis_asyncio_client.set("{a}:1", b"a1")
+        await redis_asyncio_client.set("{a}:2", b"a2")
+        await redis_asyncio_client.set("{b}:1", b"b1")
+        assert await adapter.get_many(
+            keys=["{a}:1", "{b}:1", "{b}:missing", "{a}:2"]
+        ) == [b"a1", b"b1", None, b"a2"]
+        assert sorted(cluster.mget_calls) == [
+            ["{a}:1", "{a}:2"],
+            ["{b}:1", "{b}:missing"],
+        ]
+        assert await adapter.get_many(keys=[]) == []
+
+    async def test_get_many_with_ttl_refreshes_expiration(
+        self, redis_asyncio_client: Any
+    ) -> None:
+        cluster = FakeRedisCluster(redis_asyncio_client)
+        adapter = new_redis_asyncio_cluster_client(cluster)  # type: ignore[arg-type]
+        await redis_asyncio_client.set("{a}:1", b"a1")
+        assert await adapter.get_many(
+            keys=["{a}:1", "{b}:1"], ttl=timedelta(seconds=5)
+        ) == [b"a1", None]
+        assert 0 < await redis_asyncio_client.pttl("{a}:1") <= 5000
+        assert cluster.mget_calls == []
+
+    async def test_hash_tagged_driver_round_trip(
+        self, redis_asyncio_client: Any
+    ) -> None:
+        cluster = FakeRedisCluster(redis_asyncio_client)
+        driver = RedisStorageDriver(
+            client=new_redis_asyncio_cluster_client(cluster),  # type: ignore[arg-type]
+            key_prefix=KEY_PREFIX,
+            hash_tag=True,
+            ttl=timedelta(seconds=5),
+        )
+        ctx = make_workflow_context(namespace="ns1", workflow_id="wf1", run_id="r1")
+        payloads = [make_payload(f"payload-{i}") for i in range(5)]
+        claims = await driver.store(ctx, payloads)
+        assert await driver.retrieve(StorageDriverRetrieveContext(), claims) == payloads
+        assert len(cluster.mget_calls) == 1
+        assert len(cluster.mget_calls[0]) == 5
+
+
+class TestRedisStorageDriverBatching:
+    async def test_store_uses_single_batched_call(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(client=batch_client, key_prefix=KEY_PREFIX)
+        payloads = [make_payload(f"batch-store-{i}") for i in range(10)]
+
+        claims = await driver.store(make_store_context(), payloads)
+
+        assert batch_client.set_many_calls == [
+            [claim.claim_data["key"] for claim in claims]
+        ]
+
+    async def test_retrieve_uses_single_batched_call(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(client=batch_client, key_prefix=KEY_PREFIX)
+        payloads = [make_payload(f"batch-retrieve-{i}") for i in range(10)]
+        claims = await driver.store(make_store_context(), payloads)
+
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+
+        assert retrieved == payloads
+        assert batch_client.get_many_calls == [
+            [claim.claim_data["key"] for claim in claims]
+        ]
+
+    async def test_empty_batches_skip_client(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(client=batch_client, key_prefix=KEY_PREFIX)
+        assert await driver.store(make_store_context(), []) == []
+        assert await driver.retrieve(StorageDriverRetrieveContext(), []) == []
+        assert batch_client.set_many_calls == []
+        assert batch_client.get_many_calls == []
+
+    async def test_retrieve_missing_key_in_batch_raises(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(client=driver_client, key_prefix=KEY_PREFIX)
+        [claim] = await driver.store(make_store_context(), [make_payload("present")])
+        missing = StorageDriverClaim(
+            claim_data={"key": f"{KEY_PREFIX}:v0:d:sha256:missing"}
+        )
+        with pytest.raises(ApplicationError) as exc_info:
+            await driver.retrieve(StorageDriverRetrieveContext(), [claim, missing])
+        assert exc_info.value.type == "PayloadNotFoundError"
+
+
+class TestRedisStorageDriverBackpressure:
+    async def test_max_concurrency_splits_batches(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(
+            client=batch_client, key_prefix=KEY_PREFIX, max_concurrency=4
+        )
+        payloads = [make_payload(f"limited-{i}") for i in range(10)]
+
+        claims = await driver.store(make_store_context(), payloads)
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+
+        assert retrieved == payloads
+        assert [len(keys) for keys in batch_client.set_many_calls] == [4, 4, 2]
+        assert [len(keys) for keys in batch_client.get_many_calls] == [4, 4, 2]
+
+    async def test_max_concurrency_bounds_fan_out(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        in_flight = 0
+        peak = 0
+        delegate_get = driver_client.get
+
+        async def tracking_get(*, key: str) -> bytes | None:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(0.001)
+                return await delegate_get(key=key)
+            finally:
+                in_flight -= 1
+
+        counting_client = CountingDriverClient(driver_client)
+        counting_client.get = tracking_get  # type: ignore[method-assign]
+        driver = RedisStorageDriver(
+            client=counting_client, key_prefix=KEY_PREFIX, max_concurrency=3
+        )
+        payloads = [make_payload(f"fan-out-{i}") for i in range(10)]
+        claims = await driver.store(make_store_context(), payloads)
+
+        assert await driver.retrieve(StorageDriverRetrieveContext(), claims) == payloads
+        assert peak == 3
+
+    async def test_max_batch_bytes_splits_batches(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        payloads = [make_payload(f"{i}" * 100) for i in range(5)]
+        payload_size = len(payloads[0].SerializeToString())
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(
+            client=batch_client,
+            key_prefix=KEY_PREFIX,
+            max_batch_bytes=payload_size * 2,
+        )
+
+        claims = await driver.store(make_store_context(), payloads)
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+
+        assert retrieved == payloads
+        assert [len(keys) for keys in batch_client.set_many_calls] == [2, 2, 1]
+        assert [len(keys) for keys in batch_client.get_many_calls] == [2, 2, 1]
+
+    async def test_payload_larger_than_batch_bytes_is_sent_alone(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(
+            client=batch_client, key_prefix=KEY_PREFIX, max_batch_bytes=1
+        )
+        payloads = [make_payload(f"oversized-{i}") for i in range(3)]
+
+        claims = await driver.store(make_store_context(), payloads)
+
+        assert await driver.retrieve(StorageDriverRetrieveContext(), claims) == payloads
+        assert [len(keys) for keys in batch_client.set_many_calls] == [1, 1, 1]
+
+    async def test_claims_without_size_ignore_byte_budget(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(
+            client=batch_client, key_prefix=KEY_PREFIX, max_batch_bytes=1
+        )
+        payloads = [make_payload(f"legacy-size-{i}") for i in range(3)]
+        claims = await driver.store(make_store_context(), payloads)
+        legacy_claims = [
+            StorageDriverClaim(claim_data={"key": claim.claim_data["key"]})
+            for claim in claims
+        ]
+
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), legacy_claims)
+
+        assert retrieved == payloads
+        assert [len(keys) for keys in batch_client.get_many_calls] == [3]
+
+
+class TestRedisPayloadCache:
+    def test_max_bytes_must_be_positive(self) -> None:
+        with pytest.raises(ValueError, match="max_bytes must be greater than zero"):
+            RedisPayloadCache(max_bytes=0)
+
+    def test_hit_and_miss_counters(self) -> None:
+        cache = RedisPayloadCache()
+        payload = make_payload("cached")
+        assert cache.get("k") is None
+        cache.put("k", payload)
+        assert cache.get("k") == payload
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 0)
+        assert len(cache) == 1
+        assert cache.size_bytes == payload.ByteSize()
+
+    def test_evicts_least_recently_used(self) -> None:
+        payloads = {name: make_payload(name * 10) for name in "abc"}
+        cache = RedisPayloadCache(max_bytes=payloads["a"].ByteSize() * 2)
+        cache.put("a", payloads["a"])
+        cache.put("b", payloads["b"])
+        assert cache.get("a") is not None
+        cache.put("c", payloads["c"])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == payloads["a"]
+        assert cache.get("c") == payloads["c"]
+        assert cache.evictions == 1
+        assert cache.size_bytes <= payloads["a"].ByteSize() * 2
+
+    def test_oversized_payload_is_not_cached(self) -> None:
+        cache = RedisPayloadCache(max_bytes=8)
+        cache.put("big", make_payload("too large to cache"))
+        assert len(cache) == 0
+        assert cache.get("big") is None
+
+    def test_returned_payload_is_a_copy(self) -> None:
+        cache = RedisPayloadCache()
+        payload = make_payload("immutable")
+        cache.put("k", payload)
+        payload.data = b"changed-after-put"
+        cached = cache.get("k")
+        assert cached is not None
+        cached.data = b"changed-after-get"
+        assert cache.get("k") == make_payload("immutable")
+
+    def test_clear(self) -> None:
+        cache = RedisPayloadCache()
+        cache.put("k", make_payload())
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+
+class TestRedisStorageDriverCache:
+    async def test_repeated_retrieve_skips_redis(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        cache = RedisPayloadCache()
+        driver = RedisStorageDriver(
+            client=batch_client, key_prefix=KEY_PREFIX, cache=cache
+        )
+        payloads = [make_payload(f"cached-{i}") for i in range(3)]
+        claims = await driver.store(make_store_context(), payloads)
+
+        first = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+        second = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+
+        assert first == payloads
+        assert second == payloads
+        assert len(batch_client.get_many_calls) == 1
+        assert (cache.hits, cache.misses) == (3, 3)
+
+    async def test_only_missing_keys_are_fetched(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(
+            client=batch_client, key_prefix=KEY_PREFIX, cache=RedisPayloadCache()
+        )
+        payloads = [make_payload(f"partial-{i}") for i in range(3)]
+        claims = await driver.store(make_store_context(), payloads)
+        await driver.retrieve(StorageDriverRetrieveContext(), claims[:1])
+
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+
+        assert retrieved == payloads
+        assert batch_client.get_many_calls[-1] == [
+            claim.claim_data["key"] for claim in claims[1:]
+        ]
+
+    async def test_failed_integrity_check_is_not_cached(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        cache = RedisPayloadCache()
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, cache=cache
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("tamper")])
+        tampered_claim = StorageDriverClaim(
+            claim_data={**claim.claim_data, "hash_value": "0" * 64}
+        )
+
+        with pytest.raises(ValueError, match="integrity check failed"):
+            await driver.retrieve(StorageDriverRetrieveContext(), [tampered_claim])
+        assert len(cache) == 0
+
+
+class TestRedisStorageDriverChunking:
+    async def test_large_payload_is_chunked(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, chunk_size=64
+        )
+        payload = make_payload("c" * 200)
+        payload_size = len(payload.SerializeToString())
+
+        [claim] = await driver.store(make_store_context(), [payload])
+
+        key = claim.claim_data["key"]
+        chunk_count = -(-payload_size // 64)
+        assert claim.claim_data["chunk_count"] == str(chunk_count)
+        assert claim.claim_data["chunk_size"] == "64"
+        assert await _list_keys(redis_asyncio_client) == sorted(
+            f"{key}:c64:{i}" for i in range(chunk_count)
+        )
+        [retrieved] = await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+        assert retrieved == payload
+
+    async def test_small_payload_is_not_chunked(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        payload = make_payload("small")
+        driver = RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            chunk_size=len(payload.SerializeToString()),
+        )
+
+        [claim] = await driver.store(make_store_context(), [payload])
+
+        assert "chunk_count" not in claim.claim_data
+        assert await _list_keys(redis_asyncio_client) == [claim.claim_data["key"]]
+
+    async def test_chunks_honor_batch_limits(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        batch_client = BatchCountingDriverClient(driver_client)
+        driver = RedisStorageDriver(
+            client=batch_client,
+            key_prefix=KEY_PREFIX,
+            chunk_size=32,
+            max_concurrency=2,
+        )
+        payloads = [make_payload("a" * 100), make_payload("small")]
+
+        claims = await driver.store(make_store_context(), payloads)
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+
+        assert retrieved == payloads
+        assert all(len(keys) <= 2 for keys in batch_client.set_many_calls)
+        assert all(len(keys) <= 2 for keys in batch_client.get_many_calls)
+
+    async def test_chunks_are_written_as_views(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        written: list[bytes | memoryview] = []
+        delegate_set_many = driver_client.set_many_if_absent
+
+        async def recording_set_many(
+            *,
+            items: Sequence[tuple[str, bytes | memoryview]],
+            ttl: timedelta | None = None,
+            refresh_ttl: bool = False,
+        ) -> list[bool]:
+            written.extend(data for _, data in items)
+            return await delegate_set_many(
+                items=items, ttl=ttl, refresh_ttl=refresh_ttl
+            )
+
+        driver_client.set_many_if_absent = recording_set_many  # type: ignore[method-assign]
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, chunk_size=64
+        )
+        payload = make_payload("v" * 200)
+
+        [claim] = await driver.store(make_store_context(), [payload])
+
+        assert written
+        assert all(isinstance(data, memoryview) for data in written)
+        assert b"".join(written) == payload.SerializeToString()
+        [retrieved] = await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+        assert retrieved == payload
+
+    async def test_unchunked_driver_reads_legacy_claims(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        legacy_driver = RedisStorageDriver(client=driver_client, key_prefix=KEY_PREFIX)
+        payload = make_payload("l" * 200)
+        [claim] = await legacy_driver.store(make_store_context(), [payload])
+
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, chunk_size=64
+        )
+        [retrieved] = await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+        assert retrieved == payload
+
+    async def test_missing_chunk_raises_non_retryable_application_error(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, chunk_size=64
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("m" * 200)])
+        missing_key = f"{claim.claim_data['key']}:c64:1"
+        await redis_asyncio_client.delete(missing_key)
+
+        with pytest.raises(ApplicationError) as exc_info:
+            await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+        assert exc_info.value.message == f"Payload not found for key '{missing_key}'"
+        assert exc_info.value.type == "PayloadNotFoundError"
+        assert exc_info.value.non_retryable is True
+
+    async def test_truncated_chunk_raises(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, chunk_size=64
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("t" * 200)])
+        await redis_asyncio_client.set(f"{claim.claim_data['key']}:c64:0", b"short")
+
+        with pytest.raises(ValueError, match="chunks are shorter than recorded"):
+            await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+
+    async def test_oversized_chunk_raises(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, chunk_size=64
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("o" * 200)])
+        await redis_asyncio_client.set(f"{claim.claim_data['key']}:c64:0", b"x" * 1024)
+
+        with pytest.raises(ValueError, match="chunk exceeds recorded payload size"):
+            await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+
+    async def test_restore_with_other_chunk_size_keeps_both_claims_readable(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        payload = make_payload("r" * 200)
+        claims = []
+        for chunk_size in [64, 32, 64]:
+            driver = RedisStorageDriver(
+                client=driver_client, key_prefix=KEY_PREFIX, chunk_size=chunk_size
+            )
+            [claim] = await driver.store(make_store_context(), [payload])
+            claims.append(claim)
+
+        assert [c.claim_data["chunk_size"] for c in claims] == ["64", "32", "64"]
+        retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
+        assert retrieved == [payload] * 3
+
+
+class TestRedisStorageDriverHashing:
+    def test_unknown_hash_algorithm_raises(self) -> None:
+        with pytest.raises(ValueError, match="hash_algorithm must be one of"):
+            RedisStorageDriver(
+                client=MagicMock(spec=RedisStorageDriverClient),
+                hash_algorithm="md5",  # type: ignore[arg-type]
+            )
+
+    def test_unknown_verify_policy_raises(self) -> None:
+        with pytest.raises(ValueError, match="verify_on_retrieve must be one of"):
+            RedisStorageDriver(
+                client=MagicMock(spec=RedisStorageDriverClient),
+                verify_on_retrieve="sometimes",  # type: ignore[arg-type]
+            )
+
+    @pytest.mark.parametrize("rate", [-0.1, 1.1])
+    def test_sample_rate_out_of_range_raises(self, rate: float) -> None:
+        with pytest.raises(ValueError, match="verify_sample_rate must be between"):
+            RedisStorageDriver(
+                client=MagicMock(spec=RedisStorageDriverClient),
+                verify_sample_rate=rate,
+            )
+
+    async def test_blake2b_key_and_claim(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, hash_algorithm="blake2b"
+        )
+        payload = make_payload("blake")
+        [claim] = await driver.store(make_store_context(), [payload])
+
+        expected_hash = hashlib.blake2b(
+            payload.SerializeToString(), digest_size=32
+        ).hexdigest()
+        assert claim.claim_data["hash_algorithm"] == "blake2b"
+        assert claim.claim_data["hash_value"] == expected_hash
+        assert claim.claim_data["key"] == f"{KEY_PREFIX}:v0:d:blake2b:{expected_hash}"
+        [retrieved] = await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+        assert retrieved == payload
+
+    async def test_retrieve_uses_claim_algorithm(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        sha_driver = RedisStorageDriver(client=driver_client, key_prefix=KEY_PREFIX)
+        blake_driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, hash_algorithm="blake2b"
+        )
+        payload = make_payload("mixed")
+        [sha_claim] = await sha_driver.store(make_store_context(), [payload])
+        [blake_claim] = await blake_driver.store(make_store_context(), [payload])
+
+        assert await blake_driver.retrieve(
+            StorageDriverRetrieveContext(), [sha_claim]
+        ) == [payload]
+        assert await sha_driver.retrieve(
+            StorageDriverRetrieveContext(), [blake_claim]
+        ) == [payload]
+
+    async def test_verify_never_skips_integrity_check(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, verify_on_retrieve="never"
+        )
+        payload = make_payload("trusted")
+        [claim] = await driver.store(make_store_context(), [payload])
+        tampered_claim = StorageDriverClaim(
+            claim_data={**claim.claim_data, "hash_value": "0" * 64}
+        )
+
+        [retrieved] = await driver.retrieve(
+            StorageDriverRetrieveContext(), [tampered_claim]
+        )
+        assert retrieved == payload
+
+    @pytest.mark.parametrize(("rate", "should_fail"), [(0.0, False), (1.0, True)])
+    async def test_verify_sampled_follows_rate(
+        self,
+        driver_client: RedisStorageDriverClient,
+        rate: float,
+        should_fail: bool,
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            verify_on_retrieve="sampled",
+            verify_sample_rate=rate,
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("sample")])
+        tampered_claim = StorageDriverClaim(
+            claim_data={**claim.claim_data, "hash_value": "0" * 64}
+        )
+
+        if should_fail:
+            with pytest.raises(ValueError, match="integrity check failed"):
+                await driver.retrieve(StorageDriverRetrieveContext(), [tampered_claim])
+        else:
+            await driver.retrieve(StorageDriverRetrieveContext(), [tampered_claim])
+
+
+class TestRedisStorageDriverSharedKeys:
+    async def test_identical_payloads_across_runs_are_stored_once(
+        self,
+        redis_asyncio_client: Any,
+        counting_driver_client: CountingDriverClient,
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=counting_driver_client,
+            key_prefix=KEY_PREFIX,
+            key_scope="namespace",
+        )
+        payload = make_payload("shared-config")
+        claims = [
+            (
+                await driver.store(
+                    make_workflow_context(
+                        namespace="ns1", workflow_id=f"child-{i}", run_id=f"r{i}"
+                    ),
+                    [payload],
+                )
+            )[0]
+            for i in range(10)
+        ]
+        assert counting_driver_client.insert_count == 1
+        assert len(await _list_keys(redis_asyncio_client)) == 1
+        assert (
+            await driver.retrieve(StorageDriverRetrieveContext(), claims)
+            == [payload] * 10
+        )
+
+    async def test_namespaces_stay_isolated(
+        self,
+        redis_asyncio_client: Any,
+        driver_client: RedisStorageDriverClient,
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, key_scope="namespace"
+        )
+        payload = make_payload("shared-config")
+        for namespace in ["ns1", "ns2"]:
+            await driver.store(
+                make_workflow_context(namespace=namespace, workflow_id="wf"),
+                [payload],
+            )
+        assert len(await _list_keys(redis_asyncio_client)) == 2
+
+    async def test_duplicate_store_refreshes_shared_ttl(
+        self,
+        redis_asyncio_client: Any,
+        driver_client: RedisStorageDriverClient,
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            key_scope="global",
+            ttl=timedelta(seconds=60),
+            sliding_ttl=True,
+        )
+        payload = make_payload("shared-config")
+        [claim] = await driver.store(
+            make_workflow_context(namespace="ns1", workflow_id="parent"), [payload]
+        )
+        key = claim.claim_data["key"]
+        await redis_asyncio_client.pexpire(key, 1000)
+
+        await driver.store(
+            make_workflow_context(namespace="ns1", workflow_id="child"), [payload]
+        )
+
+        assert await redis_asyncio_client.pttl(key) > 50_000
+
+    @pytest.mark.parametrize("key_scope", ["namespace", "global"])
+    def test_shared_scope_with_fixed_ttl_is_rejected(
+        self, driver_client: RedisStorageDriverClient, key_scope: KeyScope
+    ) -> None:
+        # A later run's duplicate store would keep the first run's expiry
+        with pytest.raises(ValueError, match="with ttl requires sliding_ttl"):
+            RedisStorageDriver(
+                client=driver_client,
+                key_prefix=KEY_PREFIX,
+                key_scope=key_scope,
+                ttl=timedelta(seconds=60),
+            )
+
+    def test_execution_scope_with_fixed_ttl_is_allowed(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            key_scope="execution",
+            ttl=timedelta(seconds=60),
+        )
+
+
+class TestRedisStorageDriverSlidingTtl:
+    def test_sliding_ttl_requires_ttl(self) -> None:
+        with pytest.raises(ValueError, match="sliding_ttl requires ttl"):
+            RedisStorageDriver(
+                client=MagicMock(spec=RedisStorageDriverClient), sliding_ttl=True
+            )
+
+    async def test_retrieve_refreshes_ttl(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            ttl=timedelta(seconds=60),
+            sliding_ttl=True,
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("slide")])
+        key = claim.claim_data["key"]
+        await redis_asyncio_client.pexpire(key, 1000)
+
+        await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+
+        assert await redis_asyncio_client.pttl(key) > 50_000
+
+    async def test_retrieve_refreshes_chunk_ttls(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            ttl=timedelta(seconds=60),
+            sliding_ttl=True,
+            chunk_size=64,
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("s" * 200)])
+        keys = await _list_keys(redis_asyncio_client)
+        for key in keys:
+            await redis_asyncio_client.pexpire(key, 1000)
+
+        await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+
+        for key in keys:
+            assert await redis_asyncio_client.pttl(key) > 50_000
+
+    async def test_duplicate_store_refreshes_ttl(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client,
+            key_prefix=KEY_PREFIX,
+            ttl=timedelta(seconds=60),
+            sliding_ttl=True,
+        )
+        payload = make_payload("slide-store")
+        [claim] = await driver.store(make_store_context(), [payload])
+        key = claim.claim_data["key"]
+        await redis_asyncio_client.pexpire(key, 1000)
+
+        await driver.store(make_store_context(), [payload])
+
+        assert await redis_asyncio_client.pttl(key) > 50_000
+
+    async def test_without_sliding_ttl_retrieve_keeps_ttl(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        driver = RedisStorageDriver(
+            client=driver_client, key_prefix=KEY_PREFIX, ttl=timedelta(seconds=60)
+        )
+        [claim] = await driver.store(make_store_context(), [make_payload("fixed")])
+        key = claim.claim_data["key"]
+        await redis_asyncio_client.pexpire(key, 1000)
+
+        await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+
+        assert await redis_asyncio_client.pttl(key) <= 1000
+
+    async def test_default_fan_out_uses_touch(
+        self, redis_asyncio_client: Any, driver_client: RedisStorageDriverClient
+    ) -> None:
+        counting_client = CountingDriverClient(driver_client)
+        driver = RedisStorageDriver(
+            client=counting_client,
+            key_prefix=KEY_PREFIX,
+            ttl=timedelta(seconds=60),
+            sliding_ttl=True,
+        )
+        payload = make_payload("fan-out-touch")
+        [claim] = await driver.store(make_store_context(), [payload])
+        key = claim.claim_data["key"]
+        await redis_asyncio_client.pexpire(key, 1000)
+
+        await driver.store(make_store_context(), [payload])
+        assert await redis_asyncio_client.pttl(key) > 50_000
+        await redis_asyncio_client.pexpire(key, 1000)
+        await driver.retrieve(StorageDriverRetrieveContext(), [claim])
+        assert await redis_asyncio_client.pttl(key) > 50_000
+        assert counting_client.touch_count == 2
+
+    def test_client_without_touch_is_rejected(
+        self, driver_client: RedisStorageDriverClient
+    ) -> None:
+        faulty_client = FailOnceDriverClient(delegate=driver_client, fail_on="none")
+        with pytest.raises(ValueError, match="requires a client that implements touch"):
+            RedisStorageDriver(
+                client=faulty_client,
+                key_prefix=KEY_PREFIX,
+                ttl=timedelta(seconds=60),
+                sliding_ttl=True,
+            )
+
+
 class TestRedisStorageDriverErrors:
     async def test_store_client_failure_raises(
         self, driver_client: RedisStorageDriverClient
@@ -669,33 +1664,39 @@ class TestRedisStorageDriverErrors:
 
 class TestRedisStorageDriverConcurrency:
     async def test_store_payloads_concurrently(
-        self, driver_client: RedisStorageDriverClient
+        self, counting_driver_client: CountingDriverClient
     ) -> None:
         num_payloads = 5
         barrier = _AsyncBarrier(num_payloads)
-        driver_client.set_if_absent = _barrier_wrapper(  # type: ignore[method-assign]
-            driver_client.set_if_absent,
+        counting_driver_client.set_if_absent = _barrier_wrapper(  # type: ignore[method-assign]
+            counting_driver_client.set_if_absent,
             barrier,
         )
 
-        driver = RedisStorageDriver(client=driver_client, key_prefix=KEY_PREFIX)
+        driver = RedisStorageDriver(
+            client=counting_driver_client, key_prefix=KEY_PREFIX
+        )
         payloads = [make_payload(f"concurrent-store-{i}") for i in range(num_payloads)]
 
         claims = await driver.store(make_store_context(), payloads)
         assert len(claims) == num_payloads
 
     async def test_retrieve_payloads_concurrently(
-        self, driver_client: RedisStorageDriverClient
+        self, counting_driver_client: CountingDriverClient
     ) -> None:
         num_payloads = 5
-        driver = RedisStorageDriver(client=driver_client, key_prefix=KEY_PREFIX)
+        driver = RedisStorageDriver(
+            client=counting_driver_client, key_prefix=KEY_PREFIX
+        )
         payloads = [
             make_payload(f"concurrent-retrieve-{i}") for i in range(num_payloads)
         ]
         claims = await driver.store(make_store_context(), payloads)
 
         barrier = _AsyncBarrier(num_payloads)
-        driver_client.get = _barrier_wrapper(driver_client.get, barrier)  # type: ignore[method-assign]
+        counting_driver_client.get = _barrier_wrapper(  # type: ignore[method-assign]
+            counting_driver_client.get, barrier
+        )
 
         retrieved = await driver.retrieve(StorageDriverRetrieveContext(), claims)
         assert retrieved == payloads
@@ -712,7 +1713,7 @@ class TestRedisStorageDriverConcurrency:
 
         with pytest.raises(
             RuntimeError,
-            match=r"RedisStorageDriver store failed \[key=.+\]",
+            match=r"RedisStorageDriver store failed \[keys=.+\(3 total\)\]",
         ) as exc_info:
             await driver.store(make_store_context(), payloads)
 
@@ -734,7 +1735,7 @@ class TestRedisStorageDriverConcurrency:
 
         with pytest.raises(
             RuntimeError,
-            match=r"RedisStorageDriver retrieve failed \[key=.+\]",
+            match=r"RedisStorageDriver retrieve failed \[keys=.+\(3 total\)\]",
         ) as exc_info:
             await driver.retrieve(StorageDriverRetrieveContext(), claims)
 